@@ -0,0 +1,5 @@
+"""
+Navigator benchmarks package.
+
+Each module is a standalone script timing one subsystem against the real archive.
+"""
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Time headless queries from process start to printed result, and batch throughput over stdin."""
+import argparse
+import compileall
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from navigator.core.index import CACHE_DIR_NAME, NAMED_LOCATIONS_FILE
+from navigator.core.navigator import FileNavigator
+from navigator.core.pack import PACK_FILE_NAME
+
+MAIN = os.path.join(project_root, 'navigator', 'main.py')
+
+
+def cold_start(argv, repeat, stdin=None):
+    """Best and median wall time of a fresh interpreter running argv."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + argv, input=stdin, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[0], times[len(times) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base_dir', nargs='?', default=project_root)
+    parser.add_argument('--repeat', type=int, default=11)
+    parser.add_argument('--batch', type=int, default=1000, help='queries piped to one batch run')
+    args = parser.parse_args()
+    # Time the program as installed, with bytecode, even where the environment disables writing it
+    compileall.compile_dir(os.path.join(project_root, 'navigator'), quiet=1)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Work on a copy so the archive's own cache directory is left alone
+        for entry in os.listdir(args.base_dir):
+            source = os.path.join(args.base_dir, entry)
+            if entry.startswith('chapter_'):
+                shutil.copytree(source, os.path.join(temp_dir, entry))
+            elif entry == NAMED_LOCATIONS_FILE:
+                shutil.copy2(source, temp_dir)
+        pack_path = os.path.join(temp_dir, CACHE_DIR_NAME, PACK_FILE_NAME)
+        queries = [['locations', 'lake'], ['at', '26.10'], ['diff', '26.00', '26.10']]
+
+        def report(label, argv, stdin=None):
+            best, median = cold_start(argv, args.repeat, stdin)
+            print(f'{label:34} {best * 1000:7.1f} ms  (median {median * 1000:.1f})')
+            return best
+
+        report('interpreter only', ['-c', 'pass'])
+        report('interpreter + import json', ['-c', 'import json'])
+        # The first run writes the JSON index; the timed runs load it
+        subprocess.run([sys.executable, MAIN, 'at', '1.6.0', '--base-dir', temp_dir], stdout=subprocess.DEVNULL)
+        for words in queries:
+            report('JSON index: ' + ' '.join(words), [MAIN] + words + ['--base-dir', temp_dir])
+        FileNavigator(temp_dir).build_pack()
+        for words in queries:
+            report('pack: ' + ' '.join(words), [MAIN] + words + ['--base-dir', temp_dir])
+
+        lines = ''.join(f'{" ".join(queries[i % len(queries)])}\n' for i in range(args.batch)).encode()
+        best = report(f'batch of {args.batch}', [MAIN, 'batch', '--base-dir', temp_dir], lines)
+        print(f'{"":34} {args.batch / best:7.0f} queries/s')
+
+        imports = subprocess.run([sys.executable, '-X', 'importtime', MAIN, 'at', '26.10', '--base-dir', temp_dir],
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+        loaded = [name for name in ('blessed', 'PIL', 'concurrent.futures', 'numpy') if f' {name}\n' in imports]
+        print(f'heavy modules imported: {", ".join(loaded) or "none"}')
+        if os.path.exists(pack_path):
+            os.unlink(pack_path)
+
+
+if __name__ == '__main__':
+    main()
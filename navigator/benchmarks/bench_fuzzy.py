@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Time fuzzy location lookups as the name set grows into the tens of thousands."""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from navigator.core.fuzzy import FuzzyMatcher
+from navigator.core.index import LocationIndex
+
+QUERIES = ['sandguine', 'brawlers battle', 'tilted', 'pleasent prk', 'loot lak', 'xyz']
+
+
+def synthetic_names(real_names, count, seed=1):
+    """Grow the real names with near-miss variants, the hardest case for a typo index."""
+    rng = random.Random(seed)
+    words = sorted({word for name in real_names for word in name.split()})
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    names = set(real_names)
+    while len(names) < count:
+        parts = []
+        for _ in range(rng.randint(1, 3)):
+            word = list(rng.choice(words).lower())
+            for _ in range(2):
+                word[rng.randrange(len(word))] = rng.choice(letters)
+            parts.append(''.join(word).title())
+        names.add(' '.join(parts))
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base_dir', nargs='?', default=project_root)
+    parser.add_argument('--names', type=int, default=40000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    index = LocationIndex(args.base_dir)
+    matcher = index.fuzzy_matcher()
+    real_names = list(matcher.names)
+
+    for label, names in (('real archive', real_names), ('synthetic', synthetic_names(real_names, args.names))):
+        start = time.perf_counter()
+        matcher = FuzzyMatcher(names)
+        build = time.perf_counter() - start
+        print(f'{label}: {len(matcher)} names, {len(matcher.word_names)} words, built in {build:.2f} s')
+        for query in QUERIES:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                results = matcher.search(query, 5)
+            elapsed = (time.perf_counter() - start) * 1000 / args.repeat
+            best = f'{results[0][0]} ({results[0][1]})' if results else '-'
+            print(f'  {query!r:<18} {elapsed:7.3f} ms  {best}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Time a new session's first search with no cache, with the JSON index, and with the pack."""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from navigator.benchmarks.bench_scanner import add_latency as add_stat_latency
+from navigator.core.index import CACHE_DIR_NAME, INDEX_FILE_NAME, NAMED_LOCATIONS_FILE
+from navigator.core.navigator import FileNavigator
+from navigator.core.pack import PACK_FILE_NAME
+
+
+def add_latency(seconds):
+    """Like bench_scanner's, but listing a directory is a round trip too, as it is on a network mount."""
+    add_stat_latency(seconds)
+    real_scandir = os.scandir
+
+    def slow_scandir(*args, **kwargs):
+        time.sleep(seconds)
+        return real_scandir(*args, **kwargs)
+
+    os.scandir = slow_scandir
+
+
+def first_search(base_dir, query, repeat, before=None):
+    """Best time to create a FileNavigator and answer one search, and the result."""
+    best, result = None, None
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        navigator = FileNavigator(base_dir)
+        result = navigator.search_locations(query)
+        elapsed = time.perf_counter() - start
+        if navigator.pack is not None:
+            navigator.pack.close()
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base_dir', nargs='?', default=project_root)
+    parser.add_argument('--query', default='lake')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='simulated per-file round trip, e.g. 1.0 for a typical NFS mount')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Work on a copy so the archive's own cache directory is left alone
+        for entry in os.listdir(args.base_dir):
+            source = os.path.join(args.base_dir, entry)
+            if entry.startswith('chapter_'):
+                shutil.copytree(source, os.path.join(temp_dir, entry))
+            elif entry == NAMED_LOCATIONS_FILE:
+                shutil.copy2(source, temp_dir)
+        cache_dir = os.path.join(temp_dir, CACHE_DIR_NAME)
+        index_path = os.path.join(cache_dir, INDEX_FILE_NAME)
+        pack_path = os.path.join(cache_dir, PACK_FILE_NAME)
+
+        start = time.perf_counter()
+        FileNavigator(temp_dir).build_pack()
+        print(f'build pack               {(time.perf_counter() - start) * 1000:8.1f} ms  '
+              f'{os.path.getsize(pack_path) / 1024:.1f} KiB')
+        os.rename(pack_path, pack_path + '.keep')
+        if args.latency_ms > 0:
+            add_latency(args.latency_ms / 1000.0)
+
+        def no_cache():
+            if os.path.exists(index_path):
+                os.unlink(index_path)
+
+        cold, expected = first_search(temp_dir, args.query, args.repeat, no_cache)
+        print(f'no cache (walk + parse)  {cold * 1000:8.1f} ms')
+        warm, result = first_search(temp_dir, args.query, args.repeat)
+        print(f'JSON index + walk        {warm * 1000:8.1f} ms  ({cold / warm:.1f}x)')
+        os.rename(pack_path + '.keep', pack_path)
+        packed, packed_result = first_search(temp_dir, args.query, args.repeat)
+        print(f'mapped pack              {packed * 1000:8.1f} ms  ({cold / packed:.1f}x)')
+        assert result == expected == packed_result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Measure bytes sent to the terminal per keystroke, full repaint vs frame diffing."""
+import argparse
+import io
+import os
+import sys
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from blessed import Terminal
+from navigator.core.navigator import FileNavigator
+from navigator.tui.navigator import NavigatorTUI
+from navigator.tui.screen import ScreenBuffer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base_dir', nargs='?', default=project_root)
+    parser.add_argument('--directory', default=os.path.join('chapter_1', 'season_9'))
+    parser.add_argument('--height', type=int, default=40)
+    parser.add_argument('--width', type=int, default=120)
+    args = parser.parse_args()
+
+    term = Terminal(kind='xterm-256color', force_styling=True)
+    navigator = FileNavigator(args.base_dir)
+    navigator.current_path = os.path.join(navigator.base_dir, args.directory)
+    navigator.update_entries()
+
+    for label, repaint in (('full repaint', True), ('frame diff', False)):
+        tui = NavigatorTUI(navigator)
+        tui.screen = ScreenBuffer(term, out=io.StringIO())
+        tui.draw(args.height, args.width)
+        first = tui.screen.frame_bytes
+        sizes = []
+        # Walk the cursor down the listing and back up, one frame per keystroke
+        steps = list(range(1, len(navigator.entries))) + list(range(len(navigator.entries) - 2, -1, -1))
+        for selected in steps:
+            tui.selected = selected
+            if repaint:
+                tui.screen.invalidate()
+            tui.draw(args.height, args.width)
+            sizes.append(tui.screen.frame_bytes)
+        average = sum(sizes) / max(1, len(sizes))
+        print(f'{label:<13} first frame {first:6d} B, {len(sizes)} cursor moves, {average:8.1f} B/frame')
+
+
+if __name__ == '__main__':
+    main()
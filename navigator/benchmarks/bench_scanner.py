@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Compare serial and parallel wall-clock time for a full archive scan + parse."""
+import argparse
+import os
+import sys
+import time
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from navigator.core.scanner import ArchiveScanner, default_workers
+
+
+def time_scan(scanner, repeat):
+    """Return the best wall-clock time of repeat full scans, and the number of files seen."""
+    best = None
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        entries = scanner.scan()
+        scanner.load([rel for rel, _ in entries])
+        elapsed = time.perf_counter() - start
+        count = len(entries)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, count
+
+
+def add_latency(seconds):
+    """Emulate a network mount by delaying every stat and open by a fixed round trip."""
+    import builtins
+    import navigator.core.scanner as scanner_module
+
+    real_stat, real_open = os.stat, builtins.open
+
+    def slow_stat(*args, **kwargs):
+        time.sleep(seconds)
+        return real_stat(*args, **kwargs)
+
+    def slow_open(*args, **kwargs):
+        time.sleep(seconds)
+        return real_open(*args, **kwargs)
+
+    scanner_module.os.stat = slow_stat
+    builtins.open = slow_open
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base_dir', nargs='?', default=project_root)
+    parser.add_argument('--workers', type=int, default=default_workers())
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='simulated per-file round trip, e.g. 1.0 for a typical NFS mount')
+    args = parser.parse_args()
+    if args.latency_ms > 0:
+        add_latency(args.latency_ms / 1000.0)
+
+    configs = [
+        ('serial', ArchiveScanner(args.base_dir, workers=1)),
+        (f'threads x{args.workers}', ArchiveScanner(args.base_dir, workers=args.workers)),
+        (f'threads x{args.workers} + processes', ArchiveScanner(args.base_dir, workers=args.workers, use_processes=True)),
+    ]
+    baseline = None
+    for label, scanner in configs:
+        elapsed, count = time_scan(scanner, args.repeat)
+        baseline = baseline or elapsed
+        print(f'{label:<32} {count:4d} files  {elapsed * 1000:8.2f} ms  ({baseline / elapsed:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Time substring search on a synthetic archive scaled up from the real one."""
+import argparse
+import os
+import sys
+import time
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from navigator.core.index import LocationIndex
+
+
+class FakeStat:
+    st_mtime_ns = 0
+    st_size = 0
+
+
+def build_synthetic_index(base_dir, scale):
+    """Copy every real version `scale` times, giving each copy its own location names."""
+    real = LocationIndex(base_dir)
+    real.ensure_loaded()
+    index = LocationIndex(base_dir, cache_path=os.devnull)
+    index.loaded = True
+    for copy in range(scale):
+        for rel, entry in real.files.items():
+            parts = rel.split(os.sep)
+            parts[0] = f'{parts[0]}_{copy}'
+            names = [f'{name} {copy}' if copy else name for name in entry['locations']]
+            index._add(os.sep.join(parts), FakeStat, names)
+    return index
+
+
+def time_queries(search, queries, repeat):
+    """Return the mean time per query in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            search(query)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(queries))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base_dir', nargs='?', default=project_root)
+    parser.add_argument('--scale', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    index = build_synthetic_index(args.base_dir, args.scale)
+    print(f'{len(index.files)} files, {len(index.postings)} distinct location names')
+
+    queries = ['tilted', 'Pleasant Park', 'lake', 'zzz', 'sanguine suites 42', 'ow']
+
+    def linear(substring):
+        substring = substring.lower()
+        return [name for name in index.postings if substring in name.lower()]
+
+    print(f'linear scan     {time_queries(linear, queries, args.repeat):8.3f} ms/query')
+    print(f'trigram names   {time_queries(index.names.search, queries, args.repeat):8.3f} ms/query')
+    print(f'full search     {time_queries(index.search, queries, args.repeat):8.3f} ms/query (incl. grouping versions)')
+
+
+if __name__ == '__main__':
+    main()
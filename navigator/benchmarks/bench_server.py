@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Load-test the HTTP API with many concurrent keep-alive connections and report throughput and latency."""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from urllib.parse import quote, urlsplit
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+MAIN = os.path.join(project_root, 'navigator', 'main.py')
+
+# (label, path, extra headers); '{etag}' is replaced by the map's ETag once it is known
+MIX = [
+    ('api at', '/api/at?version=26.10', {}),
+    ('api locations', '/api/locations?q=lake', {}),
+    ('api diff', '/api/diff?old=26.00&new=26.10', {}),
+    ('api timeline', '/api/timeline?name=' + quote('Tilted Towers'), {}),
+    ('api fuzzy', '/api/fuzzy?q=tilted+towrs', {}),
+    ('map 304', '/maps/chapter_4/season_4/26.10', {'If-None-Match': '{etag}'}),
+    ('map range', '/maps/chapter_4/season_4/26.10', {'Range': 'bytes=0-65535'}),
+    ('map full', '/maps/chapter_4/season_4/26.10', {}),
+]
+
+
+async def request(reader, writer, host, path, headers):
+    lines = [f'GET {path} HTTP/1.1', f'Host: {host}'] + [f'{k}: {v}' for k, v in headers.items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    status = int(head[0].split(' ')[1])
+    response = {}
+    for line in head[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            response[name.strip().lower()] = value.strip()
+    length = int(response.get('content-length', 0))
+    if status != 304 and length:
+        await reader.readexactly(length)
+    else:
+        length = 0
+    return status, response, length
+
+
+async def load(host, port, connections, total, mix):
+    """Spread total requests over connections and return (per-request latencies by label, statuses, bytes, seconds)."""
+    latencies = {label: [] for label, _, _ in mix}
+    statuses, received = Counter(), [0]
+    counter = iter(range(total))
+
+    async def client(offset):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for n in counter:
+                label, path, headers = mix[(n + offset) % len(mix)]
+                start = time.perf_counter()
+                status, _, length = await request(reader, writer, f'{host}:{port}', path, headers)
+                latencies[label].append(time.perf_counter() - start)
+                statuses[status] += 1
+                received[0] += length
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client(i) for i in range(connections)), return_exceptions=True)
+    seconds = time.perf_counter() - start
+    for result in results:
+        if isinstance(result, Exception):
+            statuses[type(result).__name__] += 1
+    return latencies, statuses, received[0], seconds
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+async def run(host, port, connections, total):
+    reader, writer = await asyncio.open_connection(host, port)
+    _, headers, _ = await request(reader, writer, f'{host}:{port}', MIX[-1][1], {})
+    writer.close()
+    mix = [(label, path, {k: v.replace('{etag}', headers.get('etag', '')) for k, v in extra.items()})
+           for label, path, extra in MIX]
+
+    latencies, statuses, received, seconds = await load(host, port, connections, total, mix)
+    done = sum(len(values) for values in latencies.values())
+    print(f'{connections} connections, {done} requests in {seconds:.2f} s: {done / seconds:.0f} requests/s, '
+          f'{received / seconds / 1024 / 1024:.1f} MiB/s')
+    print('status: ' + ', '.join(f'{status} x{count}' for status, count in sorted(statuses.items(), key=str)))
+    print(f'{"":16} {"p50":>8} {"p99":>8} {"max":>8}  (ms)')
+    for label, values in latencies.items():
+        print(f'{label:16} {percentile(values, 0.5) * 1000:8.2f} {percentile(values, 0.99) * 1000:8.2f} '
+              f'{max(values, default=0) * 1000:8.2f}')
+    all_values = [value for values in latencies.values() for value in values]
+    print(f'{"all":16} {percentile(all_values, 0.5) * 1000:8.2f} {percentile(all_values, 0.99) * 1000:8.2f} '
+          f'{max(all_values, default=0) * 1000:8.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', help='server to test, e.g. http://127.0.0.1:8000 (default: start one)')
+    parser.add_argument('--base-dir', default=project_root, help='archive for the server started here')
+    parser.add_argument('--connections', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        server = subprocess.Popen([sys.executable, MAIN, 'serve', '--port', '0', '--base-dir', args.base_dir],
+                                  stdout=subprocess.PIPE, text=True)
+        line = server.stdout.readline()
+        if not line.startswith('Serving'):
+            server.kill()
+            sys.exit('Error: the server did not start')
+        url = urlsplit(line.rsplit(' ', 1)[1].strip())
+        host, port = url.hostname, url.port
+    try:
+        asyncio.run(run(host, port, args.connections, args.requests))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Time bitset set queries (union, intersection, season summaries) over the archive."""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from navigator.core.bitsets import LocationMatrix, popcount
+from navigator.core.navigator import FileNavigator
+
+
+def timed(label, fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - start) * 1e6 / repeat
+    print(f'  {label:<36} {elapsed:9.2f} us')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base_dir', nargs='?', default=project_root)
+    parser.add_argument('--locations', type=int, default=20000, help='size of the synthetic matrix')
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+
+    navigator = FileNavigator(args.base_dir)
+    matrix = navigator.location_matrix()
+    catalog = matrix.catalog
+    seasons = list(catalog.by_season)
+    rng = random.Random(1)
+    presence = {f'Location {i}': set(rng.sample(range(len(catalog)), rng.randint(1, 20))) for i in range(args.locations)}
+
+    for label, m in (('real archive', matrix), ('synthetic', LocationMatrix(catalog, presence))):
+        print(f'{label}: {len(m)} locations x {len(m.columns)} updates')
+        everything = range(len(m.columns))
+        timed('union of every update', lambda: m.union(everything), args.repeat)
+        timed('intersection of every update', lambda: m.intersection(everything), args.repeat)
+        timed('popcount of the union', lambda: popcount(m.union(everything)), args.repeat)
+        timed('season summary', lambda: m.season_summary(rng.choice(seasons)), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Time to first page and memory for viewing a large file, read_file vs the mapped view."""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from navigator.core.navigator import FileNavigator
+
+
+def measure(label, action):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'{label:<28} {elapsed * 1000:9.2f} ms  peak {peak / 1e6:8.2f} MB')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=1_000_000)
+    parser.add_argument('--page', type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'big.json')
+        with open(path, 'w') as f:
+            f.write('{\n  "locations": [\n')
+            f.writelines(f'    "Location {i}",\n' for i in range(args.lines))
+            f.write('    "Last"\n  ]\n}\n')
+        print(f'{args.lines} lines, {os.path.getsize(path) / 1e6:.1f} MB')
+        navigator = FileNavigator(temp_dir)
+
+        lines = measure('read_file + first page', lambda: navigator.read_file(path)[:args.page])
+        del lines
+        view = navigator.open_file(path)
+        measure('open_file + first page', lambda: view[0:args.page])
+        measure('jump to end (builds index)', lambda: view[len(view) - args.page:len(view)])
+        measure('page from the middle', lambda: view[args.lines // 2:args.lines // 2 + args.page])
+        view.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+Headless queries against the archive, printed as JSON.
+
+    main.py [query] <kind> <args...> [--base-dir DIR] [--ndjson] [--pretty] [--workers N]
+    main.py batch [--base-dir DIR] < queries.txt
+    main.py serve [--base-dir DIR] [--host HOST] [--port PORT]
+
+Nothing here imports blessed or Pillow. The core modules a query needs are imported
+when it runs, so the cost of a lookup is the interpreter, json and the index load.
+"""
+import json
+import os
+import sys
+
+USAGE = __doc__.strip()
+
+
+class UsageError(ValueError):
+    """A query given the wrong number of arguments, or an argument that is not a valid value."""
+
+
+def _season(chapter_season):
+    return chapter_season.replace(os.sep, '/')
+
+
+def _set_diff(diff):
+    return {'added': diff.added, 'removed': diff.removed, 'retained': len(diff.retained)}
+
+
+def _locations(navigator, substring):
+    """Updates listing a location whose name contains substring"""
+    return [{'season': _season(cs), 'versions': versions} for cs, versions in navigator.search_locations(substring)]
+
+
+def _names(navigator, substring):
+    """Distinct location names containing substring"""
+    return sorted(navigator.match_location_names(substring))
+
+
+def _fuzzy(navigator, query, limit='10'):
+    """Closest location names to a misspelt one"""
+    try:
+        count = int(limit)
+    except ValueError:
+        count = 0
+    if count < 1:
+        raise UsageError(f"limit must be a positive integer, not '{limit}'")
+    return [{'name': name, 'distance': distance} for name, distance in navigator.fuzzy_search_locations(query, count)]
+
+
+def _at(navigator, version):
+    """Locations on the map at an update"""
+    return navigator.locations_at(version)
+
+
+def _between(navigator, start, end):
+    """Locations on the map at any point between two updates, with their spans"""
+    return [{'name': name, 'spans': [list(span) for span in spans]}
+            for name, spans in navigator.locations_between(start, end)]
+
+
+def _timeline(navigator, name):
+    """Spans of updates a location was on the map for"""
+    spans = navigator.location_lifetimes().lifetimes.get(name)
+    if spans is None:
+        raise ValueError(f"Unknown location '{name}'")
+    catalog = navigator.version_catalog()
+    return {'name': name, 'spans': [[catalog.label(start), catalog.label(end)] for start, end in spans]}
+
+
+def _versions(navigator):
+    """Every update folder with location data, oldest first"""
+    return [{'season': _season(entry.chapter_season), 'version': entry.version} for entry in navigator.version_catalog()]
+
+
+def _season_summary(navigator, chapter_season):
+    """A season's locations as all, constant, new, last_seen and unique"""
+    summary = navigator.season_summary(chapter_season)
+    if summary is None:
+        raise ValueError(f"No updates in {chapter_season}")
+    return summary
+
+
+def _diff(navigator, old, new):
+    """Locations and categories added and removed between two updates"""
+    diff = navigator.diff_versions(old, new)
+    return {
+        'old': f'{_season(diff.old.chapter_season)}/{diff.old.version}',
+        'new': f'{_season(diff.new.chapter_season)}/{diff.new.version}',
+        'locations': _set_diff(diff.locations),
+        'categories': {category: _set_diff(change) for category, change in diff.categories.items()},
+    }
+
+
+def _image(navigator, folder):
+    """Header of an update's map image"""
+    info = navigator.image_info(os.path.join(navigator.base_dir, os.path.normpath(folder)))
+    if info is None:
+        raise ValueError(f"No map image in {folder}")
+    return info
+
+
+# kind -> (handler, argument names); the handler's docstring is its help line
+QUERIES = {
+    'locations': (_locations, 'SUBSTRING'),
+    'names': (_names, 'SUBSTRING'),
+    'fuzzy': (_fuzzy, 'NAME [LIMIT]'),
+    'at': (_at, 'VERSION'),
+    'between': (_between, 'START END'),
+    'timeline': (_timeline, 'NAME'),
+    'versions': (_versions, ''),
+    'season': (_season_summary, 'chapter_x/season_y'),
+    'diff': (_diff, 'OLD NEW'),
+    'image': (_image, 'chapter_x/season_y/VERSION'),
+}
+COMMANDS = set(QUERIES) | {'query', 'batch', 'serve'}
+
+
+def usage():
+    lines = [USAGE, '', 'Queries:']
+    for kind, (handler, args) in QUERIES.items():
+        lines.append(f'  {kind} {args}'.ljust(40) + handler.__doc__)
+    return '\n'.join(lines)
+
+
+def run_query(navigator, words):
+    """Run one query given as words, e.g. ['at', '26.10'], and return its JSON-ready result."""
+    if words and words[0] == 'query':
+        words = words[1:]
+    if not words or words[0] not in QUERIES:
+        raise ValueError(f"Unknown query {words[0]!r}" if words else 'Empty query')
+    handler, args = QUERIES[words[0]]
+    names = args.split()
+    required = sum(1 for name in names if not name.startswith('['))
+    if not required <= len(words) - 1 <= len(names):
+        raise UsageError(f'Usage: {words[0]} {args}')
+    return handler(navigator, *words[1:])
+
+
+def parse_line(line):
+    """Words of one batch line: a JSON array, or shell-style words."""
+    line = line.strip()
+    if line.startswith('['):
+        words = json.loads(line)
+        if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+            raise ValueError('a JSON query must be an array of strings')
+        return words
+    import shlex
+    return shlex.split(line)
+
+
+def parse_args(argv, default_base_dir):
+    options = {'base_dir': default_base_dir, 'ndjson': False, 'pretty': False, 'workers': 1,
+               'host': '127.0.0.1', 'port': 8000}
+    words = []
+    args = iter(argv)
+    for arg in args:
+        if arg in ('--base-dir', '--workers', '--host', '--port'):
+            value = next(args, None)
+            if value is None:
+                raise ValueError(f'{arg} needs a value')
+            try:
+                options[arg[2:].replace('-', '_')] = int(value) if arg in ('--workers', '--port') else value
+            except ValueError:
+                raise ValueError(f'{arg} needs a number')
+        elif arg in ('--ndjson', '--pretty'):
+            options[arg[2:]] = True
+        elif arg in ('-h', '--help'):
+            options['help'] = True
+        else:
+            words.append(arg)
+    return words, options
+
+
+def emit(result, out, ndjson=False, pretty=False):
+    if ndjson and isinstance(result, list):
+        for item in result:
+            out.write(json.dumps(item) + '\n')
+    else:
+        out.write(json.dumps(result, indent=2 if pretty else None) + '\n')
+
+
+def run_batch(navigator, lines, out):
+    """Answer one query per line as NDJSON, reporting failures inline. Returns the number of failures."""
+    failures = 0
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        words = None
+        try:
+            words = parse_line(line)
+            record = {'query': words, 'result': run_query(navigator, words)}
+        except ValueError as e:
+            record = {'query': words if words is not None else line.strip(), 'error': str(e)}
+            failures += 1
+        out.write(json.dumps(record) + '\n')
+        out.flush()
+    return failures
+
+
+def main(argv, default_base_dir, out=None, stdin=None):
+    """Run the CLI on argv (without the program name) and return the exit status."""
+    out = out or sys.stdout
+    try:
+        words, options = parse_args(argv, default_base_dir)
+    except ValueError as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 2
+    if options.get('help') or not words:
+        print(usage(), file=out)
+        return 0
+    if not os.path.isdir(options['base_dir']):
+        print(f"Error: Base directory {options['base_dir']} does not exist or is not a directory.", file=sys.stderr)
+        return 1
+
+    from navigator.core.navigator import FileNavigator
+    # One worker by default: a single lookup on a local disk is faster without a pool
+    navigator = FileNavigator(options['base_dir'], workers=options['workers'])
+    if words[0] == 'batch':
+        return 1 if run_batch(navigator, stdin or sys.stdin, out) else 0
+    if words[0] == 'serve':
+        from navigator.web.server import serve
+        return serve(navigator, options['host'], options['port'])
+    try:
+        result = run_query(navigator, words)
+    except ValueError as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 1
+    emit(result, out, options['ndjson'], options['pretty'])
+    return 0
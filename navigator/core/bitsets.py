@@ -0,0 +1,135 @@
+if hasattr(int, 'bit_count'):
+    def popcount(mask):
+        """Number of set bits in a non-negative int."""
+        return mask.bit_count()
+else:
+    def popcount(mask):
+        """Number of set bits in a non-negative int (pre-3.10 fallback)."""
+        return bin(mask).count('1')
+
+
+def iter_bits(mask):
+    """Yield the positions of the set bits in mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def mask_of(positions):
+    """Return an int with the given bit positions set."""
+    mask = 0
+    for position in positions:
+        mask |= 1 << position
+    return mask
+
+
+class LocationMatrix:
+    """
+    Locations x update folders, packed into Python int bitsets.
+
+    Each column is an int with one bit per location (the locations listed in that
+    update's JSON), each row an int with one bit per catalog ordinal (the updates a
+    location appears in). Unions, intersections and differences across any number of
+    updates are then a few big-int operations, not a pass over JSON lists.
+    """
+
+    def __init__(self, catalog, presence):
+        # presence: location name -> set of catalog ordinals whose JSON lists it
+        self.catalog = catalog
+        self.names = sorted(presence)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.rows = [0] * len(self.names)
+        self.columns = [0] * len(catalog)
+        for name, ordinals in presence.items():
+            bit = 1 << self.ids[name]
+            for ordinal in ordinals:
+                self.columns[ordinal] |= bit
+            self.rows[self.ids[name]] = mask_of(ordinals)
+        # Updates with location data; empty JSONs say nothing about what was on the map
+        self.observed = mask_of(o for o, column in enumerate(self.columns) if column)
+        # prefix[i] is the union of columns[:i] and suffix[i] of columns[i:], so "before" and
+        # "after" queries never loop over the catalog
+        self.prefix = [0]
+        for column in self.columns:
+            self.prefix.append(self.prefix[-1] | column)
+        self.suffix = [0]
+        for column in reversed(self.columns):
+            self.suffix.append(self.suffix[-1] | column)
+        self.suffix.reverse()
+
+    def __len__(self):
+        return len(self.names)
+
+    def mask(self, names):
+        """Return the location mask for names, ignoring unknown ones."""
+        return mask_of(self.ids[name] for name in names if name in self.ids)
+
+    def decode(self, mask):
+        """Return the sorted location names in a location mask."""
+        return [self.names[i] for i in iter_bits(mask)]
+
+    def column(self, ordinal):
+        return self.columns[ordinal]
+
+    def row(self, name):
+        """Return the ordinal mask of the updates listing name (0 if unknown)."""
+        i = self.ids.get(name)
+        return 0 if i is None else self.rows[i]
+
+    def observed_ordinals(self, ordinals):
+        """Keep the ordinals whose update has location data."""
+        return [o for o in ordinals if self.observed >> o & 1]
+
+    def union(self, ordinals):
+        """Locations listed in any of the given updates."""
+        mask = 0
+        for ordinal in ordinals:
+            mask |= self.columns[ordinal]
+        return mask
+
+    def intersection(self, ordinals):
+        """Locations listed in every given update that has location data."""
+        mask = None
+        for ordinal in self.observed_ordinals(ordinals):
+            mask = self.columns[ordinal] if mask is None else mask & self.columns[ordinal]
+            if not mask:
+                break
+        return mask or 0
+
+    @staticmethod
+    def difference(mask, *others):
+        """Locations in mask and in none of the others."""
+        for other in others:
+            mask &= ~other
+        return mask
+
+    def before(self, ordinal):
+        """Locations listed in any update before ordinal."""
+        return self.prefix[ordinal]
+
+    def after(self, ordinal):
+        """Locations listed in any update after ordinal."""
+        return self.suffix[ordinal + 1]
+
+    def season_summary(self, chapter_season):
+        """
+        Return {name: location mask} describing one chapter/season, or None if it has no updates.
+
+        'all': listed in any of its updates, 'constant': in every update with data,
+        'new': never listed before the season, 'last_seen': never listed after it (empty
+        while no later update has data), 'unique': not listed in any other season.
+        """
+        ordinals = self.catalog.season_ordinals(chapter_season)
+        if not ordinals:
+            return None
+        everything = self.union(ordinals)
+        before = self.before(ordinals[0])
+        after = self.after(ordinals[-1])
+        return {
+            'all': everything,
+            'constant': self.intersection(ordinals),
+            'new': self.difference(everything, before),
+            'last_seen': self.difference(everything, after) if self.observed >> (ordinals[-1] + 1) else 0,
+            'unique': self.difference(everything, before, after),
+        }
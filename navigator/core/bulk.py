@@ -0,0 +1,116 @@
+import os
+from collections import namedtuple
+from navigator.core.documents import dumps_wrapped
+from navigator.core.index import NAMED_LOCATIONS_FILE
+from navigator.core.versions import version_key
+
+# What an archive-wide rename (new_name set) or removal (new_name None) of a location
+# changes: the per-version JSONs that list it, as relative paths, and the versions
+# named_locations_through_updates.json records for it (None if it has no entry)
+LocationEdit = namedtuple('LocationEdit', 'name new_name files reference_versions')
+
+
+def _dedupe(items):
+    seen = set()
+    return [item for item in items if not (item in seen or seen.add(item))]
+
+
+def replace_location(data, name, new_name=None):
+    """
+    Rename (or with new_name None, remove) a location in a parsed per-version JSON, in
+    place. Returns whether anything changed. Sorted location lists stay sorted.
+    """
+    if isinstance(data, dict) and isinstance(data.get('locations'), list):
+        locations = data['locations']
+        if name not in locations:
+            return False
+        was_sorted = locations == sorted(locations, key=str)
+        if new_name is None:
+            updated = [loc for loc in locations if loc != name]
+        else:
+            updated = _dedupe(new_name if loc == name else loc for loc in locations)
+            if was_sorted:
+                updated.sort(key=str)
+        data['locations'] = updated
+        return True
+    if isinstance(data, list):
+        # List of {"city": ..., "x": ..., "y": ...} markers
+        markers = [item for item in data if isinstance(item, dict) and item.get('city') == name]
+        if not markers:
+            return False
+        if new_name is None:
+            data[:] = [item for item in data if not (isinstance(item, dict) and item.get('city') == name)]
+        else:
+            for item in markers:
+                item['city'] = new_name
+        return True
+    return False
+
+
+def replace_reference_entry(data, name, new_name=None):
+    """
+    Rename or remove a city in the parsed named_locations_through_updates.json, in place.
+    Renaming onto a city that already has an entry merges their versions.
+    """
+    if not isinstance(data, list):
+        return False
+    entries = [item for item in data if isinstance(item, dict) and item.get('city') == name]
+    if not entries:
+        return False
+    target = None
+    if new_name is not None:
+        target = next((item for item in data if isinstance(item, dict) and item.get('city') == new_name), None)
+    if new_name is not None and target is None:
+        target = entries.pop(0)
+        target['city'] = new_name
+    if target is not None:
+        versions = list(target.get('versions', []))
+        for item in entries:
+            versions.extend(item.get('versions', []))
+        target['versions'] = sorted(_dedupe(versions), key=version_key)
+    data[:] = [item for item in data if not any(item is entry for entry in entries)]
+    return True
+
+
+def plan_location_edit(index, name, new_name=None):
+    """Return the LocationEdit for renaming or removing name, from the index alone."""
+    index.ensure_loaded()
+    files = sorted(index.postings.get(name, ()))
+    reference = index.load_reference()
+    reference_versions = list(reference[name]) if name in reference else None
+    return LocationEdit(name, new_name, files, reference_versions)
+
+
+def apply_location_edit(index, documents, name, new_name=None, dry_run=False):
+    """
+    Rename or remove name in every per-version JSON that lists it and in
+    named_locations_through_updates.json, all files or none.
+
+    The affected files come from the location index, so nothing else is read. All edits
+    are saved in one DocumentStore batch, which writes the files in parallel and commits
+    them together. With dry_run nothing is loaded or written; the LocationEdit describing
+    the change is returned either way.
+    """
+    if new_name is not None:
+        new_name = new_name.strip()
+        if not new_name:
+            raise ValueError('the new location name is empty')
+        if new_name == name:
+            return LocationEdit(name, new_name, [], None)
+    plan = plan_location_edit(index, name, new_name)
+    if dry_run:
+        return plan
+    changed = []
+    with documents.batch():
+        for rel in plan.files:
+            path = os.path.join(index.base_dir, rel)
+            data = documents.load(path)
+            if replace_location(data, name, new_name):
+                documents.save(path, data)
+                changed.append(rel)
+        if plan.reference_versions is not None:
+            path = os.path.join(index.base_dir, NAMED_LOCATIONS_FILE)
+            data = documents.load(path)
+            if replace_reference_entry(data, name, new_name):
+                documents.save(path, data, serializer=dumps_wrapped)
+    return plan._replace(files=changed)
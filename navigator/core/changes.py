@@ -0,0 +1,301 @@
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from navigator.core.documents import write_atomic
+from navigator.core.images import update_folder
+from navigator.core.index import CACHE_DIR_NAME
+from navigator.core.scanner import find_map_images
+from navigator.core.versions import VersionCatalog
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:  # NumPy and Pillow are only needed to compare maps
+    np = Image = None
+
+CHANGES_FORMAT = 1
+CHANGES_FILE_NAME = 'map_changes.json'
+COMPARE_SIZE = 512     # both maps are decoded to this square size before comparing
+BLOCK_SIZE = 16        # pixels of COMPARE_SIZE per block, so a 32x32 grid of blocks
+BLOCK_THRESHOLD = 10.0  # mean absolute grey-level difference above which a block has changed
+HASH_SIZE = 8          # the perceptual hash is HASH_SIZE x HASH_SIZE bits
+
+# Outcome of compare_timeline(): {pair key: result} for pairs compared and served from
+# the cache, {pair key: error message} for pairs that could not be, and wall time
+ChangeReport = namedtuple('ChangeReport', 'compared cached failed seconds')
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError('comparing maps needs NumPy and Pillow: pip install numpy Pillow')
+
+
+def pair_key(older, newer):
+    return f'{older}|{newer}'
+
+
+def _dct_matrix(n):
+    """Orthonormal DCT-II basis, so dct(x) = m @ x and a 2-D DCT is m @ x @ m.T."""
+    k = np.arange(n)[:, None]
+    m = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    m[0] /= np.sqrt(2)
+    return m
+
+
+def load_grey(path, size=COMPARE_SIZE):
+    """Decode the image at path as a size x size float32 grey-level array."""
+    require_numpy()
+    with Image.open(path) as image:
+        # JPEGs are decoded at 1/2, 1/4 or 1/8 scale by the DCT, so a 4096 px map never
+        # needs a full-resolution buffer
+        image.draft('L', (size, size))
+        image = image.convert('L')
+        if image.size != (size, size):
+            image = image.resize((size, size), Image.BILINEAR)
+        return np.asarray(image, dtype=np.float32)
+
+
+def perceptual_hash(grey, hash_size=HASH_SIZE):
+    """
+    64-bit pHash of a grey-level array, as a hex string: the low frequencies of a 32x32
+    DCT, each set if above their median. Maps that look alike have hashes a few bits apart.
+    """
+    n = hash_size * 4
+    height, width = grey.shape
+    # Average down to n x n; the compare size is a multiple of it
+    small = grey[:height - height % n, :width - width % n]
+    small = small.reshape(n, small.shape[0] // n, n, small.shape[1] // n).mean(axis=(1, 3))
+    m = _dct_matrix(n)
+    low = (m @ small @ m.T)[:hash_size, :hash_size].ravel()
+    bits = low > np.median(low[1:])  # the DC term would skew the median
+    return '%0*x' % (hash_size * hash_size // 4, int(''.join('1' if b else '0' for b in bits), 2))
+
+
+def hash_distance(a, b):
+    """Number of bits that differ between two perceptual hashes."""
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+
+def block_differences(older, newer, block=BLOCK_SIZE):
+    """Mean absolute difference of each block x block tile of two equal-sized arrays."""
+    rows, cols = older.shape[0] // block, older.shape[1] // block
+    diff = np.abs(older[:rows * block, :cols * block] - newer[:rows * block, :cols * block])
+    return diff.reshape(rows, block, cols, block).mean(axis=(1, 3))
+
+
+def changed_regions(mask):
+    """Bounding boxes (row0, col0, row1, col1), exclusive, of the 8-connected groups of True cells."""
+    rows, cols = mask.shape
+    seen = np.zeros_like(mask, dtype=bool)
+    regions = []
+    for r, c in zip(*np.nonzero(mask)):
+        if seen[r, c]:
+            continue
+        seen[r, c] = True
+        stack = [(r, c)]
+        top, left, bottom, right = r, c, r, c
+        while stack:
+            y, x = stack.pop()
+            top, left, bottom, right = min(top, y), min(left, x), max(bottom, y), max(right, x)
+            for ny in range(max(0, y - 1), min(rows, y + 2)):
+                for nx in range(max(0, x - 1), min(cols, x + 2)):
+                    if mask[ny, nx] and not seen[ny, nx]:
+                        seen[ny, nx] = True
+                        stack.append((ny, nx))
+        regions.append((int(top), int(left), int(bottom) + 1, int(right) + 1))
+    return regions
+
+
+@lru_cache(maxsize=2)
+def _analyse(path, mtime, size, compare_size):
+    # Consecutive pairs share an image, so a worker keeps its last two decodes;
+    # mtime and size are part of the key so an edited image is decoded again
+    grey = load_grey(path, compare_size)
+    with Image.open(path) as image:
+        dimensions = image.size
+    return grey, perceptual_hash(grey), dimensions
+
+
+def compare_maps(older, newer, compare_size=COMPARE_SIZE, block=BLOCK_SIZE, threshold=BLOCK_THRESHOLD):
+    """
+    Compare two map images and return a dict of:
+
+    similarity      fraction of blocks that did not change, 0 to 1
+    hash_distance   bits between the maps' perceptual hashes, 0 to 64
+    changed_blocks  number of blocks whose mean difference exceeds threshold
+    regions         [[x0, y0, x1, y1]] boxes around the changed blocks, in pixels of newer
+    older_hash, newer_hash, grid
+
+    Both images are decoded to compare_size square, so maps of different resolutions
+    compare. Runs in a worker of compare_timeline().
+    """
+    require_numpy()
+    analysed = []
+    for path in (older, newer):
+        st = os.stat(path)
+        analysed.append(_analyse(path, st.st_mtime_ns, st.st_size, compare_size))
+    (a, a_hash, _), (b, b_hash, (width, height)) = analysed
+    mask = block_differences(a, b, block) > threshold
+    grid_rows, grid_cols = mask.shape
+    regions = []
+    for top, left, bottom, right in changed_regions(mask):
+        regions.append([left * width // grid_cols, top * height // grid_rows,
+                        right * width // grid_cols, bottom * height // grid_rows])
+    changed = int(mask.sum())
+    return {
+        'similarity': round(1 - changed / mask.size, 4),
+        'hash_distance': hash_distance(a_hash, b_hash),
+        'changed_blocks': changed,
+        'regions': regions,
+        'older_hash': a_hash,
+        'newer_hash': b_hash,
+        'grid': [grid_cols, grid_rows],
+    }
+
+
+def _compare_job(job):
+    older, newer, settings = job
+    return compare_maps(older, newer, *settings)
+
+
+def timeline_pairs(base_dir):
+    """[(older rel image, newer rel image)] for each update and the one with a map before it."""
+    images = {}
+    for rel in find_map_images(base_dir):
+        folder = update_folder(rel)
+        images[(os.path.dirname(folder), os.path.basename(folder))] = rel
+    catalog = VersionCatalog(images)
+    ordered = [images[(entry.chapter_season, entry.version)] for entry in catalog]
+    return list(zip(ordered, ordered[1:]))
+
+
+class MapChanges:
+    """
+    Cached map comparisons between pairs of updates.
+
+    Stored as .navigator_cache/map_changes.json, keyed by pair_key(older, newer) of the
+    rel image paths. Each entry keeps both images' mtime and size and the comparison
+    settings, and is computed again only when one of them changes.
+    """
+
+    def __init__(self, base_dir, cache_path=None, compare_size=COMPARE_SIZE, block=BLOCK_SIZE,
+                 threshold=BLOCK_THRESHOLD):
+        self.base_dir = os.path.abspath(base_dir)
+        self.cache_path = cache_path or os.path.join(self.base_dir, CACHE_DIR_NAME, CHANGES_FILE_NAME)
+        self.settings = [compare_size, block, threshold]
+        self.pairs = {}
+        self.loaded = False
+        self.lock = threading.RLock()
+
+    def load(self):
+        """Read the saved comparisons, ignoring them if missing, corrupt or from another format."""
+        self.pairs = {}
+        self.loaded = True
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get('format') != CHANGES_FORMAT:
+            return False
+        self.pairs = data.get('pairs', {})
+        return True
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            write_atomic(self.cache_path, json.dumps({'format': CHANGES_FORMAT, 'pairs': self.pairs}))
+        except OSError:
+            return False
+        return True
+
+    def _sources(self, older, newer):
+        sources = []
+        for rel in (older, newer):
+            st = os.stat(os.path.join(self.base_dir, rel))
+            sources.append([st.st_mtime_ns, st.st_size])
+        return sources
+
+    def _cached(self, older, newer, sources):
+        entry = self.pairs.get(pair_key(older, newer))
+        if entry and entry.get('sources') == sources and entry.get('settings') == self.settings:
+            return entry
+        return None
+
+    def get(self, older, newer):
+        """Return the comparison of two rel image paths, from the cache when current."""
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            sources = self._sources(older, newer)
+            entry = self._cached(older, newer, sources)
+            if entry is None:
+                entry = compare_maps(os.path.join(self.base_dir, older), os.path.join(self.base_dir, newer),
+                                     *self.settings)
+                entry.update(sources=sources, settings=self.settings)
+                self.pairs[pair_key(older, newer)] = entry
+                self.save()
+            return entry
+
+    def compare_timeline(self, workers=None, progress=None, pairs=None):
+        """
+        Compare each update's map with the previous one (or the given pairs) and return a
+        ChangeReport.
+
+        Pairs are compared on a process pool. At most two per worker are in flight, and a
+        worker keeps only its last two decoded maps at the compare size, so memory stays
+        bounded however long the timeline is. progress, if given, is called with
+        (key, result or None, error or None) as each pair finishes.
+        """
+        require_numpy()
+        start = time.perf_counter()
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            jobs, compared, cached, failed = [], {}, {}, {}
+            for older, newer in (timeline_pairs(self.base_dir) if pairs is None else pairs):
+                key = pair_key(older, newer)
+                try:
+                    sources = self._sources(older, newer)
+                except OSError as e:
+                    failed[key] = str(e)
+                    continue
+                entry = self._cached(older, newer, sources)
+                if entry is not None:
+                    cached[key] = entry
+                else:
+                    jobs.append((key, sources, (os.path.join(self.base_dir, older),
+                                                os.path.join(self.base_dir, newer), self.settings)))
+            if jobs:
+                workers = min(workers or os.cpu_count() or 1, len(jobs))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    # Submitted in timeline order so each worker tends to get neighbouring pairs
+                    queue, running = iter(jobs), {}
+                    while True:
+                        while len(running) < 2 * workers:
+                            job = next(queue, None)
+                            if job is None:
+                                break
+                            running[pool.submit(_compare_job, job[2])] = job
+                        if not running:
+                            break
+                        done, _ = wait(running, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            key, sources, _ = running.pop(future)
+                            try:
+                                entry = future.result()
+                            except Exception as e:
+                                failed[key] = str(e)
+                                if progress is not None:
+                                    progress(key, None, failed[key])
+                                continue
+                            entry.update(sources=sources, settings=self.settings)
+                            self.pairs[key] = compared[key] = entry
+                            if progress is not None:
+                                progress(key, entry, None)
+                self.save()
+        return ChangeReport(compared, cached, failed, time.perf_counter() - start)
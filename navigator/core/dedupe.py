@@ -0,0 +1,166 @@
+import filecmp
+import hashlib
+import json
+import mmap
+import os
+import threading
+from collections import namedtuple
+from navigator.core.documents import write_atomic
+from navigator.core.index import CACHE_DIR_NAME
+from navigator.core.scanner import ArchiveScanner, find_map_images
+
+HASHES_FORMAT = 1
+HASHES_FILE_NAME = 'image_hashes.json'
+
+# Map images with identical content: their sha256 and size, rel paths in archive order,
+# and the bytes hard-linking them would free (size for each copy not yet sharing a file)
+DuplicateGroup = namedtuple('DuplicateGroup', 'digest size paths reclaimable')
+
+
+def hash_file(path):
+    """sha256 of a file, hashed straight from a memory map so no copy of it is read in."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                # hashlib releases the GIL on large buffers, so threads hash in parallel
+                digest.update(data)
+        except ValueError:  # empty files cannot be mapped
+            pass
+    return digest.hexdigest()
+
+
+class ImageHashes:
+    """
+    Content-addressed manifest of the map images, used to find and merge duplicates.
+
+    Stored as .navigator_cache/image_hashes.json, keyed by rel image path. Each entry keeps
+    the mtime and size the hash was taken at, and refresh() hashes only images that are new
+    or changed; the device and inode are refreshed on every run, so images that are
+    already hard links of each other are recognised without being read.
+    """
+
+    def __init__(self, base_dir, cache_path=None, scanner=None):
+        self.base_dir = os.path.abspath(base_dir)
+        self.cache_path = cache_path or os.path.join(self.base_dir, CACHE_DIR_NAME, HASHES_FILE_NAME)
+        self.scanner = scanner or ArchiveScanner(self.base_dir)
+        # rel image -> {'sha256': hex, 'mtime': ns, 'size': bytes, 'file': [dev, ino]}
+        self.files = {}
+        self.lock = threading.RLock()
+
+    def load(self):
+        """Read the saved manifest, ignoring it if missing, corrupt or from another format."""
+        self.files = {}
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get('format') != HASHES_FORMAT:
+            return False
+        self.files = data.get('files', {})
+        return True
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            write_atomic(self.cache_path, json.dumps({'format': HASHES_FORMAT, 'files': self.files}))
+        except OSError:
+            return False
+        return True
+
+    def refresh(self):
+        """Bring the manifest up to date with the tree and return the number of images hashed."""
+        def check(rel):
+            path = os.path.join(self.base_dir, rel)
+            try:
+                st = os.stat(path)
+                entry = {'mtime': st.st_mtime_ns, 'size': st.st_size, 'file': [st.st_dev, st.st_ino]}
+                old = self.files.get(rel)
+                if old and old['mtime'] == st.st_mtime_ns and old['size'] == st.st_size:
+                    entry['sha256'] = old['sha256']
+                    return entry, False
+                entry['sha256'] = hash_file(path)
+            except OSError:
+                return None, False  # removed since the walk, or unreadable
+            return entry, True
+
+        with self.lock:
+            rels = find_map_images(self.base_dir)
+            files, hashed = {}, 0
+            for rel, (entry, fresh) in zip(rels, self.scanner.map(check, rels)):
+                if entry is not None:
+                    files[rel] = entry
+                    hashed += fresh
+            changed = files != self.files
+            self.files = files
+            if changed:
+                self.save()
+            return hashed
+
+    def duplicates(self):
+        """Return the DuplicateGroups, most reclaimable first."""
+        with self.lock:
+            by_content = {}
+            for rel, entry in self.files.items():
+                by_content.setdefault((entry['sha256'], entry['size']), []).append(rel)
+            groups = []
+            for (digest, size), rels in by_content.items():
+                if len(rels) > 1:
+                    copies = len({tuple(self.files[rel]['file']) for rel in rels})
+                    groups.append(DuplicateGroup(digest, size, sorted(rels), size * (copies - 1)))
+            groups.sort(key=lambda group: (-group.reclaimable, group.paths[0]))
+            return groups
+
+    def link_duplicates(self, dry_run=False):
+        """
+        Replace every duplicate with a hard link to one copy of its group and return
+        ({rel: rel of the copy it now shares}, {rel: error}, bytes freed).
+
+        The copy kept is the one already shared by the most paths, so re-runs and partly
+        linked groups converge on the same file. Each duplicate is compared byte for byte
+        with it first, whatever the manifest says, and is swapped for the link with a
+        rename, so a path always holds one whole image. Links share one mtime, so tile
+        pyramids and thumbnails of the replaced paths are rebuilt once.
+        """
+        linked, failed, freed = {}, {}, 0
+        with self.lock:
+            for group in self.duplicates():
+                if not group.reclaimable:
+                    continue
+                by_file = {}
+                for rel in group.paths:
+                    by_file.setdefault(tuple(self.files[rel]['file']), []).append(rel)
+                keep = max(by_file.values(), key=len)[0]
+                keep_path = os.path.join(self.base_dir, keep)
+                for rels in by_file.values():
+                    if keep in rels:
+                        continue
+                    for rel in rels:
+                        path = os.path.join(self.base_dir, rel)
+                        try:
+                            if not filecmp.cmp(keep_path, path, shallow=False):
+                                raise ValueError('content changed since it was hashed')
+                            if not dry_run:
+                                self._link(keep_path, path)
+                        except (OSError, ValueError) as e:
+                            failed[rel] = str(e)
+                            break
+                        linked[rel] = keep
+                    else:
+                        # Only the last name of an old file frees its bytes
+                        freed += group.size
+            if linked and not dry_run:
+                self.refresh()
+        return linked, failed, freed
+
+    def _link(self, source, path):
+        temp = f'{path}.{os.getpid()}.link'
+        if os.path.lexists(temp):
+            os.unlink(temp)
+        os.link(source, temp)
+        try:
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
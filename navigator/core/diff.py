@@ -0,0 +1,66 @@
+from collections import namedtuple
+
+# Parsed contents of one update folder: frozenset of location names and
+# {category: frozenset of values} for the other fields of its JSON
+Snapshot = namedtuple('Snapshot', 'locations categories')
+
+# Sorted lists of what a set gained, lost and kept between two updates
+SetDiff = namedtuple('SetDiff', 'added removed retained')
+
+# old/new are CatalogEntry tuples; categories maps category -> SetDiff
+VersionDiff = namedtuple('VersionDiff', 'old new locations categories')
+
+EMPTY_SNAPSHOT = Snapshot(frozenset(), {})
+
+
+def diff_sets(old, new):
+    """Return the SetDiff between two sets of strings."""
+    return SetDiff(sorted(new - old), sorted(old - new), sorted(old & new))
+
+
+def diff_snapshots(old_entry, old, new_entry, new):
+    """
+    Compare two update snapshots.
+
+    Categories present in either update are compared; only those that changed are
+    kept, so a category that is identical on both sides does not clutter the result.
+    """
+    old = old or EMPTY_SNAPSHOT
+    new = new or EMPTY_SNAPSHOT
+    categories = {}
+    for category in sorted(set(old.categories) | set(new.categories)):
+        before = old.categories.get(category, frozenset())
+        after = new.categories.get(category, frozenset())
+        if before != after:
+            categories[category] = diff_sets(before, after)
+    return VersionDiff(old_entry, new_entry, diff_sets(old.locations, new.locations), categories)
+
+
+def is_unchanged(diff):
+    return not (diff.locations.added or diff.locations.removed or diff.categories)
+
+
+def previous_with_data(snapshots, ordinal):
+    """Return the closest ordinal before ordinal whose snapshot has data, or None."""
+    for previous in range(ordinal - 1, -1, -1):
+        if snapshots[previous] is not None:
+            return previous
+    return None
+
+
+def walk_timeline(catalog, snapshots):
+    """
+    Yield the VersionDiff of every update against the previous update with data, oldest first.
+
+    Updates without data (empty JSONs) are skipped rather than reported as removing
+    everything. Only the previous snapshot is held, so callers can stop early or stream
+    the diffs straight to output.
+    """
+    previous = None
+    for entry in catalog:
+        snapshot = snapshots[entry.ordinal]
+        if snapshot is None:
+            continue
+        if previous is not None:
+            yield diff_snapshots(previous[0], previous[1], entry, snapshot)
+        previous = (entry, snapshot)
@@ -0,0 +1,334 @@
+import json
+import os
+import stat
+import time
+from contextlib import contextmanager
+from navigator.core.index import JOURNAL_FILE_NAME
+from navigator.core.scanner import RACY_MTIME_WINDOW, default_workers
+
+
+def dumps_indented(data):
+    """The layout the edit operations have always written: json.dumps with indent=2."""
+    return json.dumps(data, indent=2)
+
+
+def dumps_wrapped(data, width=80):
+    """
+    Prettier-style layout, used by named_locations_through_updates.json: two-space indent,
+    with arrays of scalars kept on one line when they fit within width.
+    """
+    def layout(value, depth, column):
+        if isinstance(value, list) and not any(isinstance(item, (list, dict)) for item in value):
+            flat = '[' + ', '.join(json.dumps(item) for item in value) + ']'
+            # +1 leaves room for the comma that may follow
+            if column + len(flat) + 1 <= width:
+                return flat
+        if not isinstance(value, (list, dict)):
+            return json.dumps(value)
+        if not value:
+            return '[]' if isinstance(value, list) else '{}'
+        inner = '  ' * (depth + 1)
+        if isinstance(value, list):
+            items = [inner + layout(item, depth + 1, len(inner)) for item in value]
+            return '[\n' + ',\n'.join(items) + '\n' + '  ' * depth + ']'
+        items = []
+        for key, item in value.items():
+            head = inner + json.dumps(key) + ': '
+            items.append(head + layout(item, depth + 1, len(head)))
+        return '{\n' + ',\n'.join(items) + '\n' + '  ' * depth + '}'
+
+    return layout(data, 0, 0) + '\n'
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _write_temp(path, text):
+    """Write text (or bytes) to a fsynced temporary file beside path, with path's permissions, and return its name."""
+    directory = os.path.dirname(path)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o644
+    import tempfile  # imported on first write, like the thread pool: read-only sessions start faster without it
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        binary = isinstance(text, bytes)
+        with os.fdopen(fd, 'wb' if binary else 'w', encoding=None if binary else 'utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, mode)
+    except BaseException:
+        _unlink(temp_path)
+        raise
+    return temp_path
+
+
+def write_atomic(path, text):
+    """
+    Replace path with text so that readers see either the old or the new file, never a
+    partial one: the text goes to a temporary file in the same directory, which is
+    fsynced and then renamed over path.
+    """
+    path = os.path.abspath(path)
+    temp_path = _write_temp(path, text)
+    try:
+        os.replace(temp_path, path)
+    except BaseException:
+        _unlink(temp_path)
+        raise
+    _fsync_directory(os.path.dirname(path))
+
+
+def _roll_back(entries):
+    """Undo a partly applied commit given its [(path, temp, backup)] entries."""
+    for path, temp, backup in entries:
+        if os.path.exists(temp):
+            # Never renamed into place. The backup is a hard link to the untouched original,
+            # and renaming one link of a file over another does nothing, so just drop it
+            _unlink(temp)
+            if backup is not None:
+                _unlink(backup)
+        elif backup is not None:
+            if os.path.exists(backup):
+                os.replace(backup, path)
+        else:
+            # The file was created by the commit
+            _unlink(path)
+
+
+def commit_files(changes, journal_path, workers=None):
+    """
+    Replace several files so that either all of them change or none do.
+
+    changes is a list of (path, text). The new contents are first written to fsynced
+    temporary files in parallel; nothing is touched if any of those writes fails. Each
+    original is then hard-linked to a backup and the list of backups is recorded in a
+    journal before the temporaries are renamed into place. A failed rename puts the
+    backups back; after a crash, recover_commit() does the same from the journal. Once
+    every file is in place the journal is replaced by a record of the backups alone,
+    which is the commit point: after it, recovery keeps the new files and removes the
+    backups, so none is ever left behind.
+    """
+    changes = [(os.path.abspath(path), text) for path, text in changes]
+    from concurrent.futures import ThreadPoolExecutor  # only writes need it; see ArchiveScanner.map
+    with ThreadPoolExecutor(max_workers=workers or default_workers()) as pool:
+        futures = [pool.submit(_write_temp, path, text) for path, text in changes]
+    temps, error = [], None
+    for future in futures:
+        try:
+            temps.append(future.result())
+        except BaseException as e:
+            error = error or e
+    if error is not None:
+        for temp in temps:
+            _unlink(temp)
+        raise error
+
+    entries = []
+    try:
+        for (path, _), temp in zip(changes, temps):
+            backup = None
+            if os.path.exists(path):
+                backup = temp[:-len('.tmp')] + '.bak'
+                try:
+                    os.link(path, backup)
+                except OSError:
+                    # No hard links on this filesystem
+                    import shutil
+                    shutil.copy2(path, backup)
+            entries.append((path, temp, backup))
+        os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+        write_atomic(journal_path, json.dumps(entries))
+    except BaseException:
+        for temp in temps:
+            _unlink(temp)
+        for _, _, backup in entries:
+            if backup is not None:
+                _unlink(backup)
+        raise
+
+    backups = [backup for _, _, backup in entries if backup is not None]
+    try:
+        for path, temp, _ in entries:
+            os.replace(temp, path)
+        for directory in sorted({os.path.dirname(path) for path, _ in changes}):
+            _fsync_directory(directory)
+        write_atomic(journal_path, json.dumps({'committed': backups}))
+    except BaseException:
+        _roll_back(entries)
+        _unlink(journal_path)
+        raise
+    # Committed: the backups are garbage, and the journal goes once they are
+    for backup in backups:
+        _unlink(backup)
+    os.unlink(journal_path)
+    _fsync_directory(os.path.dirname(journal_path))
+
+
+def recover_commit(journal_path):
+    """
+    Finish a commit_files() interrupted by a crash: roll it back, or only remove its
+    backups if it had already committed. Returns whether there was one.
+    """
+    try:
+        with open(journal_path, 'r') as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return False
+    except ValueError:
+        # The journal is written atomically, so a corrupt one was never used
+        _unlink(journal_path)
+        return False
+    if isinstance(entries, dict):
+        for backup in entries.get('committed', []):
+            _unlink(backup)
+    else:
+        _roll_back(entries)
+    os.unlink(journal_path)
+    return True
+
+
+def _fsync_directory(directory):
+    """Make the rename itself durable; not possible (or needed) on every platform."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _stamp(st):
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class DocumentStore:
+    """
+    Parsed JSON documents cached by path, written back atomically.
+
+    load() parses a file once and serves it from memory until the file changes on disk
+    (checked by inode, mtime and size). While a file's mtime is too recent for that check
+    to be trusted, its text is kept as well and compared with the disk on load, which is
+    still much cheaper than parsing it again; a document just written by save() is cached
+    that way. Edits are made on the loaded object and handed back
+    with save(), which serializes it once and replaces the file with write_atomic().
+    Inside batch(), saves only mark documents dirty and the dirty documents are written
+    when the batch ends, once per file and all or nothing (commit_files()); if the batch
+    raises, its edits are dropped.
+    """
+
+    def __init__(self, on_write=None, journal_dir=None, workers=None):
+        self.documents = {}   # path -> (stamp, parsed document, text while the stamp is racy or None)
+        self.dirty = {}       # path -> (document, serializer) waiting to be written, in save order
+        self.batch_depth = 0
+        self.on_write = on_write  # called with the path after each file is written
+        self.journal_dir = journal_dir  # where multi-file commits keep their journal
+        self.workers = workers
+        self.writes = 0
+
+    @staticmethod
+    def _key(path):
+        return os.path.abspath(path)
+
+    def _journal_path(self, keys):
+        directory = self.journal_dir or os.path.commonpath([os.path.dirname(key) for key in keys])
+        return os.path.join(directory, JOURNAL_FILE_NAME)
+
+    def recover(self):
+        """Roll back a batch commit that a crash interrupted. Needs journal_dir."""
+        return self.journal_dir is not None and recover_commit(os.path.join(self.journal_dir, JOURNAL_FILE_NAME))
+
+    def load(self, path):
+        """Return the parsed document at path; raises like open()/json.loads() if it cannot."""
+        key = self._key(path)
+        if key in self.dirty:
+            return self.dirty[key][0]
+        st = os.stat(key)
+        cached = self.documents.get(key)
+        if cached is not None and cached[0] == _stamp(st):
+            if cached[2] is None:
+                return cached[1]
+            with open(key, 'r', encoding='utf-8') as f:
+                text = f.read()
+            if text == cached[2]:
+                self._cache(key, st, cached[1], text)
+                return cached[1]
+        else:
+            with open(key, 'r', encoding='utf-8') as f:
+                text = f.read()
+        data = json.loads(text)
+        self._cache(key, st, data, text)
+        return data
+
+    def _cache(self, key, st, data, text):
+        # As with directory listings, a file modified within the last second could be
+        # rewritten again without its stamp changing, so until it settles its text is kept
+        # for load() to compare
+        racy = st.st_mtime >= time.time() - RACY_MTIME_WINDOW
+        self.documents[key] = (_stamp(st), data, text if racy else None)
+
+    def save(self, path, data, serializer=dumps_indented):
+        """Store data as the new content of path, writing it now unless inside batch()."""
+        self.dirty[self._key(path)] = (data, serializer)
+        if not self.batch_depth:
+            self.flush()
+
+    def discard(self, path=None):
+        """Forget cached and unwritten state for path (or all paths) so the next load reads the disk."""
+        if path is None:
+            self.documents.clear()
+            self.dirty.clear()
+            return
+        key = self._key(path)
+        self.documents.pop(key, None)
+        self.dirty.pop(key, None)
+
+    def flush(self):
+        """Write every dirty document, one write per file; several files are committed together."""
+        if not self.dirty:
+            return
+        dirty = list(self.dirty.items())
+        changes = [(key, serializer(data)) for key, (data, serializer) in dirty]
+        try:
+            if len(changes) == 1:
+                write_atomic(*changes[0])
+            else:
+                commit_files(changes, self._journal_path(self.dirty), self.workers)
+        except BaseException:
+            # The cached objects already hold the failed edits; drop them so the disk wins
+            for key, _ in dirty:
+                self.discard(key)
+            raise
+        self.dirty.clear()
+        for (key, (data, _)), (_, text) in zip(dirty, changes):
+            # Just written, so normally racy: the next load compares the text, not re-parses it
+            self._cache(key, os.stat(key), data, text)
+            self.writes += 1
+            if self.on_write is not None:
+                self.on_write(key)
+
+    @contextmanager
+    def batch(self):
+        """Coalesce the saves made inside the block into one commit at its end."""
+        self.batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.batch_depth -= 1
+            if not self.batch_depth:
+                for key in list(self.dirty):
+                    self.discard(key)
+            raise
+        self.batch_depth -= 1
+        if not self.batch_depth:
+            self.flush()
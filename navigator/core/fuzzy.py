@@ -0,0 +1,214 @@
+import bisect
+import heapq
+import re
+
+_APOSTROPHES = re.compile(r"['’`]")
+_SEPARATORS = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text):
+    """Casefold text and reduce it to space-separated alphanumeric words."""
+    text = _APOSTROPHES.sub('', text.casefold())
+    return _SEPARATORS.sub(' ', text).strip()
+
+
+def pattern_masks(pattern):
+    """Precompute the per-character bit masks used by bit_distance."""
+    masks = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def bit_distance(masks, length, text):
+    """
+    Edit distance between a precomputed pattern and text.
+
+    Bit-parallel (Myers/Hyyrö) formulation: one column of the DP matrix is packed into
+    an int, so each character of text costs a few integer operations instead of a loop.
+    """
+    if length == 0:
+        return len(text)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    pv, mv, score = full, 0, length
+    for char in text:
+        eq = masks.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & full
+        mv = ph & xv & full
+    return score
+
+
+def max_typos(word):
+    """Number of edits tolerated for a query word of this length."""
+    if len(word) <= 2:
+        return 0
+    if len(word) <= 5:
+        return 1
+    return 2
+
+
+def max_distance(words):
+    """
+    Largest total distance a result may have for a query of these normalized words: a
+    third of its letters, and at least one. Past that a name shares too little with the
+    query to be what was meant, however few other names there are.
+    """
+    return max(1, sum(map(len, words)) // 3)
+
+
+def deletes(word, depth):
+    """Return every string reachable from word by deleting up to depth characters."""
+    results = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+class DeletionIndex:
+    """
+    Symmetric-delete index of words under edit distance.
+
+    If two words are within k edits of each other, deleting at most k characters from
+    each yields a common string. Storing the deletes of every vocabulary word turns a
+    typo lookup into a handful of dict probes plus a distance check on the few words
+    found, so its cost does not grow with the vocabulary.
+    """
+
+    def __init__(self):
+        # Deleted variant -> word, or tuple of words. Plain strings and tuples keep the
+        # (large) table out of the garbage collector's way.
+        self.variants = {}
+
+    @staticmethod
+    def depth(word):
+        # Deep enough for any query word whose tolerance could reach this word
+        return max_typos(word + 'xx')
+
+    def add(self, word):
+        variants = self.variants
+        for variant in deletes(word, self.depth(word)):
+            found = variants.get(variant)
+            if found is None:
+                variants[variant] = word
+            elif isinstance(found, str):
+                if found != word:
+                    variants[variant] = (found, word)
+            elif word not in found:
+                variants[variant] = found + (word,)
+
+    def search(self, word, max_dist):
+        """Return [(word, distance)] for every stored word within max_dist of word."""
+        candidates = set()
+        for variant in deletes(word, max_dist):
+            found = self.variants.get(variant)
+            if found is None:
+                continue
+            if isinstance(found, str):
+                candidates.add(found)
+            else:
+                candidates.update(found)
+        masks = pattern_masks(word)
+        matches = []
+        for candidate in candidates:
+            dist = bit_distance(masks, len(word), candidate)
+            if dist <= max_dist:
+                matches.append((candidate, dist))
+        return matches
+
+
+class FuzzyMatcher:
+    """
+    Typo-tolerant, ranked lookup of location names.
+
+    Names are split into normalized words. Each query word is matched against the word
+    vocabulary through a deletion index (typos) and a sorted word list (prefixes, so
+    "battle" finds "Battleground"). A name's distance is the sum of its per-word costs,
+    with an unmatched query word costing its own length. Names further from the query
+    than max_distance() are not returned.
+    """
+
+    def __init__(self, names=()):
+        self.names = {}        # original name -> tuple of normalized words
+        self.word_names = {}   # normalized word -> set of original names
+        self.typos = DeletionIndex()
+        self.sorted_words = None  # rebuilt lazily after additions
+        for name in names:
+            self.add(name)
+        self.sorted_words = sorted(self.word_names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name):
+        if name in self.names:
+            return
+        words = tuple(normalize(name).split())
+        self.names[name] = words
+        for word in words:
+            holders = self.word_names.get(word)
+            if holders is None:
+                self.word_names[word] = {name}
+                self.typos.add(word)
+                self.sorted_words = None
+            else:
+                holders.add(name)
+
+    def match_word(self, word, last):
+        """Return {vocabulary word: cost} for one query word."""
+        matches = {}
+        for candidate, dist in self.typos.search(word, max_typos(word)):
+            matches[candidate] = dist
+        if len(word) < 2:
+            # A single character is a prefix of too much of the vocabulary to be useful
+            return matches
+        # Words the query word is a prefix of; free for the word still being typed
+        prefix_cost = 0 if last else 1
+        if self.sorted_words is None:
+            self.sorted_words = sorted(self.word_names)
+        i = bisect.bisect_left(self.sorted_words, word)
+        while i < len(self.sorted_words) and self.sorted_words[i].startswith(word):
+            candidate = self.sorted_words[i]
+            if candidate != word:
+                matches[candidate] = min(matches.get(candidate, prefix_cost), prefix_cost)
+            i += 1
+        return matches
+
+    def search(self, query, limit=10, max_dist=None):
+        """
+        Return up to limit [(name, distance)] pairs, best first, no further than max_dist
+        (by default max_distance() of the query).
+        """
+        words = normalize(query).split()
+        if not words:
+            return []
+        if max_dist is None:
+            max_dist = max_distance(words)
+        costs = {}  # name -> per-query-word cost list
+        for i, word in enumerate(words):
+            for candidate, cost in self.match_word(word, i == len(words) - 1).items():
+                for name in self.word_names[candidate]:
+                    per_word = costs.get(name)
+                    if per_word is None:
+                        per_word = costs[name] = [len(w) for w in words]
+                    per_word[i] = min(per_word[i], cost)
+
+        # Names that also contain words the query did not mention rank slightly lower
+        names = self.names
+        ranked = heapq.nsmallest(limit, (
+            (sum(per_word), abs(len(names[name]) - len(words)), len(name), name)
+            for name, per_word in costs.items() if sum(per_word) <= max_dist
+        ))
+        return [(name, distance) for distance, _, _, name in ranked]
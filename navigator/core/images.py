@@ -0,0 +1,231 @@
+import json
+import os
+import struct
+import threading
+from navigator.core.documents import write_atomic
+from navigator.core.index import CACHE_DIR_NAME
+from navigator.core.scanner import ArchiveScanner, find_map_images
+
+IMAGES_FORMAT = 2
+IMAGES_FILE_NAME = 'image_manifest.json'
+TAIL_WINDOW = 4096  # bytes read from the end, enough for the marker and any padding after it
+PADDING = b'\x00\xff\r\n\t '  # fill that encoders and transfers leave after the end-of-image marker
+
+# Start-of-frame markers: every 0xC0-0xCF except DHT (C4), JPG (C8) and DAC (CC)
+_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_PROGRESSIVE = {0xC2, 0xC6, 0xCA, 0xCE}
+_STANDALONE = {0x01} | set(range(0xD0, 0xD8))  # TEM and RSTn carry no length
+_SUBSAMPLING = {(1, 1): '4:4:4', (2, 1): '4:2:2', (1, 2): '4:4:0', (2, 2): '4:2:0', (4, 1): '4:1:1'}
+
+
+def _read(f, n):
+    data = f.read(n)
+    if len(data) < n:
+        raise EOFError
+    return data
+
+
+def read_jpeg_header(path):
+    """
+    Describe a JPEG from its markers alone: the segments before the start-of-frame are
+    skipped by their lengths, so only a few hundred bytes are read whatever the image
+    size, plus the last few KB to check the file ends with its end-of-image marker once
+    any trailing padding is dropped. An end marker earlier in the tail, such as an embedded
+    thumbnail's, does not count.
+
+    Returns a dict of width, height, precision, components, color, subsampling,
+    progressive and truncated. Raises ValueError if the file is not a JPEG or ends
+    before its frame header.
+    """
+    adobe_transform = None
+    with open(path, 'rb') as f:
+        try:
+            if _read(f, 2) != b'\xff\xd8':
+                raise ValueError('not a JPEG (no SOI marker)')
+            while True:
+                if _read(f, 1) != b'\xff':
+                    raise ValueError('corrupt marker')
+                marker = _read(f, 1)[0]
+                while marker == 0xFF:  # fill bytes
+                    marker = _read(f, 1)[0]
+                if marker in _STANDALONE:
+                    continue
+                if marker in (0xD9, 0xDA):
+                    raise ValueError('no frame header before the image data')
+                length = struct.unpack('>H', _read(f, 2))[0]
+                if length < 2:
+                    raise ValueError('corrupt segment length')
+                if marker == 0xEE and length >= 14:
+                    segment = _read(f, length - 2)
+                    if segment.startswith(b'Adobe'):
+                        adobe_transform = segment[11]
+                    continue
+                if marker not in _SOF:
+                    f.seek(length - 2, os.SEEK_CUR)
+                    continue
+                segment = _read(f, length - 2)
+                precision, height, width, count = struct.unpack('>BHHB', segment[:6])
+                components = [segment[6 + 3 * i:9 + 3 * i] for i in range(count)]
+                break
+        except (EOFError, struct.error, IndexError):
+            raise ValueError('file ends inside the JPEG header')
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        f.seek(max(0, end - TAIL_WINDOW))
+        tail = f.read()
+
+    if count == 1:
+        color = 'grayscale'
+    elif count == 3:
+        ids = bytes(c[0] for c in components if c)
+        color = 'RGB' if adobe_transform == 0 or ids == b'RGB' else 'YCbCr'
+    elif count == 4:
+        color = 'YCCK' if adobe_transform == 2 else 'CMYK'
+    else:
+        color = f'{count} components'
+    subsampling = None
+    if count == 3 and all(len(c) == 3 for c in components):
+        factors = [(c[1] >> 4, c[1] & 0x0F) for c in components]
+        if factors[1] == factors[2] == (1, 1):
+            subsampling = _SUBSAMPLING.get(factors[0], '%dx%d' % factors[0])
+    return {
+        'width': width,
+        'height': height,
+        'precision': precision,
+        'components': count,
+        'color': color,
+        'subsampling': subsampling,
+        'progressive': marker in _PROGRESSIVE,
+        'truncated': not tail.rstrip(PADDING).endswith(b'\xff\xd9'),
+    }
+
+
+def update_folder(rel_image):
+    """The update folder a map belongs to; 34.40 and 35.00 keep theirs one level down."""
+    folder = os.path.dirname(rel_image)
+    parent = os.path.dirname(folder)
+    if os.path.basename(folder) == os.path.basename(parent):
+        return parent
+    return folder
+
+
+class ImageManifest:
+    """
+    Persistent record of every map image's header, keyed by update folder.
+
+    Stored as .navigator_cache/image_manifest.json. Like the location index, each entry
+    keeps the mtime and size of the file it was read from, and refresh() re-reads only
+    the headers of images that are new or changed. The walk and stats can take a while on
+    a large or remote archive, so the TUI asks with get(wait=False), which loads the
+    manifest on a background thread and answers None until it is ready.
+    """
+
+    def __init__(self, base_dir, cache_path=None, scanner=None):
+        self.base_dir = os.path.abspath(base_dir)
+        self.cache_path = cache_path or os.path.join(self.base_dir, CACHE_DIR_NAME, IMAGES_FILE_NAME)
+        self.scanner = scanner or ArchiveScanner(self.base_dir)
+        # rel update folder -> {'image': rel path, 'mtime': ns, 'size': bytes, header fields...}
+        # or with 'error' instead of the header fields if it could not be read
+        self.images = {}
+        self.loaded = False
+        self.lock = threading.RLock()
+        self.thread = None  # background load started by get(wait=False)
+        self.fresh = False
+
+    def load(self):
+        """Read the saved manifest, ignoring it if missing, corrupt or from another format."""
+        self.images = {}
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get('format') != IMAGES_FORMAT:
+            return False
+        self.images = data.get('images', {})
+        return True
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            write_atomic(self.cache_path, json.dumps({'format': IMAGES_FORMAT, 'images': self.images}))
+        except OSError:
+            return False
+        return True
+
+    def refresh(self):
+        """Bring the manifest up to date with the tree and return the number of headers read."""
+        def check(rel):
+            path = os.path.join(self.base_dir, rel)
+            try:
+                st = os.stat(path)
+            except OSError:
+                return False  # removed since the walk
+            entry = self.images.get(update_folder(rel))
+            if entry and entry.get('image') == rel and entry['mtime'] == st.st_mtime_ns and entry['size'] == st.st_size:
+                return None
+            entry = {'image': rel, 'mtime': st.st_mtime_ns, 'size': st.st_size}
+            try:
+                entry.update(read_jpeg_header(path))
+            except (OSError, ValueError) as e:
+                entry['error'] = str(e)
+            return entry
+
+        with self.lock:
+            rels = find_map_images(self.base_dir)
+            folders = {update_folder(rel) for rel in rels}
+            removed = [folder for folder in self.images if folder not in folders]
+            for folder in removed:
+                del self.images[folder]
+            read = 0
+            for rel, entry in zip(rels, self.scanner.map(check, rels)):
+                if entry is False:
+                    removed.append(update_folder(rel))
+                    self.images.pop(update_folder(rel), None)
+                elif entry is not None:
+                    self.images[update_folder(rel)] = entry
+                    read += 1
+            if read or removed:
+                self.save()
+            return read
+
+    def ensure_loaded(self):
+        """Load the saved manifest and bring it up to date, once per session."""
+        with self.lock:
+            if not self.loaded:
+                self.load()
+                self.refresh()
+                self.loaded = True
+
+    def get(self, folder, wait=True):
+        """
+        Return the entry for a rel update folder, or None. With wait=False a manifest that
+        is not loaded yet is loaded in the background, and None is returned meanwhile.
+        """
+        if not self.loaded:
+            if not wait:
+                self.load_in_background()
+                return None
+            self.ensure_loaded()
+        return self.images.get(folder)
+
+    def load_in_background(self):
+        """Start ensure_loaded() on a thread, once; poll() reports when it has finished."""
+        if self.thread is None and not self.loaded:
+            self.thread = threading.Thread(target=self._load, name='image-manifest', daemon=True)
+            self.thread.start()
+
+    def _load(self):
+        try:
+            self.ensure_loaded()
+        finally:
+            self.fresh = True
+
+    @property
+    def waiting(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def poll(self):
+        """Return whether a background load finished since the last poll."""
+        fresh, self.fresh = self.fresh, False
+        return fresh
@@ -0,0 +1,416 @@
+import os
+import json
+import threading
+from navigator.core.scanner import ArchiveScanner
+from navigator.core.trigram import TrigramIndex
+from navigator.core.bitsets import LocationMatrix
+from navigator.core.diff import Snapshot
+from navigator.core.versions import VersionCatalog, LifetimeIndex, chapter_season_key, version_key
+
+INDEX_FORMAT = 2
+CACHE_DIR_NAME = '.navigator_cache'
+INDEX_FILE_NAME = 'location_index.json'
+PACK_FILE_NAME = 'archive.pack'  # written by core/pack.py
+JOURNAL_FILE_NAME = 'commit_journal.json'  # left by an unfinished multi-file commit, see core/documents.py
+NAMED_LOCATIONS_FILE = 'named_locations_through_updates.json'
+
+
+def extract_locations(data):
+    """Return the location names stored in a parsed per-version JSON document."""
+    if isinstance(data, dict):
+        locations = data.get('locations')
+        if isinstance(locations, list):
+            return [loc for loc in locations if isinstance(loc, str) and loc.strip()]
+        return []
+    if isinstance(data, list):
+        # Newer updates store a list of {"city": ..., "x": ..., "y": ...} markers
+        return [item['city'] for item in data
+                if isinstance(item, dict) and isinstance(item.get('city'), str) and item['city'].strip()]
+    return []
+
+
+def extract_categories(data):
+    """
+    Return the other top-level fields of a per-version JSON as {category: [values]}.
+
+    List items and scalar values are kept as strings (non-strings JSON-encoded) so two
+    versions of a category can be compared as sets.
+    """
+    if not isinstance(data, dict):
+        return {}
+    categories = {}
+    for key, value in data.items():
+        if key == 'locations':
+            continue
+        items = value if isinstance(value, list) else [value]
+        categories[key] = [item if isinstance(item, str) else json.dumps(item, sort_keys=True) for item in items]
+    return categories
+
+
+def split_version_path(rel_path):
+    """Split a relative JSON path into (chapter_season, update_version), or None if too shallow."""
+    parts = rel_path.split(os.sep)
+    if len(parts) < 3:
+        return None
+    return os.path.join(parts[0], parts[1]), parts[2]
+
+
+class LocationIndex:
+    """
+    Persistent inverted index of location name -> per-version JSON files.
+
+    The index is stored under <base_dir>/.navigator_cache and records the mtime and size of
+    every JSON it was built from, so a later session only re-parses files that changed.
+
+    Loaded from a current pack, the index stays packed: searches are answered from the
+    mapped name table and postings, and the per-file records are only decoded into files
+    and postings when something reads them (the catalog, edits, a refresh).
+    """
+
+    def __init__(self, base_dir, cache_path=None, scanner=None, pack=None):
+        self.base_dir = os.path.abspath(base_dir)
+        self.cache_path = cache_path or os.path.join(self.base_dir, CACHE_DIR_NAME, INDEX_FILE_NAME)
+        self.scanner = scanner or ArchiveScanner(self.base_dir)
+        # rel json path -> {'mtime': ns, 'size': bytes, 'locations': [...], 'categories': {...}}
+        # ('categories' is only stored for files that have fields besides locations)
+        self._files = {}
+        self._postings = {}  # location name -> set of rel json paths
+        self._names = None   # TrigramIndex over the names in postings, built by the second substring search
+        self.searches = 0
+        self.packed = False  # files and postings are still only in the pack
+        self.loaded = False
+        self.stale = set()   # rel paths known to have changed since the last refresh
+        self.generation = 0  # bumped whenever the indexed names or files change
+        self.reference = {}  # named_locations_through_updates.json: location name -> [versions]
+        self.reference_stamp = None
+        self.fuzzy = None
+        self.fuzzy_stamp = None
+        self.pack = pack  # PackedArchive to start from instead of walking the tree, if current
+        # Background searches (live TUI search) and the input thread may both trigger a refresh
+        self.lock = threading.RLock()
+
+    def ensure_loaded(self):
+        """Load the on-disk index and validate it against the tree once per session."""
+        with self.lock:
+            if not self.loaded:
+                if not self.load_pack():
+                    self.load()
+                    self.refresh(force=self.stale)
+                self.loaded = True
+            elif self.stale:
+                self.refresh(self.stale, force=self.stale)
+
+    @property
+    def files(self):
+        if self.packed:
+            self._unpack()
+        return self._files
+
+    @property
+    def postings(self):
+        if self.packed:
+            self._unpack()
+        return self._postings
+
+    def load(self):
+        """Read the persisted index, ignoring it if missing, corrupt or from another format."""
+        self._files = {}
+        self._postings = {}
+        self._names = None
+        self.packed = False
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get('format') != INDEX_FORMAT:
+            return False
+        self._files = data.get('files', {})
+        for name, paths in data.get('locations', {}).items():
+            self._postings[name] = set(paths)
+        return True
+
+    def load_pack(self):
+        """
+        Serve the index from the mapped pack if it still matches the tree; returns whether it does.
+
+        Nothing is decoded here. A stale or missing pack leaves the index untouched, and
+        ensure_loaded() falls back to the persisted index and a walk of the archive.
+        """
+        if self.pack is None or self.pack.stale_paths(self.base_dir, self.scanner.workers):
+            return False
+        self._files = {}
+        self._postings = {}
+        self._names = None
+        self.packed = True
+        self.generation += 1
+        return True
+
+    def _unpack(self):
+        """Decode every packed file record into files and postings."""
+        with self.lock:
+            if not self.packed:
+                return
+            files, postings = {}, {}
+            for rel, mtime, size, locations, categories in self.pack.files():
+                files[rel] = {'mtime': mtime, 'size': size, 'locations': locations}
+                if categories:
+                    files[rel]['categories'] = categories
+                for name in locations:
+                    postings.setdefault(name, set()).add(rel)
+            self._files, self._postings = files, postings
+            self.packed = False
+
+    def save(self):
+        """Write the index next to the archive, replacing the previous copy atomically."""
+        data = {
+            'format': INDEX_FORMAT,
+            'files': self.files,
+            'locations': {name: sorted(paths) for name, paths in self.postings.items()},
+        }
+        tmp_path = self.cache_path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # A read-only archive still gets an in-memory index for this session
+            return False
+        return True
+
+    def refresh(self, paths=None, force=()):
+        """
+        Bring the index up to date with the tree and return the number of files re-parsed.
+
+        With paths given only those relative JSON paths are checked; otherwise the whole
+        archive is stat'ed and new, modified and deleted files are reconciled. Paths in
+        force (those reported by mark_stale) are re-parsed even if their mtime and size
+        are unchanged, as a same-size rewrite within the mtime granularity leaves them.
+        """
+        if paths is None:
+            seen = dict(self.scanner.scan())
+            removed = [rel for rel in self.files if rel not in seen]
+        else:
+            seen = {}
+            removed = []
+            for rel in paths:
+                try:
+                    seen[rel] = os.stat(os.path.join(self.base_dir, rel))
+                except OSError:
+                    if rel in self.files:
+                        removed.append(rel)
+        self.stale = set()
+
+        for rel in removed:
+            self._drop(rel)
+        modified = []
+        for rel, st in seen.items():
+            entry = self.files.get(rel)
+            if entry and rel not in force and entry['mtime'] == st.st_mtime_ns and entry['size'] == st.st_size:
+                continue
+            modified.append(rel)
+        # Parse every changed file in one fan-out rather than one at a time
+        for rel, data in zip(modified, self.scanner.load(modified)):
+            self._drop(rel)
+            self._add(rel, seen[rel], extract_locations(data), extract_categories(data))
+
+        changed = len(removed) + len(modified)
+        if changed:
+            self.generation += 1
+            self.save()
+        return changed
+
+    @property
+    def names(self):
+        """Substring lookup over the distinct names in postings, built on first use."""
+        if self._names is None:
+            self._names = TrigramIndex(self.postings)
+        return self._names
+
+    def mark_stale(self, path):
+        """Record that a JSON file was modified so the next lookup re-reads it."""
+        rel = os.path.relpath(os.path.abspath(path), self.base_dir)
+        self.stale.add(rel)
+
+    def _add(self, rel, st, locations, categories=None):
+        self.files[rel] = {'mtime': st.st_mtime_ns, 'size': st.st_size, 'locations': locations}
+        if categories:
+            self.files[rel]['categories'] = categories
+        for name in locations:
+            paths = self.postings.get(name)
+            if paths is None:
+                paths = self.postings[name] = set()
+                if self._names is not None:
+                    self._names.add(name)
+            paths.add(rel)
+
+    def _drop(self, rel):
+        entry = self.files.pop(rel, None)
+        if not entry:
+            return
+        for name in entry['locations']:
+            paths = self.postings.get(name)
+            if paths is None:
+                continue
+            paths.discard(rel)
+            if not paths:
+                del self.postings[name]
+                if self._names is not None:
+                    self._names.remove(name)
+
+    def load_reference(self):
+        """(Re)read named_locations_through_updates.json if it changed since the last read."""
+        path = os.path.join(self.base_dir, NAMED_LOCATIONS_FILE)
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.reference, self.reference_stamp = {}, None
+            return self.reference
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp != self.reference_stamp:
+            self.reference = {}
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = []
+            for item in data if isinstance(data, list) else []:
+                if isinstance(item, dict) and isinstance(item.get('city'), str):
+                    self.reference[item['city']] = [v for v in item.get('versions', []) if isinstance(v, str)]
+            self.reference_stamp = stamp
+        return self.reference
+
+    def versions_for(self, names, include_reference=False):
+        """
+        Group the files containing any of the given names by chapter/season.
+
+        With include_reference, versions listed for a name in named_locations_through_updates.json
+        are added too, placed under every chapter/season that has an update folder of that name.
+        Runs under the lock, as a background search may refresh the postings meanwhile.
+        """
+        matching_dirs = {}
+        with self.lock:
+            packed = self.packed
+            for name in names:
+                for rel in self.pack.find(name) if packed else self.postings.get(name, ()):
+                    split = split_version_path(rel)
+                    if split is None:
+                        continue
+                    chapter_season, update_version = split
+                    matching_dirs.setdefault(chapter_season, set()).add(update_version)
+            if include_reference:
+                reference = self.load_reference()
+                version_dirs = {}
+                for rel in self.pack.file_paths() if packed else self.files:
+                    split = split_version_path(rel)
+                    if split is not None:
+                        version_dirs.setdefault(split[1], set()).add(split[0])
+                for name in names:
+                    for update_version in reference.get(name, ()):
+                        for chapter_season in version_dirs.get(update_version, ()):
+                            matching_dirs.setdefault(chapter_season, set()).add(update_version)
+        return [(k, sorted(matching_dirs[k], key=version_key)) for k in sorted(matching_dirs.keys(), key=chapter_season_key)]
+
+    def fuzzy_matcher(self):
+        """Return a FuzzyMatcher over every known location name, rebuilt only when names change."""
+        self.ensure_loaded()
+        self.load_reference()
+        stamp = (self.generation, self.reference_stamp)
+        if self.fuzzy is None or self.fuzzy_stamp != stamp:
+            from navigator.core.fuzzy import FuzzyMatcher
+            self.fuzzy = FuzzyMatcher(set(self.postings) | set(self.reference))
+            self.fuzzy_stamp = stamp
+        return self.fuzzy
+
+    def catalog(self):
+        """Return a VersionCatalog of every update folder that has a JSON file."""
+        with self.lock:
+            self.ensure_loaded()
+            # A pack lists its files in release order already
+            packed = self.packed
+            paths = self.pack.file_paths() if packed else self.files
+            folders = [split for split in map(split_version_path, paths) if split is not None]
+        return VersionCatalog(folders, in_order=packed)
+
+    def presence(self, catalog):
+        """
+        Return {location name: set of catalog ordinals whose JSON lists it}.
+
+        While packed, read from the pack's postings, so the file records are not decoded.
+        """
+        with self.lock:
+            self.ensure_loaded()
+            # Each file is listed under many names; resolve its ordinal once, by file
+            # number in the pack's postings and by rel path in the decoded ones
+            ordinal_of = {}
+            paths = self.pack.file_paths() if self.packed else self.files
+            for key, rel in enumerate(paths):
+                split = split_version_path(rel)
+                ordinal_of[key if self.packed else rel] = None if split is None else catalog.ordinal(*split)
+            presence = {}
+            for name, files in self.pack.postings() if self.packed else self.postings.items():
+                ordinals = {ordinal_of[key] for key in files}
+                ordinals.discard(None)
+                if ordinals:
+                    presence[name] = ordinals
+        return presence
+
+    def lifetimes(self, catalog):
+        """Return a LifetimeIndex of every location over the given catalog."""
+        return LifetimeIndex(catalog, self.presence(catalog))
+
+    def matrix(self, catalog):
+        """Return the LocationMatrix bitsets of every location over the given catalog."""
+        return LocationMatrix(catalog, self.presence(catalog))
+
+    def snapshots(self, catalog, ordinals=None):
+        """
+        Return a Snapshot (or None if its JSONs hold no data) for every catalog ordinal, or
+        only for those in ordinals (the rest are None).
+
+        Built from the parsed index, so no JSON file is read. While packed, only the
+        records of the wanted ordinals are decoded.
+        """
+        wanted = None if ordinals is None else set(ordinals)
+        merged = [None] * len(catalog)
+        with self.lock:
+            self.ensure_loaded()
+            packed = self.packed
+            for key, rel in enumerate(self.pack.file_paths() if packed else self.files):
+                split = split_version_path(rel)
+                ordinal = None if split is None else catalog.ordinal(*split)
+                if ordinal is None or (wanted is not None and ordinal not in wanted):
+                    continue
+                if packed:
+                    names, fields = self.pack.file_locations(key), self.pack.file_categories(key)
+                else:
+                    names, fields = self.files[rel]['locations'], self.files[rel].get('categories', {})
+                if not (names or fields):
+                    continue
+                if merged[ordinal] is None:
+                    merged[ordinal] = (set(), {})
+                locations, categories = merged[ordinal]
+                locations.update(names)
+                for category, values in fields.items():
+                    categories.setdefault(category, set()).update(values)
+        return [None if m is None else Snapshot(frozenset(m[0]), {k: frozenset(v) for k, v in m[1].items()})
+                for m in merged]
+
+    def match_names(self, substring):
+        """Return the distinct location names containing substring, ignoring case."""
+        with self.lock:
+            self.ensure_loaded()
+            if self.packed:
+                return self.pack.match_names(substring)
+            self.searches += 1
+            if self._names is None and self.searches == 1:
+                # A single search, as a one-shot query makes, costs less as a scan of the
+                # names than building the trigrams; later ones use them
+                query = substring.casefold()
+                return [name for name in self.postings if query in name.casefold()]
+            return self.names.search(substring)
+
+    def search(self, substring):
+        """Return [(chapter_season, [update_versions])] for locations containing substring."""
+        return self.versions_for(self.match_names(substring))
@@ -0,0 +1,162 @@
+import re
+
+# One token after optional whitespace. JSON strings cannot contain raw newlines, so every
+# token lies within a single line and lines can be tokenized independently.
+_TOKEN = re.compile(r'''[ \t\r]*(?:
+    (?P<punct>[{}\[\]:,])
+  | (?P<string>"(?:[^"\\\x00-\x1f]|\\["\\/bfnrt]|\\u[0-9a-fA-F]{4})*")
+  | (?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)
+  | (?P<literal>true|false|null)
+  | (?P<end>$)
+)''', re.VERBOSE)
+_STRING_START = re.compile(r'[ \t\r]*"')
+
+# Parser state between lines: (open containers as a string such as '{[', what may come next)
+START = ('', 'value')
+
+_EXPECTING = {
+    'value': "Expecting value",
+    'value_or_close': "Expecting value",
+    'key_or_close': "Expecting property name enclosed in double quotes",
+    'key': "Expecting property name enclosed in double quotes",
+    'colon': "Expecting ':' delimiter",
+    'comma_or_close': "Expecting ',' delimiter",
+    'end': "Extra data",
+}
+_CLOSERS = {'}': '{', ']': '['}
+
+
+def _after_value(stack):
+    return (stack, 'comma_or_close' if stack else 'end')
+
+
+def step(state, kind, token):
+    """Advance the parser over one token; returns the new state or None if it is not allowed."""
+    stack, expect = state
+    if expect in ('value', 'value_or_close'):
+        if kind in ('string', 'number', 'literal'):
+            return _after_value(stack)
+        if token == '{':
+            return (stack + '{', 'key_or_close')
+        if token == '[':
+            return (stack + '[', 'value_or_close')
+        if token == ']' and expect == 'value_or_close':
+            return _after_value(stack[:-1])
+        return None
+    if expect in ('key', 'key_or_close'):
+        if kind == 'string':
+            return (stack, 'colon')
+        if token == '}' and expect == 'key_or_close':
+            return _after_value(stack[:-1])
+        return None
+    if expect == 'colon':
+        return (stack, 'value') if token == ':' else None
+    if expect == 'comma_or_close':
+        if token == ',':
+            return (stack, 'key' if stack[-1] == '{' else 'value')
+        if token in _CLOSERS and _CLOSERS[token] == stack[-1]:
+            return _after_value(stack[:-1])
+        return None
+    return None  # 'end': nothing may follow the top-level value
+
+
+def parse_line(state, line):
+    """
+    Run the parser over one line starting from state.
+
+    Returns (state at the end of the line, None) or (None, (column, message)) with a
+    0-based column for the first error.
+    """
+    pos = 0
+    while True:
+        match = _TOKEN.match(line, pos)
+        if match is None:
+            col = len(line) - len(line[pos:].lstrip(' \t\r'))
+            if _STRING_START.match(line, pos):
+                closed = '"' in line[col + 1:]
+                return None, (col, "Invalid string escape or control character" if closed else "Unterminated string")
+            return None, (col, _EXPECTING[state[1]])
+        kind = match.lastgroup
+        if kind == 'end':
+            return state, None
+        token = match.group(kind)
+        new_state = step(state, kind, token)
+        if new_state is None:
+            return None, (match.start(kind), _EXPECTING[state[1]])
+        state = new_state
+        pos = match.end()
+
+
+class JsonValidator:
+    """
+    Incremental JSON syntax checker for a document edited line by line.
+
+    The parser state at the start of every line is cached. After an edit, parsing resumes
+    at the first changed line and stops as soon as the state entering an unchanged line
+    matches the cached one, since everything below then parses exactly as before. A
+    keystroke therefore costs the edited line plus, usually, nothing more. Lines after the
+    first error are not parsed at all.
+    """
+
+    def __init__(self, get_line, line_count, lines=None):
+        # lines, if given, is the initial text as a list, which is faster to walk than get_line
+        self.get_line = lines.__getitem__ if lines is not None else get_line
+        self.line_count = line_count
+        self.states = [START]  # states[i]: state entering line i, known for i <= len - 1
+        self.error = None      # (row, col, message) of the first error
+        self._parse_from(0, resume_limit=1)
+        self.get_line = get_line
+
+    @property
+    def valid(self):
+        return self.error is None
+
+    def _parse_from(self, row, resume_limit):
+        """
+        Parse from row on. Cached states at rows >= resume_limit are trusted to describe the
+        unchanged text below, so parsing stops once it reproduces one of them.
+        """
+        states = self.states
+        first = row
+        state = states[row]
+        fresh = []  # states entering rows first + 1, first + 2, ...
+        while row < self.line_count:
+            state, error = parse_line(state, self.get_line(row))
+            if error is not None:
+                del states[first + 1:]
+                states.extend(fresh)
+                self.error = (row, error[0], error[1])
+                return
+            row += 1
+            if resume_limit <= row < len(states) and states[row] == state:
+                # Converged: the rest of the document, and its first error, are as before
+                states[first + 1:row] = fresh
+                return
+            fresh.append(state)
+        del states[first + 1:]
+        states.extend(fresh)
+        self.error = None
+        self._check_end(state)
+
+    def _check_end(self, state):
+        if state[1] != 'end':
+            last = max(0, self.line_count - 1)
+            col = len(self.get_line(last)) if self.line_count else 0
+            self.error = (last, col, _EXPECTING[state[1]] if not state[0] else "Unexpected end of document")
+
+    def update(self, row, old_count, new_count):
+        """
+        Record that old_count lines starting at row were replaced by new_count lines and
+        re-check the affected region.
+        """
+        delta = new_count - old_count
+        self.line_count += delta
+        if row >= len(self.states):
+            # The edit is below the first error, which therefore still stands
+            return
+        # Keep the state entering the edit and the cached states of the unchanged lines
+        # below it; states[row + old_count] is the one entering the first unchanged line
+        self.states[row + 1:row + old_count] = [None] * (new_count - 1)
+        if self.error is not None and self.error[0] >= row + old_count:
+            self.error = (self.error[0] + delta, self.error[1], self.error[2])
+        self._parse_from(row, resume_limit=row + new_count)
@@ -0,0 +1,155 @@
+import mmap
+import os
+from array import array
+from itertools import accumulate
+
+CHECKPOINT_EVERY = 64  # lines between remembered line-start offsets
+SCAN_BLOCK = 1 << 20   # bytes split at a time when the whole file has to be indexed
+
+
+class MappedFile:
+    """
+    Read-only, memory-mapped view of a text file's lines.
+
+    Nothing is read when the file is opened. Line starts are discovered on demand by
+    scanning the mapping for newlines, and only every CHECKPOINT_EVERY-th start is kept,
+    so the index stays small whatever the file size. Slicing returns just the requested
+    lines, decoded as UTF-8; lines follow str.splitlines() for '\\n' and '\\r\\n' endings.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.data = b''
+        self._map()
+
+    def _map(self):
+        st = os.fstat(self.file.fileno())
+        self.stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        self.size = st.st_size
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        # mmap cannot map an empty file
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        self.checkpoints = array('q')  # checkpoints[k]: offset of line k * CHECKPOINT_EVERY
+        self.found = 0                 # number of lines whose start has been found
+        self.frontier = 0              # offset of the start of line `found`
+        self.complete = self.size == 0
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.data = b''
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def refresh(self):
+        """
+        Catch up with changes to the file at path, compared by inode, mtime and size: a file
+        replaced by a rename (as every save is) is reopened, and one rewritten in place is
+        remapped, so neither stale lines nor a mapping past a truncated end are shown.
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return  # removed; keep showing what was opened
+        if st.st_ino != self.stamp[0]:
+            try:
+                replacement = open(self.path, 'rb')
+            except OSError:
+                return
+            self.file.close()
+            self.file = replacement
+            self._map()
+        elif (st.st_mtime_ns, st.st_size) != self.stamp[1:]:
+            self._map()
+
+    def _scan(self, upto=None):
+        """Find line starts until upto lines are known or the end of the file."""
+        data, size = self.data, self.size
+        if upto is None:
+            self._scan_blocks()
+        while not self.complete and (upto is None or self.found < upto):
+            if self.frontier >= size:
+                self.complete = True
+                break
+            if self.found % CHECKPOINT_EVERY == 0:
+                self.checkpoints.append(self.frontier)
+            self.found += 1
+            newline = data.find(b'\n', self.frontier)
+            self.frontier = size if newline < 0 else newline + 1
+        if self.frontier >= size:
+            self.complete = True
+
+    def _scan_blocks(self):
+        """
+        Index the rest of the file a block at a time. Splitting a block finds all of its
+        newlines in C; only the checkpointed starts are then computed in Python.
+        """
+        data, size = self.data, self.size
+        while self.frontier < size:
+            start = self.frontier
+            block = data[start:start + SCAN_BLOCK]
+            if start + len(block) < size:
+                cut = block.rfind(b'\n') + 1
+                if not cut:
+                    return  # a line longer than the block; leave it to the line-by-line scan
+                block = block[:cut]
+            lines = block.split(b'\n')
+            if not lines[-1]:
+                lines.pop()
+            # Start of line j of the block: start + total length of lines before it + j newlines
+            lengths = [0] + list(accumulate(map(len, lines)))
+            first = -self.found % CHECKPOINT_EVERY
+            self.checkpoints.extend(start + lengths[j] + j for j in range(first, len(lines), CHECKPOINT_EVERY))
+            self.found += len(lines)
+            self.frontier = start + len(block)
+        self.complete = True
+
+    def count_upto(self, limit=None):
+        """Number of lines, scanning no further than needed to tell whether there are limit of them."""
+        self._scan(limit)
+        return self.found if limit is None else min(self.found, limit)
+
+    def __len__(self):
+        return self.count_upto()
+
+    def _line_start(self, index):
+        offset = self.checkpoints[index // CHECKPOINT_EVERY]
+        for _ in range(index % CHECKPOINT_EVERY):
+            offset = self.data.find(b'\n', offset) + 1
+        return offset
+
+    def _decode(self, start, end):
+        line = self.data[start:end]
+        if line.endswith(b'\r'):
+            line = line[:-1]
+        return line.decode('utf-8', 'replace')
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.start or 0, index.stop, index.step
+            if start < 0 or (stop is not None and stop < 0) or step not in (None, 1):
+                # Uncommon forms fall back to knowing the full length
+                return [self[i] for i in range(*index.indices(len(self)))]
+            stop = self.count_upto(stop)
+            lines = []
+            if start >= stop:
+                return lines
+            offset = self._line_start(start)
+            for _ in range(start, stop):
+                newline = self.data.find(b'\n', offset)
+                end = self.size if newline < 0 else newline
+                lines.append(self._decode(offset, end))
+                offset = end + 1
+            return lines
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= self.count_upto(index + 1):
+            raise IndexError(index)
+        return self[index:index + 1][0]
@@ -1,24 +1,114 @@
 import os
-import json
+import time
+from navigator.core.diff import diff_snapshots, previous_with_data, walk_timeline
+from navigator.core.index import (CACHE_DIR_NAME, JOURNAL_FILE_NAME, NAMED_LOCATIONS_FILE, PACK_FILE_NAME,
+                                  LocationIndex)
+from navigator.core.scanner import RACY_MTIME_WINDOW, ArchiveScanner
+
+# The pack, documents, edits, map images, file viewing and reconciling import their modules
+# on first use, so a one-shot query only loads what answering it needs
 
 class FileNavigator:
-    def __init__(self, base_dir):
+    def __init__(self, base_dir, workers=None):
         self.base_dir = os.path.abspath(base_dir)
         self.current_path = self.base_dir
         self.entries = []
+        self.entry_dirs = set()  # names in entries that are directories
+        self._listings = {}  # dir path -> (mtime_ns, sorted names, set of dir names)
+        # Shared by search and index builds; workers=None uses NAVIGATOR_SCAN_WORKERS or a CPU-based default
+        self.scanner = ArchiveScanner(self.base_dir, workers=workers)
+        self.cache_dir = os.path.join(self.base_dir, CACHE_DIR_NAME)
+        # A pack from build_pack() answers the first search and listings without a walk
+        self.pack_path = os.path.join(self.cache_dir, PACK_FILE_NAME)
+        self.pack = None
+        if os.path.exists(self.pack_path):
+            from navigator.core.pack import open_pack
+            self.pack = open_pack(self.pack_path)
+        self.location_index = LocationIndex(self.base_dir, scanner=self.scanner, pack=self.pack)
+        self._derived = {}  # name -> (index generation, structure) for catalog/timeline caches
+        self._documents = None
+        # Finish rolling back a multi-file edit that was interrupted
+        if os.path.exists(os.path.join(self.cache_dir, JOURNAL_FILE_NAME)):
+            self.documents.recover()
+        self._image_manifest = None
+        self._thumbnails = None
+
+    @property
+    def documents(self):
+        """
+        The DocumentStore of parsed JSON for the edit operations, created on first use. Every
+        write-back is reported to the location index.
+        """
+        if self._documents is None:
+            from navigator.core.documents import DocumentStore
+            self._documents = DocumentStore(on_write=self.invalidate_file, journal_dir=self.cache_dir,
+                                            workers=self.scanner.workers)
+        return self._documents
+
+    @property
+    def image_manifest(self):
+        """The ImageManifest of the archive's maps, created on first use."""
+        if self._image_manifest is None:
+            from navigator.core.images import ImageManifest
+            self._image_manifest = ImageManifest(self.base_dir, scanner=self.scanner)
+        return self._image_manifest
+
+    @property
+    def thumbnails(self):
+        """The ThumbnailStore for map previews, created on first use so that only the TUI imports Pillow."""
+        if self._thumbnails is None:
+            from navigator.core.thumbnails import THUMBNAILS_DIR_NAME, ThumbnailStore
+            self._thumbnails = ThumbnailStore(os.path.join(self.base_dir, CACHE_DIR_NAME, THUMBNAILS_DIR_NAME))
+        return self._thumbnails
+
+    def list_directory(self, path):
+        """
+        Return (sorted entry names, set of those that are directories) for path.
+
+        Listings come from os.scandir, whose entries carry their file type, so no entry is
+        stat'ed. They are cached and reused while the directory's mtime is unchanged, which
+        costs one stat per visit instead of one per entry. Directories in the pack are
+        served from it under the same mtime check.
+        """
+        st = os.stat(path)
+        cached = self._listings.get(path)
+        if cached is None and self.pack is not None:
+            rel = os.path.relpath(path, self.base_dir)
+            if not rel.startswith(os.pardir):
+                cached = self.pack.listing('' if rel == os.curdir else rel)
+        if cached is not None and cached[0] == st.st_mtime_ns:
+            return cached[1], cached[2]
+        names, dirs = [], set()
+        with os.scandir(path) as it:
+            for entry in it:
+                names.append(entry.name)
+                try:
+                    if entry.is_dir():
+                        dirs.add(entry.name)
+                except OSError:
+                    pass
+        names.sort(key=lambda e: (e not in dirs, e.lower()))
+        # A directory modified within the last second could change again without its
+        # (coarse) mtime moving, so only settled directories are cached
+        if st.st_mtime < time.time() - RACY_MTIME_WINDOW:
+            self._listings[path] = (st.st_mtime_ns, names, dirs)
+        return names, dirs
 
     def update_entries(self):
         try:
-            entries = os.listdir(self.current_path)
-            entries.sort(key=lambda e: (not os.path.isdir(os.path.join(self.current_path, e)), e.lower()))
+            entries, self.entry_dirs = self.list_directory(self.current_path)
             if self.current_path == self.base_dir:
                 # Filter to only chapter_x directories at top level
-                entries = [e for e in entries if os.path.isdir(os.path.join(self.current_path, e)) and e.startswith('chapter_')]
-                self.entries = entries
+                self.entries = [e for e in entries if e in self.entry_dirs and e.startswith('chapter_')]
             else:
                 self.entries = ['..'] + entries
-        except PermissionError:
+        except OSError:
             self.entries = []
+            self.entry_dirs = set()
+
+    def entry_is_dir(self, entry):
+        """Whether an entry of the current listing is a directory, answered without a syscall."""
+        return entry == '..' or entry in self.entry_dirs
 
     def go_up(self):
         if self.current_path != self.base_dir:
@@ -33,14 +123,40 @@ class FileNavigator:
             self.go_up()
             return None
         path = os.path.join(self.current_path, entry)
-        if os.path.isdir(path):
+        if self.entry_is_dir(entry):
             self.current_path = path
             self.update_entries()
             return None
-        elif path.endswith('.json') and os.path.isfile(path):
+        elif path.endswith('.json'):
             return path
         return None
 
+    def map_image(self, folder, nested=True):
+        """
+        Return the path of an update folder's <version>.jpg, or None. 34.40 and 35.00 keep
+        theirs one folder further down. Goes through the listing cache, so checking the
+        folder under the cursor costs one stat.
+        """
+        name = os.path.basename(os.path.normpath(folder))
+        try:
+            names, dirs = self.list_directory(folder)
+        except OSError:
+            return None
+        if name + '.jpg' in names and name + '.jpg' not in dirs:
+            return os.path.join(folder, name + '.jpg')
+        if nested and name in dirs:
+            return self.map_image(os.path.join(folder, name), nested=False)
+        return None
+
+    def image_info(self, folder, wait=True):
+        """
+        Return the manifest entry (dimensions, progressive, colour, truncated) of an update
+        folder's map, or None. Answered from the image manifest, which is brought up to
+        date once per session by re-reading only new or changed JPEG headers. With
+        wait=False that happens in the background and None is returned until it is done.
+        """
+        return self.image_manifest.get(os.path.relpath(os.path.abspath(folder), self.base_dir), wait)
+
     def read_file(self, path):
         try:
             with open(path, 'r') as f:
@@ -49,38 +165,190 @@ class FileNavigator:
         except Exception as e:
             return [f'Error reading file: {e}']
 
+    def open_file(self, path):
+        """
+        Open a file for viewing without reading it: returns a MappedFile whose lines are
+        located and decoded only as they are sliced. Errors come back as a one-line list.
+        """
+        from navigator.core.mapped_file import MappedFile
+        try:
+            return MappedFile(path)
+        except Exception as e:
+            return [f'Error reading file: {e}']
 
     def search_locations(self, substring):
         """
         Search all json files within base_dir subtree for 'locations' containing the substring (case-insensitive).
-        Returns a dictionary mapping chapter/season directories to lists of update versions containing matches.
-        """
-        matching_dirs = {}  # Maps chapter_season to list of update versions
-        substring = substring.lower()  # Convert once for case-insensitive search
-        
-        for root, _, files in os.walk(self.base_dir):
-            for file in files:
-                if file.endswith('.json'):
-                    file_path = os.path.join(root, file)
-                    try:
-                        with open(file_path, 'r') as f:
-                            data = json.load(f)
-                        if 'locations' in data and isinstance(data['locations'], list):
-                            # Check if any location contains our search string
-                            if any(substring in loc.lower() for loc in data['locations']):
-                                # Get relative path from base_dir
-                                rel_path = os.path.relpath(file_path, self.base_dir)
-                                # Get chapter, season, and update parts
-                                parts = rel_path.split(os.sep)
-                                if len(parts) >= 3:
-                                    chapter_season = os.path.join(parts[0], parts[1])
-                                    update_version = parts[2]
-                                    
-                                    if chapter_season not in matching_dirs:
-                                        matching_dirs[chapter_season] = []
-                                    matching_dirs[chapter_season].append(update_version)
-                    except Exception:
-                        continue
-        
-        # Convert to list of tuples (chapter_season, [update_versions])
-        return [(k, sorted(matching_dirs[k])) for k in sorted(matching_dirs.keys())]
+        Returns a list of (chapter_season, [update_versions]) tuples for the directories containing matches.
+        Lookups are served from the persistent location index, which is validated against the tree on first use.
+        """
+        return self.location_index.search(substring)
+
+    def build_pack(self):
+        """
+        Pack the location index and directory listings into .navigator_cache/archive.pack and
+        start using it. Later sessions map it instead of walking the tree, until it goes stale.
+        """
+        from navigator.core.pack import build_pack, open_pack
+        path = build_pack(self.location_index, self.pack_path)
+        if self.pack is not None:
+            self.pack.close()
+        self.pack = self.location_index.pack = open_pack(path)
+        self._listings.clear()
+        return path
+
+    def invalidate_file(self, path):
+        """Tell the location index that a JSON file was rewritten outside of it."""
+        if path.endswith('.json'):
+            self.location_index.mark_stale(path)
+
+    def rename_location_everywhere(self, name, new_name, dry_run=False):
+        """
+        Rename a location in every update that lists it and in named_locations_through_updates.json,
+        committing all files or none. Returns a LocationEdit; with dry_run nothing is written.
+        """
+        from navigator.core.bulk import apply_location_edit
+        return apply_location_edit(self.location_index, self.documents, name, new_name, dry_run)
+
+    def remove_location_everywhere(self, name, dry_run=False):
+        """Remove a location from every update and from named_locations_through_updates.json, all files or none."""
+        from navigator.core.bulk import apply_location_edit
+        return apply_location_edit(self.location_index, self.documents, name, None, dry_run)
+
+    def reconcile_named_locations(self, dry_run=False):
+        """
+        Compare named_locations_through_updates.json with the per-version JSONs and, unless
+        dry_run, rewrite it to match them. Only JSONs changed since the location index last
+        saw them are re-read. Returns the Drift found (see core/reconcile.py).
+        """
+        from navigator.core.documents import dumps_wrapped
+        from navigator.core.reconcile import find_drift, is_in_sync, reconciled_reference
+        drift = find_drift(self.location_index, self.version_catalog())
+        if not dry_run and not is_in_sync(drift):
+            path = os.path.join(self.base_dir, NAMED_LOCATIONS_FILE)
+            try:
+                data = self.documents.load(path)
+            except FileNotFoundError:
+                data = []
+            self.documents.save(path, reconciled_reference(data, drift), serializer=dumps_wrapped)
+        return drift
+
+    def fuzzy_search_locations(self, query, limit=10):
+        """
+        Typo-tolerant lookup over the location names of every per-version JSON and
+        named_locations_through_updates.json. Returns [(location_name, edit_distance)], best first,
+        leaving out names too far from the query to be meant (see fuzzy.max_distance).
+        """
+        return self.location_index.fuzzy_matcher().search(query, limit)
+
+    def match_location_names(self, substring):
+        """Return the distinct location names containing substring (case-insensitive)."""
+        return self.location_index.match_names(substring)
+
+    def locations_versions(self, names, include_reference=True):
+        """
+        Return [(chapter_season, [update_versions])] for the updates containing any of the given names.
+        With include_reference, versions recorded in named_locations_through_updates.json are included too.
+        """
+        self.location_index.ensure_loaded()
+        return self.location_index.versions_for(names, include_reference=include_reference)
+
+    def _cached(self, name, build):
+        """Return a structure derived from the location index, rebuilt only when the index changes."""
+        self.location_index.ensure_loaded()
+        generation = self.location_index.generation
+        cached = self._derived.get(name)
+        if cached is None or cached[0] != generation:
+            cached = self._derived[name] = (generation, build())
+        return cached[1]
+
+    def version_catalog(self):
+        """Return the VersionCatalog: every update folder in chronological order."""
+        return self._cached('catalog', self.location_index.catalog)
+
+    def location_lifetimes(self):
+        """Return the LifetimeIndex mapping each location to the ordinal ranges it was on the map."""
+        return self._cached('lifetimes', lambda: self.location_index.lifetimes(self.version_catalog()))
+
+    def location_matrix(self):
+        """Return the LocationMatrix: locations x update folders as packed bitsets."""
+        return self._cached('matrix', lambda: self.location_index.matrix(self.version_catalog()))
+
+    def season_summary(self, chapter_season):
+        """
+        Return {category: sorted location names} for a chapter/season such as "chapter_2/season_3"
+        (see LocationMatrix.season_summary for the categories), or None if it has no updates.
+        """
+        matrix = self.location_matrix()
+        summary = matrix.season_summary(os.path.normpath(chapter_season))
+        if summary is None:
+            return None
+        return {category: matrix.decode(mask) for category, mask in summary.items()}
+
+    def version_snapshots(self):
+        """Return the parsed contents (Snapshot or None) of every update folder, by catalog ordinal."""
+        return self._cached('snapshots', lambda: self.location_index.snapshots(self.version_catalog()))
+
+    def diff_versions(self, old_version, new_version):
+        """
+        Return the VersionDiff between two updates, each given as "26.10" or "chapter_4/season_5/26.10".
+        Raises ValueError for an unknown or ambiguous version.
+        """
+        catalog = self.version_catalog()
+        old, new = catalog.resolve_one(old_version), catalog.resolve_one(new_version)
+        # Only the two updates' snapshots are built unless every one is already cached
+        cached = self._derived.get('snapshots')
+        if cached is not None and cached[0] == self.location_index.generation:
+            snapshots = cached[1]
+        else:
+            snapshots = self.location_index.snapshots(catalog, (old, new))
+        return diff_snapshots(catalog[old], snapshots[old], catalog[new], snapshots[new])
+
+    def diff_previous(self, chapter_season, version):
+        """
+        Return the VersionDiff of an update folder against the closest earlier update with data,
+        or None if there is none. Raises ValueError if the folder has no JSON.
+        """
+        catalog = self.version_catalog()
+        ordinal = catalog.ordinal(os.path.normpath(chapter_season), version)
+        if ordinal is None:
+            raise ValueError(f"No update data in {chapter_season}/{version}")
+        snapshots = self.version_snapshots()
+        previous = previous_with_data(snapshots, ordinal)
+        if previous is None:
+            return None
+        return diff_snapshots(catalog[previous], snapshots[previous], catalog[ordinal], snapshots[ordinal])
+
+    def timeline_diffs(self):
+        """Yield the VersionDiff of every update against the one before it, oldest first."""
+        return walk_timeline(self.version_catalog(), self.version_snapshots())
+
+    def locations_at(self, version):
+        """
+        Return the sorted location names on the map at an update, given as "26.10" or
+        "chapter_4/season_5/26.10". Raises ValueError for an unknown version.
+        """
+        lifetimes = self.location_lifetimes()
+        names = set()
+        for ordinal in self.version_catalog().resolve(version):
+            names.update(lifetimes.alive_at(ordinal))
+        return sorted(names)
+
+    def locations_between(self, start_version, end_version):
+        """
+        Return [(location_name, [(first_version, last_version), ...])] for every location on the
+        map at any point between the two updates (inclusive), with the spans that overlap the range.
+        Raises ValueError for an unknown version.
+        """
+        catalog = self.version_catalog()
+        lo = min(catalog.resolve(start_version))
+        hi = max(catalog.resolve(end_version))
+        if lo > hi:
+            lo, hi = hi, lo
+        lifetimes = self.location_lifetimes()
+        results = []
+        for name in lifetimes.alive_between(lo, hi):
+            spans = [(catalog.label(start), catalog.label(end))
+                     for start, end in lifetimes.lifetimes[name] if start <= hi and end >= lo]
+            results.append((name, spans))
+        return results
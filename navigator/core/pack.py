@@ -0,0 +1,314 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from navigator.core.index import PACK_FILE_NAME, split_version_path
+from navigator.core.scanner import default_workers, list_chapter_dirs
+from navigator.core.versions import chapter_season_key, version_key
+
+PACK_MAGIC = b'NAVPACK\x00'
+PACK_FORMAT = 1
+DIR_FLAG = 1 << 31  # set on a directory entry's string id when the entry is a directory
+
+# Every section is a flat array; *_starts arrays hold n + 1 offsets into the array after them
+_SECTIONS = (
+    ('string_starts', 'I'), ('strings', 'B'),
+    ('file_paths', 'I'), ('file_mtimes', 'q'), ('file_sizes', 'q'),
+    ('file_id_starts', 'I'), ('file_ids', 'I'),
+    ('file_category_starts', 'I'), ('file_categories', 'I'),  # (category id, value id) pairs
+    ('dir_paths', 'I'), ('dir_mtimes', 'q'), ('dir_entry_starts', 'I'), ('dir_entries', 'I'),
+    ('names', 'I'), ('posting_starts', 'I'), ('postings', 'I'),  # names sorted, postings = file numbers
+)
+_HEADER = struct.Struct('<8sII')  # magic, format, 1 if big-endian
+_SECTION = struct.Struct('<QQ')   # byte offset, item count
+
+
+class _Strings:
+    """Interning table: every distinct string is stored once and referred to by its number."""
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def __call__(self, value):
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return sid
+
+
+def _listing(path):
+    """(mtime_ns, [(name, is_dir)]) for a directory, ordered like FileNavigator.list_directory."""
+    st = os.stat(path)
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            entries.append((entry.name, is_dir))
+    entries.sort(key=lambda e: (not e[1], e[0].lower()))
+    return st.st_mtime_ns, entries
+
+
+def _release_order(rel):
+    split = split_version_path(rel)
+    if split is None:
+        return (1, (), (), rel)
+    return (0, chapter_season_key(split[0]), version_key(split[1]), rel)
+
+
+def build_pack(index, path=None):
+    """
+    Pack the location index and the directory listings of the archive into one file.
+
+    index must be up to date (it is refreshed here). Returns the path written. The file is
+    replaced atomically, so a navigator that has the previous pack mapped keeps reading
+    the old copy.
+    """
+    index.ensure_loaded()
+    base_dir = index.base_dir
+    path = path or os.path.join(os.path.dirname(index.cache_path), PACK_FILE_NAME)
+    intern = _Strings()
+    arrays = {name: array(code) for name, code in _SECTIONS}
+
+    # Files in release order, so a file's number is its update's ordinal, with their
+    # locations and categories as string ids
+    rels = sorted(index.files, key=_release_order)
+    file_numbers = {}
+    arrays['file_id_starts'].append(0)
+    arrays['file_category_starts'].append(0)
+    for number, rel in enumerate(rels):
+        entry = index.files[rel]
+        file_numbers[rel] = number
+        arrays['file_paths'].append(intern(rel))
+        arrays['file_mtimes'].append(entry['mtime'])
+        arrays['file_sizes'].append(entry['size'])
+        arrays['file_ids'].extend(intern(name) for name in entry['locations'])
+        arrays['file_id_starts'].append(len(arrays['file_ids']))
+        for category, values in entry.get('categories', {}).items():
+            for value in values:
+                arrays['file_categories'].extend((intern(category), intern(value)))
+        arrays['file_category_starts'].append(len(arrays['file_categories']))
+
+    # Postings: distinct names in sorted order, each with its sorted file numbers
+    arrays['posting_starts'].append(0)
+    for name in sorted(index.postings):
+        arrays['names'].append(intern(name))
+        arrays['postings'].extend(sorted(file_numbers[rel] for rel in index.postings[name]))
+        arrays['posting_starts'].append(len(arrays['postings']))
+
+    # Directory listings: the archive root and everything under the chapter trees
+    directories = ['']
+    for chapter in list_chapter_dirs(base_dir):
+        for root, dirs, _ in os.walk(os.path.join(base_dir, chapter)):
+            dirs.sort()
+            directories.append(os.path.relpath(root, base_dir))
+    arrays['dir_entry_starts'].append(0)
+    for rel in directories:
+        mtime_ns, entries = _listing(os.path.join(base_dir, rel))
+        arrays['dir_paths'].append(intern(rel))
+        arrays['dir_mtimes'].append(mtime_ns)
+        arrays['dir_entries'].extend(intern(name) | (DIR_FLAG if is_dir else 0) for name, is_dir in entries)
+        arrays['dir_entry_starts'].append(len(arrays['dir_entries']))
+
+    encoded = [value.encode('utf-8') for value in intern.values]
+    arrays['string_starts'].append(0)
+    for value in encoded:
+        arrays['string_starts'].append(arrays['string_starts'][-1] + len(value))
+    arrays['strings'] = array('B', b''.join(encoded))
+
+    # Header, section table, then each section 8-byte aligned so it can be viewed in place
+    offset = _HEADER.size + _SECTION.size * len(_SECTIONS)
+    table, blobs = [], []
+    for name, _ in _SECTIONS:
+        offset += -offset % 8
+        data = arrays[name].tobytes()
+        table.append(_SECTION.pack(offset, len(arrays[name])))
+        blobs.append((offset, data))
+        offset += len(data)
+    out = bytearray(offset)
+    out[:_HEADER.size] = _HEADER.pack(PACK_MAGIC, PACK_FORMAT, sys.byteorder == 'big')
+    out[_HEADER.size:_HEADER.size + len(table) * _SECTION.size] = b''.join(table)
+    for start, data in blobs:
+        out[start:start + len(data)] = data
+    from navigator.core.documents import write_atomic  # only builds write; sessions just map the pack
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, bytes(out))
+    return path
+
+
+class PackedArchive:
+    """
+    Read-only view of a pack written by build_pack(), memory-mapped rather than read.
+
+    Sections are viewed in place as typed arrays, so opening a pack costs one mmap and
+    only the pages a lookup touches are ever read. Exact name lookups binary-search the
+    sorted name table, and substring lookups scan the names alone, casefolded once; in
+    both cases only the matching postings and file paths are decoded. Directory listings
+    and per-file locations and categories are decoded on request.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        self.sections = {}
+        try:
+            magic, version, big_endian = _HEADER.unpack_from(self.map, 0)
+            if magic != PACK_MAGIC or version != PACK_FORMAT or big_endian != (sys.byteorder == 'big'):
+                raise ValueError(f'{path} is not a pack this version can read')
+            for i, (name, code) in enumerate(_SECTIONS):
+                offset, count = _SECTION.unpack_from(self.map, _HEADER.size + i * _SECTION.size)
+                size = array(code).itemsize
+                if offset + count * size > len(self.map):
+                    raise ValueError(f'{path} is truncated')
+                section = self.view[offset:offset + count * size]
+                self.sections[name] = section.cast(code) if code != 'B' else section
+        except (ValueError, struct.error):
+            self.close()
+            raise
+        self.dirs = None  # rel dir -> dir number, built on first listing
+        self.folded = None  # [(casefolded name, name)] in name table order, built on first match_names
+
+    def close(self):
+        # The map cannot be closed while a view of it is alive
+        for section in self.sections.values():
+            section.release()
+        self.sections = {}
+        self.view.release()
+        self.map.close()
+
+    def string(self, sid):
+        starts = self.sections['string_starts']
+        return bytes(self.sections['strings'][starts[sid]:starts[sid + 1]]).decode('utf-8')
+
+    @property
+    def file_count(self):
+        return len(self.sections['file_paths'])
+
+    def file_path(self, number):
+        return self.string(self.sections['file_paths'][number])
+
+    def file_locations(self, number):
+        starts = self.sections['file_id_starts']
+        return [self.string(sid) for sid in self.sections['file_ids'][starts[number]:starts[number + 1]]]
+
+    def file_categories(self, number):
+        starts = self.sections['file_category_starts']
+        pairs = self.sections['file_categories'][starts[number]:starts[number + 1]]
+        categories = {}
+        for i in range(0, len(pairs), 2):
+            categories.setdefault(self.string(pairs[i]), []).append(self.string(pairs[i + 1]))
+        return categories
+
+    def files(self):
+        """Yield (rel path, mtime_ns, size, locations, categories) for every packed file."""
+        mtimes, sizes = self.sections['file_mtimes'], self.sections['file_sizes']
+        for number in range(self.file_count):
+            yield (self.file_path(number), mtimes[number], sizes[number],
+                   self.file_locations(number), self.file_categories(number))
+
+    def file_paths(self):
+        """Yield the rel path of every packed file, in release order."""
+        for number in range(self.file_count):
+            yield self.file_path(number)
+
+    def postings(self):
+        """Yield (name, file numbers) for every packed name, in name order."""
+        names, starts, postings = self.sections['names'], self.sections['posting_starts'], self.sections['postings']
+        for i, sid in enumerate(names):
+            yield self.string(sid), postings[starts[i]:starts[i + 1]]
+
+    def find(self, name):
+        """Return the rel paths of the files listing exactly name, without decoding other names."""
+        names = self.sections['names']
+        lo, hi = 0, len(names)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.string(names[mid]) < name:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(names) or self.string(names[lo]) != name:
+            return []
+        starts = self.sections['posting_starts']
+        return [self.file_path(number) for number in self.sections['postings'][starts[lo]:starts[lo + 1]]]
+
+    def match_names(self, substring):
+        """Return the packed location names containing substring, ignoring case."""
+        if self.folded is None:
+            self.folded = [(name.casefold(), name) for name in map(self.string, self.sections['names'])]
+        query = substring.casefold()
+        return [name for folded, name in self.folded if query in folded]
+
+    def listing(self, rel_dir):
+        """Return (mtime_ns, sorted names, set of directory names) for a packed directory, or None."""
+        if self.dirs is None:
+            self.dirs = {self.string(sid): number for number, sid in enumerate(self.sections['dir_paths'])}
+        number = self.dirs.get(rel_dir)
+        if number is None:
+            return None
+        starts = self.sections['dir_entry_starts']
+        names, dirs = [], set()
+        for value in self.sections['dir_entries'][starts[number]:starts[number + 1]]:
+            name = self.string(value & ~DIR_FLAG)
+            names.append(name)
+            if value & DIR_FLAG:
+                dirs.add(name)
+        return self.sections['dir_mtimes'][number], names, dirs
+
+    def stale_paths(self, base_dir, workers=None):
+        """
+        Return the packed files and directories that changed on disk, or [] if the pack is
+        current. Costs one stat per packed path, issued from a thread pool as the archive
+        walk is; nothing is listed or parsed. A file added or removed changes its
+        directory's mtime. The root is compared by its chapter directories only, since the
+        cache directory lives there too.
+        """
+        stale = []
+        packed = sorted(name for name in self.listing('')[2] if name.startswith('chapter_'))
+        if list_chapter_dirs(base_dir) != packed:
+            stale.append('')
+        sections = self.sections
+        checks = [(self.string(sid), sections['dir_mtimes'][number], None)
+                  for number, sid in enumerate(sections['dir_paths']) if number]
+        checks.extend((self.file_path(number), sections['file_mtimes'][number], sections['file_sizes'][number])
+                      for number in range(self.file_count))
+
+        prefix = os.path.join(base_dir, '')  # joined by concatenation: os.path.join costs as much as the stat
+
+        def changed(chunk):
+            found = []
+            for rel, mtime, size in chunk:
+                try:
+                    st = os.stat(prefix + rel)
+                except OSError:
+                    found.append(rel)
+                    continue
+                if st.st_mtime_ns != mtime or (size is not None and st.st_size != size):
+                    found.append(rel)
+            return found
+
+        # One chunk per worker: a task per stat costs more than the stat on a local disk
+        workers = workers or default_workers()
+        if workers <= 1:
+            return stale + changed(checks)
+        from concurrent.futures import ThreadPoolExecutor
+        chunks = [checks[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for found in pool.map(changed, chunks):
+                stale.extend(found)
+        return stale
+
+
+def open_pack(path):
+    """Map the pack at path, or return None if there is none or it is unreadable."""
+    try:
+        return PackedArchive(path)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,110 @@
+from collections import namedtuple
+from navigator.core.index import split_version_path
+from navigator.core.versions import version_key
+
+# How named_locations_through_updates.json differs from the per-version JSONs, each as
+# {city: [versions, oldest first]}:
+#   missing    - listed by an update's JSON but not by the reference file
+#   stale      - listed by the reference file, but every folder of that version has
+#                location data without the city
+#   unknown    - listed by the reference file for a version with no update folder
+#   unverified - listed by the reference file for a version that has a folder without
+#                location data (an empty or invalid JSON), where the city may be missing
+# Unknown and unverified versions can be neither confirmed nor refuted by the archive,
+# so they are reported but kept when the drift is applied.
+Drift = namedtuple('Drift', 'missing stale unknown unverified')
+
+
+def archive_mapping(index):
+    """
+    Build {city: set of versions} from the per-version JSONs, plus the set of versions
+    whose every folder has location data (34.40, for one, has two folders).
+
+    The location index already holds every file's locations and re-parses only files
+    whose mtime or size changed, so this never reads an unchanged JSON.
+    """
+    index.ensure_loaded()
+    mapping = {}
+    for name, paths in index.postings.items():
+        versions = mapping[name] = set()
+        for rel in paths:
+            split = split_version_path(rel)
+            if split is not None:
+                versions.add(split[1])
+    with_data, without_data = set(), set()
+    for rel, entry in index.files.items():
+        split = split_version_path(rel)
+        if split is not None:
+            (with_data if entry['locations'] else without_data).add(split[1])
+    return mapping, with_data - without_data
+
+
+def find_drift(index, catalog):
+    """Compare the reference file with the per-version JSONs, in both directions."""
+    mapping, complete = archive_mapping(index)
+    reference = index.load_reference()
+    missing, stale, unknown, unverified = {}, {}, {}, {}
+
+    def put(report, city, versions):
+        if versions:
+            report[city] = sorted(versions, key=version_key)
+
+    for city, versions in mapping.items():
+        put(missing, city, versions - set(reference.get(city, ())))
+    for city, versions in reference.items():
+        listed = set(versions)
+        actual = mapping.get(city, set())
+        put(unknown, city, {v for v in listed if v not in catalog.by_version})
+        put(unverified, city, {v for v in listed - actual if v in catalog.by_version and v not in complete})
+        put(stale, city, {v for v in listed - actual if v in complete})
+    return Drift(missing, stale, unknown, unverified)
+
+
+def is_in_sync(drift):
+    """Whether applying the drift would change nothing."""
+    return not (drift.missing or drift.stale)
+
+
+def reconciled_reference(data, drift):
+    """
+    Return a copy of the parsed reference file with drift applied: missing versions added
+    and stale ones dropped. Every city's versions come out in release order (1.11 after
+    1.6.0, 3.40 before 33.00), not string order. Existing cities keep their place; new
+    ones follow, by first appearance. A city whose every version was stale is dropped.
+    """
+    entries = []
+    seen = set()
+    for item in data if isinstance(data, list) else []:
+        if not (isinstance(item, dict) and isinstance(item.get('city'), str)):
+            entries.append(item)
+            continue
+        city = item['city']
+        seen.add(city)
+        listed = set(item.get('versions', []))
+        versions = (listed | set(drift.missing.get(city, ()))) - set(drift.stale.get(city, ()))
+        if versions or not listed:
+            entries.append(dict(item, versions=sorted(versions, key=version_key)))
+    added = [(city, versions) for city, versions in drift.missing.items() if city not in seen]
+    added.sort(key=lambda pair: (version_key(pair[1][0]), pair[0].lower()))
+    entries.extend({'city': city, 'versions': versions} for city, versions in added)
+    return entries
+
+
+def drift_report(drift):
+    """Readable lines describing a Drift, for the TUI report view or the terminal."""
+    if not any(drift):
+        return ['named_locations_through_updates.json matches the per-version JSONs.']
+    lines = []
+    sections = (
+        ('In update JSONs, missing from the reference file', drift.missing),
+        ('In the reference file, not in those updates', drift.stale),
+        ('In the reference file for versions not in the archive (kept)', drift.unknown),
+        ('In the reference file for updates without location data (kept)', drift.unverified),
+    )
+    for heading, report in sections:
+        if not report:
+            continue
+        lines.append(f'{heading} ({len(report)} cities)')
+        lines.extend(f'  {city}: {", ".join(versions)}' for city, versions in sorted(report.items(), key=lambda p: p[0].lower()))
+        lines.append('')
+    return lines
@@ -0,0 +1,141 @@
+import os
+import json
+
+RACY_MTIME_WINDOW = 1.0  # seconds within which an mtime can repeat after a change, so a stamp proves nothing
+
+
+def default_workers():
+    """Worker count for archive scans, overridable with NAVIGATOR_SCAN_WORKERS."""
+    try:
+        workers = int(os.environ.get('NAVIGATOR_SCAN_WORKERS', ''))
+    except ValueError:
+        workers = 0
+    if workers > 0:
+        return workers
+    # Same default as ThreadPoolExecutor: the work is dominated by I/O round trips
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def load_json_file(path):
+    """Parse one JSON file, returning None if it is empty or invalid."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def list_chapter_dirs(base_dir):
+    """Return the sorted chapter_* directory names directly under base_dir."""
+    try:
+        with os.scandir(base_dir) as it:
+            return sorted(e.name for e in it if e.name.startswith('chapter_') and e.is_dir())
+    except OSError:
+        return []
+
+
+def find_map_images(base_dir):
+    """Return the rel paths of every <version>.jpg inside a folder named <version>, sorted."""
+    images = []
+    for chapter in list_chapter_dirs(base_dir):
+        for root, dirs, files in os.walk(os.path.join(base_dir, chapter)):
+            dirs.sort()
+            name = os.path.basename(root) + '.jpg'
+            if name in files:
+                images.append(os.path.relpath(os.path.join(root, name), base_dir))
+    return images
+
+
+def stat_json_files(base_dir, unit):
+    """Walk one chapter/season directory and return sorted [(rel_path, stat)] for its JSON files."""
+    results = []
+    unit_dir = os.path.join(base_dir, unit)
+    if not os.path.isdir(unit_dir):
+        # A JSON sitting directly in a chapter directory is its own unit
+        try:
+            results.append((unit, os.stat(unit_dir)))
+        except OSError:
+            pass
+        return results
+    _stat_json_tree(base_dir, unit, results)
+    return results
+
+
+def _stat_json_tree(base_dir, rel_dir, results):
+    # In os.walk order (a directory's files, then its subdirectories, each sorted), but
+    # with scandir and rel paths built by concatenation: a cold query spends most of its
+    # time in this walk, and os.walk and relpath were most of that
+    try:
+        with os.scandir(os.path.join(base_dir, rel_dir)) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            if not entry.is_symlink():
+                subdirs.append(entry.name)
+        elif entry.name.endswith('.json'):
+            try:
+                results.append((rel_dir + os.sep + entry.name, entry.stat()))
+            except OSError:
+                continue
+    for name in subdirs:
+        _stat_json_tree(base_dir, rel_dir + os.sep + name, results)
+
+
+class ArchiveScanner:
+    """
+    Fans the archive walk out over chapter/season directories with a bounded thread pool.
+
+    Results always come back in sorted path order, whatever order the workers finish in.
+    Parsing can optionally be moved to a process pool when the JSON decode itself,
+    rather than the per-file open/stat latency, is the bottleneck.
+    """
+
+    def __init__(self, base_dir, workers=None, use_processes=False):
+        self.base_dir = os.path.abspath(base_dir)
+        self.workers = workers if workers and workers > 0 else default_workers()
+        self.use_processes = use_processes
+
+    def list_units(self):
+        """Return the chapter/season directories that make up one unit of scan work each."""
+        units = []
+        for chapter in list_chapter_dirs(self.base_dir):
+            chapter_dir = os.path.join(self.base_dir, chapter)
+            try:
+                with os.scandir(chapter_dir) as it:
+                    names = sorted(e.name for e in it if e.is_dir() or e.name.endswith('.json'))
+            except OSError:
+                continue
+            units.extend(os.path.join(chapter, name) for name in names)
+        return units
+
+    def map(self, fn, items):
+        """Apply fn to items on the thread pool, preserving input order."""
+        items = list(items)
+        if self.workers <= 1 or len(items) <= 1:
+            return [fn(item) for item in items]
+        # Imported on first use: concurrent.futures pulls in logging, which a one-shot
+        # query that never needs a pool should not pay for at startup
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items))) as executor:
+            return list(executor.map(fn, items))
+
+    def scan(self):
+        """Return [(rel_path, stat)] for every JSON under the chapter_* directories."""
+        per_unit = self.map(lambda unit: stat_json_files(self.base_dir, unit), self.list_units())
+        return [entry for entries in per_unit for entry in entries]
+
+    def load(self, rel_paths):
+        """Parse the given relative JSON paths and return their documents in the same order."""
+        paths = [os.path.join(self.base_dir, rel) for rel in rel_paths]
+        if self.use_processes and self.workers > 1 and len(paths) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(self.workers, os.cpu_count() or 1)) as executor:
+                return list(executor.map(load_json_file, paths, chunksize=16))
+        return self.map(load_json_file, paths)
@@ -0,0 +1,300 @@
+import bisect
+import random
+
+
+class _Piece:
+    """Treap node: one span of a source string, plus totals for its subtree."""
+    __slots__ = ('source', 'start', 'length', 'newlines', 'priority', 'left', 'right', 'size', 'lines')
+
+    def __init__(self, source, start, length, newlines, priority):
+        self.source = source
+        self.start = start
+        self.length = length
+        self.newlines = newlines
+        self.priority = priority
+        self.left = None
+        self.right = None
+        self.size = length
+        self.lines = newlines
+
+    def update(self):
+        self.size = self.length
+        self.lines = self.newlines
+        if self.left is not None:
+            self.size += self.left.size
+            self.lines += self.left.lines
+        if self.right is not None:
+            self.size += self.right.size
+            self.lines += self.right.lines
+
+
+def _size(node):
+    return node.size if node is not None else 0
+
+
+def _lines(node):
+    return node.lines if node is not None else 0
+
+
+class PieceTable:
+    """
+    Text as a sequence of spans over immutable source strings.
+
+    The original text is never modified; inserted text is appended as a new source and
+    edits only rearrange spans. Spans live in a treap keyed by position whose nodes also
+    count the characters and newlines below them, so inserts, deletes and "where does
+    line N start" all take O(log n) in the number of spans.
+    """
+
+    def __init__(self, text='', seed=None):
+        self.sources = []
+        self.source_newlines = []  # per source: sorted offsets of its '\n' characters
+        self.random = random.Random(seed)
+        self.root = None
+        if text:
+            self.root = self._new_piece(self._add_source(text), 0, len(text))
+
+    def __len__(self):
+        return _size(self.root)
+
+    @property
+    def line_count(self):
+        return _lines(self.root) + 1
+
+    def _add_source(self, text):
+        self.sources.append(text)
+        self.source_newlines.append([i for i, char in enumerate(text) if char == '\n'])
+        return len(self.sources) - 1
+
+    def _count_newlines(self, source, start, end):
+        newlines = self.source_newlines[source]
+        return bisect.bisect_left(newlines, end) - bisect.bisect_left(newlines, start)
+
+    def _new_piece(self, source, start, length):
+        newlines = self._count_newlines(source, start, start + length)
+        return _Piece(source, start, length, newlines, self.random.random())
+
+    def _merge(self, a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        if a.priority > b.priority:
+            a.right = self._merge(a.right, b)
+            a.update()
+            return a
+        b.left = self._merge(a, b.left)
+        b.update()
+        return b
+
+    def _split(self, node, offset):
+        """Split into (first offset characters, the rest), cutting a span if needed."""
+        if node is None:
+            return None, None
+        left_size = _size(node.left)
+        if offset <= left_size:
+            left, node.left = self._split(node.left, offset)
+            node.update()
+            return left, node
+        if offset >= left_size + node.length:
+            node.right, right = self._split(node.right, offset - left_size - node.length)
+            node.update()
+            return node, right
+        cut = offset - left_size
+        tail = self._new_piece(node.source, node.start + cut, node.length - cut)
+        node.length = cut
+        node.newlines = self._count_newlines(node.source, node.start, node.start + cut)
+        right = self._merge(tail, node.right)
+        node.right = None
+        node.update()
+        return node, right
+
+    def insert(self, offset, text):
+        """Insert text before the character at offset."""
+        if not text:
+            return
+        offset = max(0, min(offset, len(self)))
+        piece = self._new_piece(self._add_source(text), 0, len(text))
+        left, right = self._split(self.root, offset)
+        self.root = self._merge(self._merge(left, piece), right)
+
+    def delete(self, offset, length):
+        """Remove length characters starting at offset and return them."""
+        offset = max(0, min(offset, len(self)))
+        length = max(0, min(length, len(self) - offset))
+        if not length:
+            return ''
+        removed = self.text(offset, offset + length)
+        left, rest = self._split(self.root, offset)
+        _, right = self._split(rest, length)
+        self.root = self._merge(left, right)
+        return removed
+
+    def chunks(self, start=0, end=None):
+        """Yield the text between start and end as source slices, without joining it."""
+        end = len(self) if end is None else min(end, len(self))
+        if start >= end:
+            return
+        # In-order walk that skips subtrees entirely outside [start, end)
+        stack = []
+        node, base = self.root, 0
+        while stack or node is not None:
+            while node is not None:
+                stack.append((node, base))
+                # The left subtree covers [base, base + left size); descend only if it reaches start
+                node = node.left if base + _size(node.left) > start else None
+            node, base = stack.pop()
+            piece_start = base + _size(node.left)
+            if piece_start >= end:
+                return
+            piece_end = piece_start + node.length
+            if piece_end > start:
+                lo = max(start, piece_start) - piece_start
+                hi = min(end, piece_end) - piece_start
+                yield self.sources[node.source][node.start + lo:node.start + hi]
+            node, base = node.right, piece_end
+
+    def text(self, start=0, end=None):
+        return ''.join(self.chunks(start, end))
+
+    def line_start(self, row):
+        """Offset of the first character of line row (0-based)."""
+        if row <= 0:
+            return 0
+        if row >= self.line_count:
+            raise IndexError(row)
+        node, base, k = self.root, 0, row
+        while node is not None:
+            left_lines = _lines(node.left)
+            if k <= left_lines:
+                node = node.left
+                continue
+            k -= left_lines
+            base += _size(node.left)
+            if k <= node.newlines:
+                newlines = self.source_newlines[node.source]
+                i = bisect.bisect_left(newlines, node.start) + k - 1
+                return base + newlines[i] - node.start + 1
+            k -= node.newlines
+            base += node.length
+            node = node.right
+        raise IndexError(row)
+
+    def line_length(self, row):
+        start = self.line_start(row)
+        end = self.line_start(row + 1) - 1 if row + 1 < self.line_count else len(self)
+        return end - start
+
+    def line(self, row):
+        """Text of line row, without its newline."""
+        start = self.line_start(row)
+        end = self.line_start(row + 1) - 1 if row + 1 < self.line_count else len(self)
+        return self.text(start, end)
+
+    def lines(self):
+        return self.text().split('\n')
+
+    def offset(self, row, col):
+        """Offset of (row, col), with col clamped to the line."""
+        return self.line_start(row) + max(0, min(col, self.line_length(row)))
+
+    def position(self, offset):
+        """(row, col) of an offset."""
+        offset = max(0, min(offset, len(self)))
+        node, k, row = self.root, offset, 0
+        while node is not None:
+            left_size = _size(node.left)
+            if k < left_size:
+                node = node.left
+                continue
+            row += _lines(node.left)
+            k -= left_size
+            if k <= node.length:
+                row += self._count_newlines(node.source, node.start, node.start + k)
+                break
+            row += node.newlines
+            k -= node.length
+            node = node.right
+        return row, offset - self.line_start(row)
+
+
+class TextBuffer(PieceTable):
+    """
+    PieceTable with an edit journal for unlimited undo and redo.
+
+    The journal stores each edit as (kind, offset, text), never a copy of the document.
+    Consecutive typing or deleting is merged into one entry until checkpoint() is called,
+    so undo steps back a word or a run of deletes rather than a single character.
+    """
+
+    def __init__(self, text='', seed=None):
+        super().__init__(text, seed)
+        self.undo_stack = []
+        self.redo_stack = []
+        self.grouping = False  # whether the next edit may merge into the last entry
+        self.last_change = None  # (offset, removed text, inserted text) of the latest edit
+
+    def checkpoint(self):
+        """Stop merging edits into the current undo step (e.g. after the cursor moved)."""
+        self.grouping = False
+
+    def _record(self, kind, offset, text):
+        self.redo_stack = []
+        last = self.undo_stack[-1] if self.undo_stack and self.grouping else None
+        if last is not None and last[0] == kind and '\n' not in text and not last[2].endswith('\n'):
+            if kind == 'insert' and offset == last[1] + len(last[2]):
+                self.undo_stack[-1] = (kind, last[1], last[2] + text)
+                return
+            if kind == 'delete' and offset + len(text) == last[1]:  # backspace
+                self.undo_stack[-1] = (kind, offset, text + last[2])
+                return
+            if kind == 'delete' and offset == last[1]:  # forward delete
+                self.undo_stack[-1] = (kind, offset, last[2] + text)
+                return
+        self.undo_stack.append((kind, offset, text))
+        self.grouping = '\n' not in text
+
+    def insert(self, offset, text):
+        offset = max(0, min(offset, len(self)))
+        super().insert(offset, text)
+        if text:
+            self._record('insert', offset, text)
+            self.last_change = (offset, '', text)
+
+    def delete(self, offset, length):
+        offset = max(0, min(offset, len(self)))
+        removed = super().delete(offset, length)
+        if removed:
+            self._record('delete', offset, removed)
+            self.last_change = (offset, removed, '')
+        return removed
+
+    def undo(self):
+        """Revert the last edit and return the offset to put the cursor at, or None."""
+        if not self.undo_stack:
+            return None
+        kind, offset, text = self.undo_stack.pop()
+        self.redo_stack.append((kind, offset, text))
+        self.grouping = False
+        if kind == 'insert':
+            PieceTable.delete(self, offset, len(text))
+            self.last_change = (offset, text, '')
+            return offset
+        PieceTable.insert(self, offset, text)
+        self.last_change = (offset, '', text)
+        return offset + len(text)
+
+    def redo(self):
+        """Reapply the last undone edit and return the cursor offset, or None."""
+        if not self.redo_stack:
+            return None
+        kind, offset, text = self.redo_stack.pop()
+        self.undo_stack.append((kind, offset, text))
+        self.grouping = False
+        if kind == 'insert':
+            PieceTable.insert(self, offset, text)
+            self.last_change = (offset, '', text)
+            return offset + len(text)
+        PieceTable.delete(self, offset, len(text))
+        self.last_change = (offset, text, '')
+        return offset
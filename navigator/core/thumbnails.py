@@ -0,0 +1,74 @@
+import hashlib
+import os
+import struct
+from collections import namedtuple
+from navigator.core.documents import write_atomic
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is only needed for map previews
+    Image = None
+
+THUMBNAILS_DIR_NAME = 'thumbnails'
+_HEADER = struct.Struct('<8sqqHH')  # magic, source mtime_ns, source size, width, height
+_MAGIC = b'NAVTHMB1'
+
+# A downscaled map: width x height RGB pixels, row by row
+Thumbnail = namedtuple('Thumbnail', 'width height pixels')
+
+
+def make_thumbnail(path, box):
+    """
+    Decode the image at path scaled to fit within box = (width, height) pixels.
+
+    JPEGs are decoded straight at 1/2, 1/4 or 1/8 scale by the DCT (Image.draft), so a
+    2048 px map costs a 256 px decode rather than a full one.
+    """
+    if Image is None:
+        raise RuntimeError('map previews need Pillow: pip install Pillow')
+    with Image.open(path) as image:
+        image.draft('RGB', box)
+        image = image.convert('RGB')
+    image.thumbnail(box, Image.BILINEAR)
+    return Thumbnail(image.width, image.height, image.tobytes())
+
+
+class ThumbnailStore:
+    """
+    Map thumbnails cached on disk, one small file per image and box size.
+
+    A cached thumbnail records the mtime and size of the image it was made from and is
+    made again when those change. The cache is an optimization only: if it cannot be
+    written (a read-only archive) thumbnails are simply made each time.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.made = 0  # thumbnails decoded rather than read from the cache
+
+    def cache_path(self, path, box):
+        key = f'{os.path.abspath(path)}|{box[0]}x{box[1]}'.encode('utf-8')
+        return os.path.join(self.cache_dir, hashlib.sha1(key).hexdigest() + '.thumb')
+
+    def get(self, path, box):
+        """Return the Thumbnail of the image at path for box, from the cache when current."""
+        st = os.stat(path)
+        cache_path = self.cache_path(path, box)
+        try:
+            with open(cache_path, 'rb') as f:
+                data = f.read()
+            magic, mtime, size, width, height = _HEADER.unpack_from(data)
+            if (magic, mtime, size) == (_MAGIC, st.st_mtime_ns, st.st_size) \
+                    and len(data) == _HEADER.size + width * height * 3:
+                return Thumbnail(width, height, data[_HEADER.size:])
+        except (OSError, struct.error):
+            pass
+        thumbnail = make_thumbnail(path, box)
+        self.made += 1
+        header = _HEADER.pack(_MAGIC, st.st_mtime_ns, st.st_size, thumbnail.width, thumbnail.height)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            write_atomic(cache_path, header + thumbnail.pixels)
+        except OSError:
+            pass
+        return thumbnail
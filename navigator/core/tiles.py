@@ -0,0 +1,176 @@
+import json
+import os
+import shutil
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from navigator.core.documents import write_atomic
+from navigator.core.scanner import find_map_images
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is only needed to build tiles
+    Image = None
+
+TILE_SIZE = 256
+TILE_QUALITY = 85
+TILES_FORMAT = 1
+TILES_DIR_NAME = 'tiles'
+MANIFEST_FILE_NAME = 'tiles.json'
+
+# Outcome of build_pyramids(): rel image paths built and skipped as up to date,
+# {rel: error message} for images that could not be cut, tiles written and wall time
+TileReport = namedtuple('TileReport', 'built skipped failed tiles seconds')
+
+
+def require_pillow():
+    if Image is None:
+        raise RuntimeError('building map tiles needs Pillow: pip install Pillow')
+
+
+def max_zoom(width, height, tile_size=TILE_SIZE):
+    """The zoom at which the image is shown at full size, zoom 0 fitting it in one tile."""
+    zoom = 0
+    while max(width, height) > tile_size << zoom:
+        zoom += 1
+    return zoom
+
+
+def level_size(width, height, zoom, top):
+    """Size of the image at zoom, halved once per level below top."""
+    factor = 1 << (top - zoom)
+    return -(-width // factor), -(-height // factor)
+
+
+def _cut_level(level, target, zoom, tile_size, quality):
+    tiles = 0
+    for x in range(-(-level.width // tile_size)):
+        column = os.path.join(target, str(zoom), str(x))
+        os.makedirs(column, exist_ok=True)
+        for y in range(-(-level.height // tile_size)):
+            # Cropping past the edge fills with black
+            tile = level.crop((x * tile_size, y * tile_size, (x + 1) * tile_size, (y + 1) * tile_size))
+            tile.save(os.path.join(column, f'{y}.jpg'), 'JPEG', quality=quality)
+            tiles += 1
+    return tiles
+
+
+def cut_pyramid(source, target, tile_size=TILE_SIZE, quality=TILE_QUALITY):
+    """
+    Cut one image into target/z/x/y.jpg tiles and return its manifest. Runs in a worker.
+
+    Each level is decoded on its own, and JPEG levels below full size are decoded
+    straight at 1/2, 1/4 or 1/8 scale by the DCT (Image.draft), so a worker never holds
+    more than one full-resolution image plus the level being cut. Edge tiles are padded
+    to tile_size with black, which is what Leaflet expects.
+    """
+    require_pillow()
+    st = os.stat(source)
+    with Image.open(source) as probe:
+        width, height = probe.size
+    top = max_zoom(width, height, tile_size)
+    tiles = 0
+    for zoom in range(top, -1, -1):
+        size = level_size(width, height, zoom, top)
+        image = Image.open(source)
+        try:
+            image.draft('RGB', size)
+            level = image if image.mode == 'RGB' else image.convert('RGB')
+            if level.size != size:
+                level = level.resize(size, Image.LANCZOS)
+            tiles += _cut_level(level, target, zoom, tile_size, quality)
+            level = None  # free this level before the next one is decoded
+        finally:
+            image.close()
+    return {
+        'format': TILES_FORMAT,
+        'mtime': st.st_mtime_ns,
+        'size': st.st_size,
+        'width': width,
+        'height': height,
+        'tile_size': tile_size,
+        'quality': quality,
+        'max_zoom': top,
+        'tiles': tiles,
+    }
+
+
+def read_manifest(target):
+    try:
+        with open(os.path.join(target, MANIFEST_FILE_NAME), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_current(source, target, tile_size=TILE_SIZE, quality=TILE_QUALITY):
+    """Whether target holds a complete pyramid cut from the image as it is now."""
+    manifest = read_manifest(target)
+    if not isinstance(manifest, dict):
+        return False
+    try:
+        st = os.stat(source)
+    except OSError:
+        return False
+    return (manifest.get('format') == TILES_FORMAT and manifest.get('mtime') == st.st_mtime_ns
+            and manifest.get('size') == st.st_size and manifest.get('tile_size') == tile_size
+            and manifest.get('quality') == quality)
+
+
+def _build_one(job):
+    """Build one pyramid in a sibling directory and swap it in, so target is never half cut."""
+    source, target, tile_size, quality = job
+    temp = target + '.building'
+    shutil.rmtree(temp, ignore_errors=True)
+    try:
+        manifest = cut_pyramid(source, temp, tile_size, quality)
+        # The manifest goes last: a pyramid without one is rebuilt by the next run
+        write_atomic(os.path.join(temp, MANIFEST_FILE_NAME), json.dumps(manifest))
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(temp, target)
+    except BaseException:
+        shutil.rmtree(temp, ignore_errors=True)
+        raise
+    return manifest
+
+
+def build_pyramids(base_dir, out_dir, workers=None, tile_size=TILE_SIZE, quality=TILE_QUALITY,
+                   force=False, progress=None):
+    """
+    Cut every map image under base_dir into a Leaflet z/x/y pyramid under out_dir.
+
+    The pyramid of chapter_x/season_y/<version>/<version>.jpg goes to
+    out_dir/chapter_x/season_y/<version>/, with a tiles.json manifest recording the
+    image's mtime and size; images whose manifest still matches are skipped unless
+    force is set. Images are cut in parallel on a process pool, since decoding and
+    encoding JPEGs is CPU-bound. progress, if given, is called with (rel, manifest or
+    None, error or None) as each image finishes.
+    """
+    require_pillow()
+    start = time.perf_counter()
+    jobs, skipped = {}, []
+    for rel in find_map_images(base_dir):
+        source = os.path.join(base_dir, rel)
+        target = os.path.join(out_dir, os.path.dirname(rel))
+        if not force and is_current(source, target, tile_size, quality):
+            skipped.append(rel)
+        else:
+            jobs[rel] = (source, target, tile_size, quality)
+    built, failed, tiles = [], {}, 0
+    if jobs:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(jobs))) as pool:
+            futures = {pool.submit(_build_one, job): rel for rel, job in jobs.items()}
+            for future in as_completed(futures):
+                rel = futures[future]
+                try:
+                    manifest = future.result()
+                except Exception as e:
+                    failed[rel] = str(e)
+                    if progress is not None:
+                        progress(rel, None, failed[rel])
+                    continue
+                built.append(rel)
+                tiles += manifest['tiles']
+                if progress is not None:
+                    progress(rel, manifest, None)
+    return TileReport(sorted(built), skipped, failed, tiles, time.perf_counter() - start)
@@ -0,0 +1,80 @@
+def trigrams(text):
+    """Return the set of 3-character substrings of text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def short_grams(text):
+    """Return the set of 1- and 2-character substrings of text."""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class TrigramIndex:
+    """
+    Case-insensitive substring index over a set of distinct names.
+
+    Each name is casefolded once when added. A query of three or more characters only
+    checks the names sharing all of its trigrams; one- and two-character queries are
+    answered straight from their own postings.
+    """
+
+    def __init__(self, names=()):
+        self.folded = {}    # casefolded name -> set of original names
+        self.postings = {}  # 1-, 2- and 3-gram -> set of casefolded names
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return sum(len(names) for names in self.folded.values())
+
+    def add(self, name):
+        folded = name.casefold()
+        originals = self.folded.get(folded)
+        if originals is None:
+            self.folded[folded] = {name}
+            for gram in trigrams(folded) | short_grams(folded):
+                self.postings.setdefault(gram, set()).add(folded)
+        else:
+            originals.add(name)
+
+    def remove(self, name):
+        folded = name.casefold()
+        originals = self.folded.get(folded)
+        if originals is None:
+            return
+        originals.discard(name)
+        if originals:
+            return
+        del self.folded[folded]
+        for gram in trigrams(folded) | short_grams(folded):
+            candidates = self.postings.get(gram)
+            if candidates is None:
+                continue
+            candidates.discard(folded)
+            if not candidates:
+                del self.postings[gram]
+
+    def candidates(self, folded_query):
+        """Return the folded names that may contain folded_query."""
+        if not folded_query:
+            return self.folded.keys()
+        if len(folded_query) < 3:
+            return self.postings.get(folded_query, ())
+        grams = trigrams(folded_query)
+        postings = []
+        for gram in grams:
+            names = self.postings.get(gram)
+            if not names:
+                return ()
+            postings.append(names)
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def search(self, substring):
+        """Return the original names containing substring, ignoring case."""
+        query = substring.casefold()
+        matches = []
+        for folded in self.candidates(query):
+            # Trigrams only narrow the set; the order of the grams still has to be checked
+            if query in folded:
+                matches.extend(self.folded[folded])
+        return matches
@@ -0,0 +1,217 @@
+import os
+import re
+from collections import namedtuple
+
+_VERSION = re.compile(r'^(\d+(?:\.\d+)*)(.*)$')
+_DIGITS = re.compile(r'(\d+)')
+
+# One update folder, with its position in the game's chronology
+CatalogEntry = namedtuple('CatalogEntry', 'ordinal chapter_season version')
+
+
+def natural_key(text):
+    """Sort key comparing runs of digits numerically ("lvl-10" after "lvl-9")."""
+    return tuple((0, int(part), '') if part.isdigit() else (1, 0, part) for part in _DIGITS.split(text) if part)
+
+
+def version_key(version):
+    """
+    Chronological sort key for an update folder name.
+
+    "1.6.0" < "1.11", "32.00" < "32-week-2" < "32.11" and a suffixed folder such as
+    "13.20-(water-lvl-4)" sorts right after its base update.
+    """
+    match = _VERSION.match(version)
+    if not match:
+        return ((), natural_key(version))
+    numbers = tuple(int(n) for n in match.group(1).split('.'))
+    numbers = numbers + (0,) * (3 - len(numbers))
+    return (numbers, natural_key(match.group(2).lstrip('-')))
+
+
+def chapter_season_key(chapter_season):
+    """Sort key for "chapter_x/season_y" paths that puts season_10 after season_9."""
+    return tuple(natural_key(part) for part in chapter_season.split(os.sep))
+
+
+class VersionCatalog:
+    """
+    Every update folder in chronological order.
+
+    Folders are ordered by chapter, then season, then version number, and numbered from 0;
+    that ordinal is what the timeline structures index by. Folders known to be in that
+    order already (as a pack lists them) can skip the sort with in_order.
+    """
+
+    def __init__(self, folders, in_order=False):
+        if in_order:
+            ordered = list(dict.fromkeys(folders))
+        else:
+            folders = set(folders)
+            # Many folders share a season; key each season once
+            season_keys = {cs: chapter_season_key(cs) for cs in {f[0] for f in folders}}
+            ordered = sorted(folders, key=lambda f: (season_keys[f[0]], version_key(f[1])))
+        self.entries = [CatalogEntry(i, cs, v) for i, (cs, v) in enumerate(ordered)]
+        self.by_folder = {(e.chapter_season, e.version): e.ordinal for e in self.entries}
+        self.by_version = {}
+        self.by_season = {}
+        for entry in self.entries:
+            self.by_version.setdefault(entry.version, []).append(entry.ordinal)
+            self.by_season.setdefault(entry.chapter_season, []).append(entry.ordinal)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __getitem__(self, ordinal):
+        return self.entries[ordinal]
+
+    def ordinal(self, chapter_season, version):
+        return self.by_folder.get((chapter_season, version))
+
+    def resolve(self, version):
+        """
+        Return the ordinals matching a version given as "26.10" or "chapter_4/season_5/26.10".
+
+        A bare version can match several folders (34.40 exists in two seasons).
+        Raises ValueError if nothing matches.
+        """
+        version = version.strip().strip('/')
+        if os.sep in version or '/' in version:
+            chapter_season, _, name = version.replace('/', os.sep).rpartition(os.sep)
+            ordinal = self.ordinal(chapter_season, name)
+            ordinals = [] if ordinal is None else [ordinal]
+        else:
+            ordinals = self.by_version.get(version, [])
+        if not ordinals:
+            raise ValueError(f"Unknown version '{version}'")
+        return ordinals
+
+    def resolve_one(self, version):
+        """Like resolve(), but raises ValueError unless exactly one folder matches."""
+        ordinals = self.resolve(version)
+        if len(ordinals) > 1:
+            seasons = ', '.join(self.entries[o].chapter_season.replace(os.sep, '/') for o in ordinals)
+            raise ValueError(f"Version '{version}' exists in {seasons}; give it as chapter_x/season_y/{version}")
+        return ordinals[0]
+
+    def season_ordinals(self, chapter_season):
+        """Return the ordinals of every update folder in one chapter/season."""
+        return self.by_season.get(chapter_season, [])
+
+    def label(self, ordinal):
+        return self.entries[ordinal].version
+
+
+class IntervalTree:
+    """
+    Static centered interval tree over closed integer intervals.
+
+    Stabbing and overlap queries cost O(log n + k) for k reported intervals.
+    """
+
+    def __init__(self, intervals):
+        # intervals: iterable of (start, end, value) with start <= end
+        self.size = 0
+        self.root = self._build(sorted(intervals, key=lambda iv: (iv[0], iv[1])))
+
+    def _build(self, intervals):
+        if not intervals:
+            return None
+        center = intervals[len(intervals) // 2][0]
+        left, here, right = [], [], []
+        for interval in intervals:
+            if interval[1] < center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        self.size += len(here)
+        by_start = here  # already sorted by start
+        by_end = sorted(here, key=lambda iv: -iv[1])
+        return (center, by_start, by_end, self._build(left), self._build(right))
+
+    def overlapping(self, lo, hi):
+        """Return the values of every interval intersecting [lo, hi]."""
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            center, by_start, by_end, left, right = node
+            if hi < center:
+                # Every interval here reaches center > hi, so only its start matters
+                for start, _, value in by_start:
+                    if start > hi:
+                        break
+                    found.append(value)
+                stack.append(left)
+            elif lo > center:
+                for _, end, value in by_end:
+                    if end < lo:
+                        break
+                    found.append(value)
+                stack.append(right)
+            else:
+                found.extend(value for _, _, value in by_start)
+                stack.append(left)
+                stack.append(right)
+        return found
+
+    def stabbing(self, point):
+        """Return the values of every interval containing point."""
+        return self.overlapping(point, point)
+
+
+class LifetimeIndex:
+    """
+    When each location was on the map, as intervals of catalog ordinals.
+
+    A location's lifetime is split into runs over the updates that have location data;
+    updates without data (empty JSONs) between two sightings are assumed to include it.
+    """
+
+    def __init__(self, catalog, presence):
+        # presence: location name -> set of ordinals whose JSON lists it
+        self.catalog = catalog
+        observed = sorted({o for ordinals in presence.values() for o in ordinals})
+        self.observed = observed
+        self.lifetimes = {}
+        position = {o: i for i, o in enumerate(observed)}
+        for name, ordinals in presence.items():
+            runs = []
+            previous = None
+            for ordinal in sorted(ordinals):
+                if previous is not None and position[ordinal] == position[previous] + 1:
+                    runs[-1][1] = ordinal
+                else:
+                    runs.append([ordinal, ordinal])
+                previous = ordinal
+            self.lifetimes[name] = [tuple(run) for run in runs]
+        self._tree = None
+        self.queries = 0
+
+    @property
+    def tree(self):
+        """IntervalTree over every run, built on first use."""
+        if self._tree is None:
+            self._tree = IntervalTree((start, end, name) for name, runs in self.lifetimes.items() for start, end in runs)
+        return self._tree
+
+    def alive_at(self, ordinal):
+        """Return the sorted names on the map at this ordinal."""
+        return self.alive_between(ordinal, ordinal)
+
+    def alive_between(self, start, end):
+        """Return the sorted names on the map at any point in [start, end]."""
+        self.queries += 1
+        if self._tree is None and self.queries == 1:
+            # A single lookup, as a one-shot query makes, costs less as a scan of the runs
+            # than building the tree; later ones use the tree
+            return sorted(name for name, runs in self.lifetimes.items()
+                          if any(first <= end and last >= start for first, last in runs))
+        return sorted(set(self.tree.overlapping(start, end)))
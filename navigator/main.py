@@ -7,8 +7,9 @@ project_root = os.path.dirname(os.path.dirname(script_path))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from core.navigator import FileNavigator
-from tui.navigator import NavigatorTUI
+# The TUI and the headless queries are imported by main() for the mode that runs, so a
+# scripted query never loads blessed
+from navigator.cli import COMMANDS
 
 def main():
     # Determine the project root directory by going up until we find the root (for now assume this script is in navigator/ under project root)
@@ -16,6 +17,10 @@ def main():
     # Project root directory is parent of navigator directory
     project_root = os.path.dirname(os.path.dirname(script_path))
 
+    if len(sys.argv) > 1 and (sys.argv[1] in COMMANDS or sys.argv[1] in ('-h', '--help')):
+        from navigator.cli import main as run_cli
+        sys.exit(run_cli(sys.argv[1:], project_root))
+
     if len(sys.argv) > 1:
         base_dir = sys.argv[1]
     else:
@@ -25,6 +30,9 @@ def main():
         print(f'Error: Base directory {base_dir} does not exist or is not a directory.')
         sys.exit(1)
 
+    from navigator.core.navigator import FileNavigator
+    from navigator.tui.navigator import NavigatorTUI
+
     navigator = FileNavigator(base_dir)
     navigator.update_entries()
 
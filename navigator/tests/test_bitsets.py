@@ -0,0 +1,69 @@
+import unittest
+import random
+from navigator.core.bitsets import LocationMatrix, popcount, iter_bits, mask_of
+from navigator.core.versions import VersionCatalog
+
+class TestBitHelpers(unittest.TestCase):
+    def test_round_trip(self):
+        """Test masks built from positions decode back to them"""
+        positions = [0, 3, 64, 200]
+        mask = mask_of(positions)
+        self.assertEqual(list(iter_bits(mask)), positions)
+        self.assertEqual(popcount(mask), 4)
+        self.assertEqual(popcount(0), 0)
+
+class TestLocationMatrix(unittest.TestCase):
+    def setUp(self):
+        # s1: 1.0, 1.1 (no data), 1.2   s2: 2.0, 2.1   s3: 3.0
+        folders = [("s1", "1.0"), ("s1", "1.1"), ("s1", "1.2"), ("s2", "2.0"), ("s2", "2.1"), ("s3", "3.0")]
+        self.catalog = VersionCatalog(folders)
+        self.matrix = LocationMatrix(self.catalog, {
+            "Tilted": {0, 2, 3, 4, 5},
+            "Retail": {0, 2},
+            "Lazy": {3},
+            "Misty": {3, 4},
+            "Slurpy": {0, 5},
+        })
+
+    def test_set_operations(self):
+        """Test union, intersection and difference across updates"""
+        m = self.matrix
+        self.assertEqual(m.decode(m.union([3, 4])), ["Lazy", "Misty", "Tilted"])
+        self.assertEqual(m.decode(m.intersection([3, 4])), ["Misty", "Tilted"])
+        self.assertEqual(m.decode(m.difference(m.column(0), m.column(5))), ["Retail"])
+        self.assertEqual(popcount(m.union(range(6))), 5)
+        self.assertEqual(list(iter_bits(m.row("Misty"))), [3, 4])
+        self.assertEqual(m.row("Unknown"), 0)
+
+    def test_intersection_skips_updates_without_data(self):
+        """Test an empty JSON does not empty the intersection"""
+        self.assertEqual(self.matrix.decode(self.matrix.intersection([0, 1, 2])), ["Retail", "Tilted"])
+
+    def test_season_summary(self):
+        """Test constant, new, last seen and unique locations of a season"""
+        m = self.matrix
+        summary = {k: m.decode(v) for k, v in m.season_summary("s2").items()}
+        self.assertEqual(summary["all"], ["Lazy", "Misty", "Tilted"])
+        self.assertEqual(summary["constant"], ["Misty", "Tilted"])
+        self.assertEqual(summary["new"], ["Lazy", "Misty"])
+        self.assertEqual(summary["last_seen"], ["Lazy", "Misty"])
+        self.assertEqual(summary["unique"], ["Lazy", "Misty"])
+        # Nothing after the last season has data, so nothing is known to be last seen there
+        self.assertEqual(m.season_summary("s3")["last_seen"], 0)
+        self.assertIsNone(m.season_summary("s9"))
+
+    def test_matches_set_arithmetic(self):
+        """Test random queries against plain Python sets"""
+        rng = random.Random(0)
+        catalog = VersionCatalog([("s", f"{i}.0") for i in range(40)])
+        presence = {f"L{i}": {o for o in range(40) if rng.random() < 0.3} for i in range(300)}
+        presence = {name: ordinals for name, ordinals in presence.items() if ordinals}
+        matrix = LocationMatrix(catalog, presence)
+        for _ in range(50):
+            ordinals = rng.sample(range(40), 5)
+            listed = [{n for n, o in presence.items() if ordinal in o} for ordinal in ordinals]
+            self.assertEqual(matrix.decode(matrix.union(ordinals)), sorted(set.union(*listed)))
+            self.assertEqual(matrix.decode(matrix.intersection(ordinals)), sorted(set.intersection(*listed)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+import os
+import shutil
+import tempfile
+import json
+from unittest.mock import patch
+from navigator.core.navigator import FileNavigator
+from navigator.core.documents import commit_files, recover_commit, dumps_wrapped, write_atomic
+from navigator.core.bulk import replace_location, replace_reference_entry
+
+class Crash(BaseException):
+    """Stands in for the process dying"""
+
+class TestBulkLocationEdit(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.files = {
+            os.path.join("chapter_1", "season_1", "1.0", "1.0.json"): {"locations": ["Loot Lake", "Tilted Towers"]},
+            os.path.join("chapter_1", "season_2", "2.0", "2.0.json"): {"locations": ["Loot Lake", "Paradise Palms"]},
+            os.path.join("chapter_2", "season_1", "3.0", "3.0.json"): [{"city": "Loot Lake", "x": 1, "y": 2}],
+            os.path.join("chapter_2", "season_1", "4.0", "4.0.json"): {"locations": ["Tilted Towers"]},
+        }
+        for rel, data in self.files.items():
+            path = os.path.join(self.test_dir, rel)
+            os.makedirs(os.path.dirname(path))
+            with open(path, "w") as f:
+                json.dump(data, f, indent=2)
+        self.reference = [
+            {"city": "Loot Lake", "versions": ["1.0", "2.0", "3.0"]},
+            {"city": "Tilted Towers", "versions": ["1.0", "4.0"]},
+        ]
+        with open(self.reference_path, "w") as f:
+            f.write(dumps_wrapped(self.reference))
+        self.navigator = FileNavigator(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    @property
+    def reference_path(self):
+        return os.path.join(self.test_dir, "named_locations_through_updates.json")
+
+    def snapshot(self):
+        contents = {}
+        for root, _, files in os.walk(self.test_dir):
+            if ".navigator_cache" in root:
+                continue
+            for name in files:
+                path = os.path.join(root, name)
+                with open(path) as f:
+                    contents[os.path.relpath(path, self.test_dir)] = f.read()
+        return contents
+
+    def test_dry_run_writes_nothing(self):
+        """Test a dry run lists the affected files from the index and changes nothing"""
+        before = self.snapshot()
+        plan = self.navigator.rename_location_everywhere("Loot Lake", "Lake Loot", dry_run=True)
+        self.assertEqual(len(plan.files), 3)
+        self.assertEqual(plan.reference_versions, ["1.0", "2.0", "3.0"])
+        self.assertEqual(self.snapshot(), before)
+
+    def test_rename_everywhere(self):
+        """Test a rename rewrites every update and the reference file, and the index follows"""
+        result = self.navigator.rename_location_everywhere("Loot Lake", "Tilted Towers")
+        self.assertEqual(len(result.files), 3)
+        with open(os.path.join(self.test_dir, "chapter_1", "season_1", "1.0", "1.0.json")) as f:
+            self.assertEqual(json.load(f), {"locations": ["Tilted Towers"]})
+        with open(os.path.join(self.test_dir, "chapter_2", "season_1", "3.0", "3.0.json")) as f:
+            self.assertEqual(json.load(f), [{"city": "Tilted Towers", "x": 1, "y": 2}])
+        with open(self.reference_path) as f:
+            self.assertEqual(json.load(f), [{"city": "Tilted Towers", "versions": ["1.0", "2.0", "3.0", "4.0"]}])
+        self.assertEqual(self.navigator.search_locations("Loot Lake"), [])
+        self.assertEqual(len(self.navigator.search_locations("Tilted Towers")), 3)
+
+    def test_remove_everywhere(self):
+        """Test a removal drops the location from every update and the reference file"""
+        self.navigator.remove_location_everywhere("Loot Lake")
+        self.assertEqual(self.navigator.search_locations("Loot Lake"), [])
+        with open(self.reference_path) as f:
+            self.assertEqual([item["city"] for item in json.load(f)], ["Tilted Towers"])
+
+    def test_failed_commit_changes_nothing(self):
+        """Test a rename that fails partway through restores every file"""
+        before = self.snapshot()
+        real_replace = os.replace
+        def flaky_replace(src, dst):
+            # Fail moving the new 3.0.json into place, after 1.0 and 2.0 were replaced
+            if dst.endswith("3.0.json") and src.endswith(".tmp"):
+                raise OSError("device went away")
+            return real_replace(src, dst)
+        with patch("navigator.core.documents.os.replace", side_effect=flaky_replace):
+            with self.assertRaises(OSError):
+                self.navigator.rename_location_everywhere("Loot Lake", "Lake Loot")
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(len(self.navigator.search_locations("Loot Lake")), 3)
+
+    def test_recover_after_crash(self):
+        """Test an interrupted commit is rolled back from its journal when a navigator starts"""
+        before = self.snapshot()
+        journal = os.path.join(self.test_dir, ".navigator_cache", "commit_journal.json")
+        changes = [(os.path.join(self.test_dir, rel), "{}") for rel in self.files]
+        # Die after every file was renamed but before the journal was marked committed,
+        # without getting to roll back
+        def die_at_commit(path, text):
+            if '"committed"' in text:
+                raise Crash()
+            return write_atomic(path, text)
+        with patch("navigator.core.documents.write_atomic", side_effect=die_at_commit), \
+                patch("navigator.core.documents._roll_back", side_effect=Crash):
+            with self.assertRaises(Crash):
+                commit_files(changes, journal)
+        self.assertNotEqual(self.snapshot(), before)
+        # The next navigator created over the archive finishes it
+        FileNavigator(self.test_dir, workers=1)
+        self.assertEqual(self.snapshot(), before)
+        self.assertFalse(recover_commit(journal))
+
+    def test_recover_after_commit_point(self):
+        """Test a crash after the commit point keeps the new files and removes every backup"""
+        journal = os.path.join(self.test_dir, ".navigator_cache", "commit_journal.json")
+        changes = [(os.path.join(self.test_dir, rel), "{}") for rel in self.files]
+        # Die while removing the backups, before the journal is gone
+        with patch("navigator.core.documents.os.unlink", side_effect=Crash):
+            with self.assertRaises(Crash):
+                commit_files(changes, journal)
+        self.assertTrue(recover_commit(journal))
+        snapshot = self.snapshot()
+        self.assertEqual({snapshot[rel] for rel in self.files}, {"{}"})
+        leftovers = [name for _, _, names in os.walk(self.test_dir) for name in names if name.endswith(".bak")]
+        self.assertEqual(leftovers, [])
+        self.assertFalse(os.path.exists(journal))
+
+class TestReplaceLocation(unittest.TestCase):
+    def test_sorted_lists_stay_sorted(self):
+        """Test a renamed location is re-sorted and duplicates are merged"""
+        data = {"locations": ["A", "B", "C"]}
+        self.assertTrue(replace_location(data, "A", "D"))
+        self.assertEqual(data["locations"], ["B", "C", "D"])
+        self.assertTrue(replace_location(data, "B", "C"))
+        self.assertEqual(data["locations"], ["C", "D"])
+        self.assertFalse(replace_location(data, "Missing", "X"))
+
+    def test_reference_entry_removed(self):
+        """Test removing a city drops its entry from the reference list"""
+        data = [{"city": "A", "versions": ["1.0"]}, {"city": "B", "versions": ["2.0"]}]
+        self.assertTrue(replace_reference_entry(data, "A"))
+        self.assertEqual(data, [{"city": "B", "versions": ["2.0"]}])
+
+if __name__ == '__main__':
+    unittest.main()
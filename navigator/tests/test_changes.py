@@ -0,0 +1,82 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from navigator.core import changes
+from navigator.core.changes import MapChanges, compare_maps, pair_key, timeline_pairs
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:
+    Image = None
+
+class TestTimelinePairs(unittest.TestCase):
+    def test_pairs_follow_the_chronology(self):
+        """Test maps are paired with the previous update that has one, including nested folders"""
+        test_dir = tempfile.mkdtemp()
+        try:
+            for rel in ("chapter_1/season_1/1.6.0/1.6.0.jpg", "chapter_1/season_1/1.11/1.11.jpg",
+                        "chapter_1/season_1/1.9.0/1.9.0.jpg", "chapter_6/season_3/34.40/34.40/34.40.jpg"):
+                path = os.path.join(test_dir, *rel.split("/"))
+                os.makedirs(os.path.dirname(path))
+                open(path, "wb").close()
+            os.makedirs(os.path.join(test_dir, "chapter_1", "season_1", "1.8.0"))  # no map
+            names = [(os.path.basename(a), os.path.basename(b)) for a, b in timeline_pairs(test_dir)]
+            self.assertEqual(names, [("1.6.0.jpg", "1.9.0.jpg"), ("1.9.0.jpg", "1.11.jpg"), ("1.11.jpg", "34.40.jpg")])
+        finally:
+            shutil.rmtree(test_dir)
+
+@unittest.skipIf(changes.np is None, "NumPy and Pillow are not installed")
+class TestMapChanges(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.older = self.write_map("1.6.0", 1024)
+        self.same = self.write_map("1.8.0", 1024)
+        self.newer = self.write_map("1.9.0", 2048, box=(1536, 256, 1791, 511))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write_map(self, version, size, box=None):
+        """A map with smooth detail everywhere, and a white square at box if given"""
+        image = Image.radial_gradient("L").resize((size, size)).convert("RGB")
+        if box is not None:
+            ImageDraw.Draw(image).rectangle(box, fill=(255, 255, 255))
+        rel = os.path.join("chapter_1", "season_1", version, version + ".jpg")
+        os.makedirs(os.path.dirname(os.path.join(self.test_dir, rel)))
+        image.save(os.path.join(self.test_dir, rel), "JPEG", quality=90)
+        return rel
+
+    def test_changed_region(self):
+        """Test an added square is found where it was drawn, across different resolutions"""
+        result = compare_maps(os.path.join(self.test_dir, self.older), os.path.join(self.test_dir, self.newer))
+        self.assertEqual(result["regions"], [[1536, 256, 1792, 512]])
+        self.assertEqual(result["changed_blocks"], 16)
+        self.assertAlmostEqual(result["similarity"], 1 - 16 / 1024, places=4)
+
+        result = compare_maps(os.path.join(self.test_dir, self.older), os.path.join(self.test_dir, self.same))
+        self.assertEqual((result["similarity"], result["hash_distance"], result["regions"]), (1.0, 0, []))
+
+    def test_results_are_cached_per_pair(self):
+        """Test a pair is compared once until one of its images changes"""
+        with patch.object(changes, "compare_maps", side_effect=compare_maps) as compare:
+            MapChanges(self.test_dir).get(self.older, self.newer)
+            MapChanges(self.test_dir).get(self.older, self.newer)
+            self.assertEqual(compare.call_count, 1)
+            self.write_map("1.9.0-(edit)", 1024)
+            shutil.copy(os.path.join(self.test_dir, "chapter_1", "season_1", "1.9.0-(edit)", "1.9.0-(edit).jpg"),
+                        os.path.join(self.test_dir, self.newer))
+            self.assertEqual(MapChanges(self.test_dir).get(self.older, self.newer)["regions"], [])
+            self.assertEqual(compare.call_count, 2)
+
+    def test_compare_timeline(self):
+        """Test the batch compares each consecutive pair on the pool and caches the results"""
+        report = MapChanges(self.test_dir).compare_timeline(workers=1)
+        self.assertEqual(sorted(report.compared), sorted([pair_key(self.older, self.same), pair_key(self.same, self.newer)]))
+        self.assertEqual(report.compared[pair_key(self.same, self.newer)]["changed_blocks"], 16)
+        report = MapChanges(self.test_dir).compare_timeline(workers=1)
+        self.assertEqual((len(report.compared), len(report.cached), report.failed), (0, 2, {}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from navigator import cli
+from navigator.core.navigator import FileNavigator
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        for version, locations in (("1.0", ["Tilted Towers", "Pleasant Park"]), ("2.0", ["Tilted Towers", "Lazy Links"])):
+            update_dir = os.path.join(self.test_dir, "chapter_1", "season_1", version)
+            os.makedirs(update_dir)
+            with open(os.path.join(update_dir, version + ".json"), "w") as f:
+                json.dump({"locations": locations}, f)
+        self.navigator = FileNavigator(self.test_dir, workers=1)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_queries(self):
+        """Test each query kind returns plain JSON data, with or without the query prefix"""
+        self.assertEqual(cli.run_query(self.navigator, ["query", "locations", "tilt"]),
+                         [{"season": "chapter_1/season_1", "versions": ["1.0", "2.0"]}])
+        self.assertEqual(cli.run_query(self.navigator, ["at", "2.0"]), ["Lazy Links", "Tilted Towers"])
+        diff = cli.run_query(self.navigator, ["diff", "1.0", "2.0"])
+        self.assertEqual(diff["locations"], {"added": ["Lazy Links"], "removed": ["Pleasant Park"], "retained": 1})
+        self.assertEqual(cli.run_query(self.navigator, ["between", "1.0", "2.0"])[0],
+                         {"name": "Lazy Links", "spans": [["2.0", "2.0"]]})
+        self.assertEqual(cli.run_query(self.navigator, ["fuzzy", "Tilted Towrs", "1"]), [{"name": "Tilted Towers", "distance": 1}])
+        self.assertEqual(cli.run_query(self.navigator, ["fuzzy", "Tilted qqqqqqqq"]), [])
+        self.assertEqual(cli.run_query(self.navigator, ["timeline", "Pleasant Park"]), {"name": "Pleasant Park", "spans": [["1.0", "1.0"]]})
+        self.assertEqual(cli.run_query(self.navigator, ["versions"]),
+                         [{"season": "chapter_1/season_1", "version": "1.0"}, {"season": "chapter_1/season_1", "version": "2.0"}])
+        for words in (["bogus"], ["at"], ["at", "1.0", "2.0"], ["at", "9.9"], ["timeline", "Nowhere"], ["versions", "1.0"],
+                      ["fuzzy", "Tilted", "abc"], ["fuzzy", "Tilted", "0"]):
+            with self.assertRaises(ValueError):
+                cli.run_query(self.navigator, words)
+
+    def test_batch(self):
+        """Test a batch answers every line as one NDJSON record and reports failures inline"""
+        out = io.StringIO()
+        failures = cli.run_batch(self.navigator, ["at 1.0\n", "\n", '["names", "tilt"]\n', "between 1.0\n",
+                                                  "locations 'Lazy Links'\n"], out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(failures, 1)
+        self.assertEqual([record.get("result") for record in records],
+                         [["Pleasant Park", "Tilted Towers"], ["Tilted Towers"], None,
+                          [{"season": "chapter_1/season_1", "versions": ["2.0"]}]])
+        self.assertEqual(records[2], {"query": ["between", "1.0"], "error": "Usage: between START END"})
+
+    def test_main_never_imports_the_tui(self):
+        """Test main.py answers a query as JSON without importing blessed"""
+        result = subprocess.run([sys.executable, "-X", "importtime", MAIN, "at", "1.0", "--base-dir", self.test_dir],
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout), ["Pleasant Park", "Tilted Towers"])
+        self.assertNotIn(" blessed\n", result.stderr)
+        result = subprocess.run([sys.executable, MAIN, "at", "9.9", "--base-dir", self.test_dir], capture_output=True, text=True)
+        self.assertEqual((result.returncode, result.stdout), (1, ""))
+        self.assertIn("Unknown version", result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
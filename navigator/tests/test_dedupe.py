@@ -0,0 +1,75 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from navigator.core import dedupe
+from navigator.core.dedupe import ImageHashes, hash_file
+
+class TestImageHashes(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.same = b"\xff\xd8" + b"map" * 1000 + b"\xff\xd9"
+        for rel_dir in ("chapter_1/season_1/1.8.0", "chapter_1/season_1/1.9.0", "chapter_1/season_2/2.1.0"):
+            self.write_map(rel_dir, self.same)
+        self.write_map("chapter_1/season_2/2.2.0", b"\xff\xd8other\xff\xd9")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write_map(self, rel_dir, data):
+        directory = os.path.join(self.test_dir, *rel_dir.split("/"))
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, os.path.basename(directory) + ".jpg")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_duplicate_groups_and_incremental_refresh(self):
+        """Test identical images are grouped, and only changed images are hashed again"""
+        hashes = ImageHashes(self.test_dir)
+        self.assertEqual(hashes.refresh(), 4)
+        groups = hashes.duplicates()
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(len(groups[0].paths), 3)
+        self.assertEqual(groups[0].reclaimable, 2 * len(self.same))
+
+        hashes = ImageHashes(self.test_dir)
+        self.assertTrue(hashes.load())
+        with patch.object(dedupe, "hash_file", side_effect=hash_file) as hashed:
+            self.assertEqual(hashes.refresh(), 0)
+            self.write_map("chapter_1/season_2/2.1.0", b"\xff\xd8changed\xff\xd9")
+            self.assertEqual(hashes.refresh(), 1)
+        self.assertEqual(hashed.call_count, 1)
+        self.assertEqual(len(hashes.duplicates()[0].paths), 2)
+
+    def test_link_duplicates(self):
+        """Test duplicates become hard links of one copy, and a re-run has nothing left to do"""
+        hashes = ImageHashes(self.test_dir)
+        hashes.refresh()
+        _, _, freed = hashes.link_duplicates(dry_run=True)
+        self.assertEqual(freed, 2 * len(self.same))
+        self.assertEqual(os.stat(os.path.join(self.test_dir, "chapter_1", "season_1", "1.8.0", "1.8.0.jpg")).st_nlink, 1)
+
+        linked, failed, freed = hashes.link_duplicates()
+        self.assertEqual((len(linked), failed, freed), (2, {}, 2 * len(self.same)))
+        paths = [os.path.join(self.test_dir, rel) for rel in hashes.duplicates()[0].paths]
+        self.assertEqual(len({os.stat(path).st_ino for path in paths}), 1)
+        with open(paths[-1], "rb") as f:
+            self.assertEqual(f.read(), self.same)
+        self.assertEqual(hashes.duplicates()[0].reclaimable, 0)
+        self.assertEqual(hashes.link_duplicates(), ({}, {}, 0))
+
+    def test_changed_content_is_not_linked(self):
+        """Test an image edited since it was hashed is compared and left alone"""
+        hashes = ImageHashes(self.test_dir)
+        hashes.refresh()
+        path = self.write_map("chapter_1/season_2/2.1.0", b"\xff\xd8" + b"pam" * 1000 + b"\xff\xd9")
+        linked, failed, _ = hashes.link_duplicates()
+        self.assertIn(os.path.relpath(path, self.test_dir), failed)
+        self.assertEqual(len(linked), 1)
+        with open(path, "rb") as f:
+            self.assertTrue(f.read().startswith(b"\xff\xd8pam"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from navigator.core.diff import Snapshot, diff_sets, diff_snapshots, walk_timeline, previous_with_data, is_unchanged
+from navigator.core.versions import VersionCatalog
+
+class TestDiff(unittest.TestCase):
+    def test_diff_sets(self):
+        """Test added, removed and retained values are sorted"""
+        diff = diff_sets(frozenset({"b", "a", "c"}), frozenset({"c", "d", "a"}))
+        self.assertEqual(diff.added, ["d"])
+        self.assertEqual(diff.removed, ["b"])
+        self.assertEqual(diff.retained, ["a", "c"])
+
+    def test_only_changed_categories_are_reported(self):
+        """Test categories identical on both sides are left out"""
+        old = Snapshot(frozenset({"A"}), {"biomes": frozenset({"snow"}), "storm": frozenset({"1"})})
+        new = Snapshot(frozenset({"A"}), {"biomes": frozenset({"snow", "desert"}), "storm": frozenset({"1"})})
+        diff = diff_snapshots(None, old, None, new)
+        self.assertEqual(list(diff.categories), ["biomes"])
+        self.assertEqual(diff.categories["biomes"].added, ["desert"])
+        self.assertFalse(is_unchanged(diff))
+        self.assertTrue(is_unchanged(diff_snapshots(None, old, None, old)))
+
+    def test_walk_timeline_skips_updates_without_data(self):
+        """Test consecutive diffs bridge empty JSONs instead of reporting everything removed"""
+        catalog = VersionCatalog([("s", "1.0"), ("s", "1.1"), ("s", "1.2"), ("s", "1.3")])
+        snapshots = [
+            Snapshot(frozenset({"A", "B"}), {}),
+            None,
+            Snapshot(frozenset({"B", "C"}), {}),
+            Snapshot(frozenset({"C"}), {}),
+        ]
+        diffs = list(walk_timeline(catalog, snapshots))
+        self.assertEqual([(d.old.version, d.new.version) for d in diffs], [("1.0", "1.2"), ("1.2", "1.3")])
+        self.assertEqual(diffs[0].locations.added, ["C"])
+        self.assertEqual(diffs[0].locations.removed, ["A"])
+        self.assertEqual(previous_with_data(snapshots, 2), 0)
+        self.assertIsNone(previous_with_data(snapshots, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from navigator.core.documents import DocumentStore, write_atomic
+
+class TestDocumentStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.written = []
+        self.store = DocumentStore(on_write=self.written.append)
+        self.paths = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir.name, f"update_{i}.json")
+            with open(path, "w") as f:
+                json.dump({"locations": [f"Place {i}"]}, f)
+            # Settle the mtime so loads may be cached
+            os.utime(path, ns=(10**18, 10**18))
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read(self, path):
+        with open(path) as f:
+            return json.load(f)
+
+    def test_load_is_cached_until_file_changes(self):
+        """Test a document is parsed once and re-read after an outside change"""
+        first = self.store.load(self.paths[0])
+        self.assertIs(self.store.load(self.paths[0]), first)
+
+        with open(self.paths[0], "w") as f:
+            json.dump({"locations": ["Changed"]}, f)
+        self.assertEqual(self.store.load(self.paths[0]), {"locations": ["Changed"]})
+
+    def test_save_writes_atomically(self):
+        """Test save replaces the file through a renamed temporary and leaves no temporaries"""
+        data = self.store.load(self.paths[0])
+        data["locations"].append("Added")
+        with patch("navigator.core.documents.os.replace", wraps=os.replace) as replace:
+            self.store.save(self.paths[0], data)
+        self.assertEqual(replace.call_count, 1)
+        self.assertEqual(self.read(self.paths[0]), {"locations": ["Place 0", "Added"]})
+        self.assertEqual(self.written, [os.path.abspath(self.paths[0])])
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ["update_0.json", "update_1.json", "update_2.json"])
+        # The written object is served again without parsing the file
+        with patch("navigator.core.documents.json.loads") as loads:
+            self.assertIs(self.store.load(self.paths[0]), data)
+        loads.assert_not_called()
+        # But the file was just written, so another writer could change it within the same
+        # mtime tick, and later loads must see that
+        st = os.stat(self.paths[0])
+        with open(self.paths[0]) as f:
+            text = f.read()
+        with open(self.paths[0], "w") as f:
+            f.write(text.replace("Added", "Other"))
+        os.utime(self.paths[0], ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(self.store.load(self.paths[0]), {"locations": ["Place 0", "Other"]})
+
+    def test_failed_write_keeps_old_file(self):
+        """Test a write that fails midway leaves the original file and drops the cached edit"""
+        data = self.store.load(self.paths[0])
+        data["locations"].append("Lost")
+        with patch("navigator.core.documents.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.store.save(self.paths[0], data)
+        self.assertEqual(self.read(self.paths[0]), {"locations": ["Place 0"]})
+        self.assertEqual(self.store.load(self.paths[0]), {"locations": ["Place 0"]})
+        self.assertEqual(len(os.listdir(self.temp_dir.name)), 3)
+
+    def test_batch_coalesces_writes(self):
+        """Test many saves in a batch produce one write per file at the end"""
+        with self.store.batch():
+            for i in range(10):
+                for path in self.paths[:2]:
+                    data = self.store.load(path)
+                    data["locations"].append(f"Extra {i}")
+                    self.store.save(path, data)
+            self.assertEqual(self.store.writes, 0)
+            self.assertEqual(self.read(self.paths[0])["locations"], ["Place 0"])
+        self.assertEqual(self.store.writes, 2)
+        self.assertEqual(len(self.read(self.paths[1])["locations"]), 11)
+
+    def test_failed_batch_writes_nothing(self):
+        """Test an exception inside a batch discards its edits"""
+        with self.assertRaises(KeyError):
+            with self.store.batch():
+                data = self.store.load(self.paths[0])
+                data["locations"].append("Never")
+                self.store.save(self.paths[0], data)
+                raise KeyError("stop")
+        self.assertEqual(self.store.writes, 0)
+        self.assertEqual(self.store.load(self.paths[0]), {"locations": ["Place 0"]})
+
+    def test_write_atomic_keeps_mode(self):
+        """Test the replacement file keeps the original permissions"""
+        os.chmod(self.paths[2], 0o640)
+        write_atomic(self.paths[2], "{}")
+        self.assertEqual(os.stat(self.paths[2]).st_mode & 0o777, 0o640)
+        self.assertEqual(self.read(self.paths[2]), {})
+
+if __name__ == '__main__':
+    unittest.main()
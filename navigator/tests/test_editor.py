@@ -0,0 +1,97 @@
+import unittest
+from unittest.mock import Mock
+from navigator.tui.editor import EditorTUI
+
+class TestEditorTUI(unittest.TestCase):
+    def setUp(self):
+        term = Mock()
+        term.height = 24
+        self.editor = EditorTUI("1.0.json", ['{', '  "locations": ["A"]', '}'], term=term)
+
+    def test_edit_and_save(self):
+        """Test typing, newlines and joins are serialized from the buffer"""
+        self.editor.cursor_row, self.editor.cursor_col = 1, 19
+        for char in ', "B"':
+            self.editor.insert_character(char)
+        self.assertEqual(self.editor.save_changes(), ['{', '  "locations": ["A", "B"]', '}'])
+
+        self.editor.cursor_row, self.editor.cursor_col = 2, 0
+        self.editor.handle_backspace()
+        self.assertEqual((self.editor.cursor_row, self.editor.cursor_col), (1, 25))
+        self.editor.insert_newline()
+        self.assertEqual(self.editor.buffer.line_count, 3)
+
+    def test_invalid_json_is_not_saved(self):
+        """Test JSON files are validated as you type and before saving"""
+        self.assertEqual(self.editor.json_status(), " [JSON ok]")
+        self.editor.handle_delete()
+        self.assertEqual(self.editor.json_status(), " [JSON error 2:14 Extra data, j to jump]")
+        self.assertIsNone(self.editor.save_changes())
+        self.assertIn("Invalid JSON", self.editor.status_message)
+        self.editor.undo()
+        self.assertEqual(self.editor.json_status(), " [JSON ok]")
+
+    def test_json_invalid_on_open_can_be_saved(self):
+        """Test empty and broken JSON files show their errors but save as text"""
+        for lines in ([], ['{', '  "locations": [', '}']):
+            editor = EditorTUI("new.json", lines, term=self.editor.term)
+            self.assertTrue(editor.json_status().startswith(" [JSON error"))
+            self.assertFalse(editor.strict_json)
+            editor.insert_character("x")
+            self.assertEqual(editor.save_changes()[0][0], "x")
+            self.assertIn("Invalid JSON", editor.status_message)
+
+    def test_jump_to_error(self):
+        """Test the cursor jumps to the first JSON error"""
+        self.editor.cursor_row, self.editor.cursor_col = 1, 19
+        self.editor.insert_character("x")
+        self.assertFalse(self.editor.validator.valid)
+        self.editor.cursor_row, self.editor.cursor_col = 0, 0
+        self.editor.jump_to_error()
+        self.assertEqual((self.editor.cursor_row, self.editor.cursor_col), (1, 19))
+
+    def test_incremental_redraw(self):
+        """Test typing repaints one row, a cursor move two, and scrolling everything"""
+        import io
+        from navigator.tui.screen import ScreenBuffer
+        from navigator.tests.test_screen import FakeTerm
+        term = FakeTerm()
+        editor = EditorTUI("big.json", [f'"line {i}",' for i in range(100)], term=term)
+        editor.screen = ScreenBuffer(term, out=io.StringIO())
+        editor.draw()
+        self.assertEqual(editor.painted_rows, 21)
+        editor.edit_mode = True
+        editor.draw()
+        self.assertEqual(editor.painted_rows, 1)
+        editor.insert_character("x")
+        editor.draw()
+        self.assertEqual(editor.painted_rows, 1)
+        editor.move_cursor_down()
+        editor.draw()
+        self.assertEqual(editor.painted_rows, 2)
+        editor.insert_newline()
+        editor.draw()
+        self.assertEqual(editor.painted_rows, 20)  # rows 1-20 shift down
+        for _ in range(30):
+            editor.move_cursor_down()
+        editor.draw()
+        self.assertEqual(editor.painted_rows, 21)
+        top = ''.join(char for char, _ in editor.screen.shown[1][:4])
+        self.assertEqual(int(top), editor.viewport_offset + 1)
+
+    def test_undo_redo(self):
+        """Test undo restores the text and moves the cursor back"""
+        self.editor.cursor_row, self.editor.cursor_col = 1, 2
+        for char in "xyz":
+            self.editor.insert_character(char)
+        self.editor.undo()
+        self.assertEqual(self.editor.buffer.line(1), '  "locations": ["A"]')
+        self.assertEqual((self.editor.cursor_row, self.editor.cursor_col), (1, 2))
+        self.editor.redo()
+        self.assertEqual(self.editor.buffer.line(1), '  xyz"locations": ["A"]')
+        self.editor.undo()
+        self.editor.undo()
+        self.assertEqual(self.editor.status_message, "Nothing to undo")
+
+if __name__ == '__main__':
+    unittest.main()
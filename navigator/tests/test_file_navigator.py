@@ -1,4 +1,5 @@
 import unittest
+import unittest.mock
 import os
 import shutil
 import tempfile
@@ -97,6 +98,75 @@ class TestFileNavigator(unittest.TestCase):
         # Test search with no results
         results = self.navigator.search_locations("nonexistent")
         self.assertEqual(len(results), 0)
+
+    def test_directory_listing_cache(self):
+        """Test listings are reused until the directory's mtime changes"""
+        past = 1000000000
+        os.utime(self.season1_dir, (past, past))
+        self.navigator.current_path = self.season1_dir
+        self.navigator.update_entries()
+        self.assertEqual(self.navigator.entries, ['..', '1.0'])
+        self.assertTrue(self.navigator.entry_is_dir('1.0'))
+
+        with unittest.mock.patch('navigator.core.navigator.os.scandir') as mock_scandir:
+            self.navigator.update_entries()
+            mock_scandir.assert_not_called()
+        self.assertEqual(self.navigator.entries, ['..', '1.0'])
+
+        with open(os.path.join(self.season1_dir, "notes.json"), 'w') as f:
+            f.write("{}")
+        os.utime(self.season1_dir, (past + 1, past + 1))
+        self.navigator.update_entries()
+        self.assertEqual(self.navigator.entries, ['..', '1.0', 'notes.json'])
+        self.assertFalse(self.navigator.entry_is_dir('notes.json'))
+
+    def test_search_orders_versions_chronologically(self):
+        """Test update versions are listed in release order, not string order"""
+        for version in ("1.11", "1.6.0"):
+            update_dir = os.path.join(self.season1_dir, version)
+            os.makedirs(update_dir)
+            with open(os.path.join(update_dir, version + ".json"), 'w') as f:
+                json.dump({"locations": ["Tilted Towers"]}, f)
+        results = self.navigator.search_locations("Tilted")
+        self.assertEqual(results[0], ("chapter_1/season_1", ["1.0", "1.6.0", "1.11"]))
+
+    def test_diff_versions(self):
+        """Test diffs between updates, including non-location categories"""
+        update3_dir = os.path.join(self.season2_dir, "2.1")
+        os.makedirs(update3_dir)
+        with open(os.path.join(update3_dir, "2.1.json"), 'w') as f:
+            json.dump({"locations": ["Lazy Links", "Tilted Towers", "Sunny Steps"], "biomes": ["desert"]}, f)
+
+        diff = self.navigator.diff_previous("chapter_1/season_2", "2.1")
+        self.assertEqual(diff.old.version, "2.0")
+        self.assertEqual(diff.locations.added, ["Sunny Steps"])
+        self.assertEqual(diff.locations.removed, ["Paradise Palms"])
+        self.assertEqual(diff.categories["biomes"].added, ["desert"])
+        self.assertIsNone(self.navigator.diff_previous("chapter_1/season_1", "1.0"))
+
+        diff = self.navigator.diff_versions("1.0", "2.1")
+        self.assertEqual(diff.locations.retained, ["Tilted Towers"])
+        self.assertEqual([(d.old.version, d.new.version) for d in self.navigator.timeline_diffs()],
+                         [("1.0", "2.0"), ("2.0", "2.1")])
+        with self.assertRaises(ValueError):
+            self.navigator.diff_versions("1.0", "9.9")
+
+    def test_season_summary(self):
+        """Test the per-season bitset summary"""
+        summary = self.navigator.season_summary("chapter_1/season_2")
+        self.assertEqual(summary["all"], ["Lazy Links", "Paradise Palms", "Tilted Towers"])
+        self.assertEqual(summary["new"], ["Lazy Links", "Paradise Palms"])
+        self.assertIsNone(self.navigator.season_summary("chapter_9/season_9"))
+
+    def test_locations_at_and_between(self):
+        """Test timeline queries over update versions"""
+        self.assertEqual(self.navigator.locations_at("1.0"), ["Pleasant Park", "Retail Row", "Tilted Towers"])
+        self.assertEqual(self.navigator.locations_at("chapter_1/season_2/2.0"), ["Lazy Links", "Paradise Palms", "Tilted Towers"])
+        between = dict(self.navigator.locations_between("1.0", "2.0"))
+        self.assertEqual(between["Tilted Towers"], [("1.0", "2.0")])
+        self.assertEqual(between["Retail Row"], [("1.0", "1.0")])
+        with self.assertRaises(ValueError):
+            self.navigator.locations_at("9.99")
         
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import unittest
+import random
+from navigator.core.fuzzy import FuzzyMatcher, normalize, bit_distance, pattern_masks
+
+def levenshtein(a, b):
+    """Plain dynamic-programming edit distance, to check bit_distance against"""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+class TestFuzzyMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = FuzzyMatcher(["Sanguine Suites", "Brawler's Battleground", "Brawler's Patch",
+                                     "Tilted Towers", "Loot Lake", "Lost Lake", "Pleasant Park"])
+
+    def test_normalize(self):
+        """Test apostrophes are dropped and punctuation splits words"""
+        self.assertEqual(normalize("Brawler's Battleground"), "brawlers battleground")
+        self.assertEqual(normalize("LEGO Fortnite:Bobom  Milk-Tea"), "lego fortnite bobom milk tea")
+
+    def test_bit_distance_matches_levenshtein(self):
+        """Test the bit-parallel distance agrees with the plain DP"""
+        rng = random.Random(0)
+        for _ in range(500):
+            a = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+            b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+            self.assertEqual(bit_distance(pattern_masks(a), len(a), b), levenshtein(a, b))
+        self.assertEqual(bit_distance(pattern_masks("kitten"), 6, "sitting"), 3)
+
+    def test_typo(self):
+        """Test a misspelt name is found with its edit distance"""
+        self.assertEqual(self.matcher.search("sandguine")[0], ("Sanguine Suites", 1))
+        self.assertEqual(self.matcher.search("tilted towrs")[0], ("Tilted Towers", 1))
+
+    def test_prefix(self):
+        """Test an unfinished last word matches by prefix"""
+        self.assertEqual(self.matcher.search("brawlers battle")[0], ("Brawler's Battleground", 0))
+
+    def test_ranking(self):
+        """Test closer names rank first"""
+        names = [name for name, _ in self.matcher.search("loot lake")]
+        self.assertEqual(names[:2], ["Loot Lake", "Lost Lake"])
+
+    def test_limit_and_no_match(self):
+        """Test the limit and queries nothing resembles"""
+        self.assertEqual(len(self.matcher.search("lake", limit=1)), 1)
+        self.assertEqual(self.matcher.search("zzzz"), [])
+        self.assertEqual(self.matcher.search("  "), [])
+
+    def test_max_distance(self):
+        """Test names further from the query than a third of its letters are left out"""
+        # "brawlers" matches both names, but "battle" is not in Brawler's Patch (cost 6 > 14 // 3)
+        self.assertEqual(self.matcher.search("brawlers battle"), [("Brawler's Battleground", 0)])
+        self.assertEqual(self.matcher.search("tilted zzzzzz"), [])
+        self.assertEqual(self.matcher.search("tilted zzzzzz", max_dist=6), [("Tilted Towers", 6)])
+        self.assertEqual(self.matcher.search("tilted z"), [("Tilted Towers", 1)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import os
+import shutil
+import struct
+import tempfile
+from navigator.core.images import ImageManifest, read_jpeg_header
+from navigator.core.navigator import FileNavigator
+
+def segment(marker, payload):
+    return bytes([0xFF, marker]) + struct.pack(">H", len(payload) + 2) + payload
+
+def jpeg(width, height, marker=0xC0, sampling=0x22, extra=b"", end=b"\xff\xd9"):
+    """A JPEG made of headers only: enough for the marker parser, not for a decoder"""
+    app0 = segment(0xE0, b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00")
+    exif = segment(0xE1, b"Exif\x00\x00" + b"\x00" * 5000)
+    sof = segment(marker, struct.pack(">BHHB", 8, height, width, 3)
+                  + bytes([1, sampling, 0, 2, 0x11, 1, 3, 0x11, 1]))
+    return b"\xff\xd8" + app0 + exif + extra + sof + segment(0xDA, b"\x00" * 10) + b"\x12\x34" * 100 + end
+
+class TestJpegHeader(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, data, name="map.jpg"):
+        path = os.path.join(self.test_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_frame_header(self):
+        """Test dimensions, mode, colour and subsampling come from the SOF marker"""
+        info = read_jpeg_header(self.write(jpeg(2048, 1024)))
+        self.assertEqual(info, {"width": 2048, "height": 1024, "precision": 8, "components": 3, "color": "YCbCr",
+                                "subsampling": "4:2:0", "progressive": False, "truncated": False})
+        adobe = segment(0xEE, b"Adobe\x00\x64\x00\x00\x00\x00\x00")
+        info = read_jpeg_header(self.write(jpeg(4096, 4096, marker=0xC2, sampling=0x11, extra=adobe)))
+        self.assertEqual((info["width"], info["progressive"], info["subsampling"], info["color"]),
+                         (4096, True, "4:4:4", "RGB"))
+
+    def test_truncated_and_invalid_files(self):
+        """Test a missing end marker is flagged, trailing padding is not, and non-JPEGs raise"""
+        self.assertTrue(read_jpeg_header(self.write(jpeg(64, 64, end=b"")))["truncated"])
+        for padding in (b"\x00\x00", b"\xff\xff\xff", b"\r\n"):
+            self.assertFalse(read_jpeg_header(self.write(jpeg(64, 64, end=b"\xff\xd9" + padding)))["truncated"])
+        # An end marker followed by more scan data, e.g. a thumbnail's, is not the image's own
+        self.assertTrue(read_jpeg_header(self.write(jpeg(64, 64, end=b"\xff\xd9" + b"\x12\x34" * 10)))["truncated"])
+        with self.assertRaises(ValueError):
+            read_jpeg_header(self.write(b"\x89PNG\r\n"))
+        with self.assertRaises(ValueError):
+            read_jpeg_header(self.write(jpeg(64, 64)[:300]))
+
+class TestImageManifest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.write_map(os.path.join("chapter_1", "season_1", "1.0"), jpeg(1024, 1024))
+        self.write_map(os.path.join("chapter_6", "season_3", "34.40", "34.40"), jpeg(2048, 2048, marker=0xC2))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write_map(self, rel_dir, data):
+        os.makedirs(os.path.join(self.test_dir, rel_dir), exist_ok=True)
+        path = os.path.join(self.test_dir, rel_dir, os.path.basename(rel_dir) + ".jpg")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_incremental_refresh(self):
+        """Test only new and changed images have their headers read again, and removed ones are dropped"""
+        manifest = ImageManifest(self.test_dir)
+        self.assertEqual(manifest.refresh(), 2)
+        self.assertEqual(manifest.images[os.path.join("chapter_6", "season_3", "34.40")]["width"], 2048)
+
+        manifest = ImageManifest(self.test_dir)
+        self.assertTrue(manifest.load())
+        self.assertEqual(manifest.refresh(), 0)
+        path = self.write_map(os.path.join("chapter_1", "season_1", "1.0"), jpeg(2048, 2048, end=b""))
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        shutil.rmtree(os.path.join(self.test_dir, "chapter_6"))
+        self.assertEqual(manifest.refresh(), 1)
+        self.assertEqual(list(manifest.images), [os.path.join("chapter_1", "season_1", "1.0")])
+        self.assertTrue(manifest.images[os.path.join("chapter_1", "season_1", "1.0")]["truncated"])
+
+    def test_navigator_image_info(self):
+        """Test the navigator answers from the manifest by update folder"""
+        navigator = FileNavigator(self.test_dir)
+        info = navigator.image_info(os.path.join(self.test_dir, "chapter_6", "season_3", "34.40"))
+        self.assertEqual((info["width"], info["progressive"]), (2048, True))
+        self.assertIsNone(navigator.image_info(os.path.join(self.test_dir, "chapter_1", "season_1")))
+
+    def test_background_load(self):
+        """Test get(wait=False) answers None at once and loads the manifest on a thread"""
+        manifest = ImageManifest(self.test_dir)
+        folder = os.path.join("chapter_6", "season_3", "34.40")
+        manifest.lock.acquire()  # hold the load back so the first answer is seen
+        try:
+            self.assertIsNone(manifest.get(folder, wait=False))
+            self.assertTrue(manifest.waiting)
+            self.assertFalse(manifest.poll())
+        finally:
+            manifest.lock.release()
+        manifest.thread.join(5)
+        self.assertTrue(manifest.poll())
+        self.assertFalse(manifest.poll())
+        self.assertEqual(manifest.get(folder, wait=False)["width"], 2048)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import json
+import random
+from navigator.core.json_validator import JsonValidator, parse_line, START
+
+def is_valid_json(text):
+    try:
+        json.loads(text)
+        return True
+    except ValueError:
+        return False
+
+class LinesDocument:
+    """Minimal editable document of lines for driving the validator"""
+    def __init__(self, text):
+        self.lines = text.split("\n")
+
+    def replace(self, row, old_count, new_text):
+        self.lines[row:row + old_count] = new_text.split("\n")
+
+class TestParseLine(unittest.TestCase):
+    def test_errors_are_located(self):
+        """Test errors carry the column and a json-style message"""
+        self.assertEqual(parse_line(START, '{"a": 1 "b": 2}')[1], (8, "Expecting ',' delimiter"))
+        self.assertEqual(parse_line(START, '[1, 2,]')[1], (6, "Expecting value"))
+        self.assertEqual(parse_line(START, '["abc')[1], (1, "Unterminated string"))
+        self.assertEqual(parse_line(START, '{1: 2}')[1], (1, "Expecting property name enclosed in double quotes"))
+        self.assertEqual(parse_line(START, '{"a": [1, 2]}'), (('', 'end'), None))
+
+class TestJsonValidator(unittest.TestCase):
+    def test_error_location_and_recovery(self):
+        """Test an error is reported at line:col and cleared by fixing it"""
+        doc = LinesDocument('{\n  "locations": [\n    "A",\n    "B"\n  ]\n}')
+        validator = JsonValidator(doc.lines.__getitem__, len(doc.lines))
+        self.assertTrue(validator.valid)
+
+        doc.replace(2, 1, '    "A"')
+        validator.update(2, 1, 1)
+        self.assertEqual(validator.error, (3, 4, "Expecting ',' delimiter"))
+
+        doc.replace(2, 1, '    "A",')
+        validator.update(2, 1, 1)
+        self.assertTrue(validator.valid)
+
+        doc.replace(5, 1, '')
+        validator.update(5, 1, 1)
+        self.assertEqual(validator.error, (5, 0, "Unexpected end of document"))
+
+    def test_edit_only_reparses_affected_lines(self):
+        """Test a one-line edit stops parsing once the state converges"""
+        doc = LinesDocument(json.dumps({"locations": [f"L{i}" for i in range(1000)]}, indent=2))
+        parsed = []
+        def get_line(row):
+            parsed.append(row)
+            return doc.lines[row]
+        validator = JsonValidator(get_line, len(doc.lines))
+        del parsed[:]
+        doc.replace(500, 1, '    "Renamed",')
+        validator.update(500, 1, 1)
+        self.assertEqual(parsed, [500])
+        self.assertTrue(validator.valid)
+
+    def test_matches_full_parse(self):
+        """Test random edits against json.loads and a fresh validator"""
+        rng = random.Random(3)
+        base = json.dumps({"locations": ["A", "B", {"x": [1, 2.5, -3e2, True, None]}]}, indent=2)
+        for _ in range(50):
+            text = base
+            doc = LinesDocument(text)
+            validator = JsonValidator(doc.lines.__getitem__, len(doc.lines))
+            for _ in range(30):
+                offset = rng.randint(0, len(text))
+                row = text.count("\n", 0, offset)
+                if rng.random() < 0.6:
+                    insert = rng.choice(['{', '}', '[', ']', ',', ':', '"', '1', 'a', '\n', '"x"', 'true'])
+                    removed = ''
+                else:
+                    insert, removed = '', text[offset:offset + rng.randint(1, 3)]
+                line_start = text.rfind("\n", 0, offset) + 1
+                old_count = removed.count("\n") + 1
+                text = text[:offset] + insert + text[offset + len(removed):]
+                line_end = text.find("\n", offset + len(insert))
+                doc.replace(row, old_count, text[line_start:None if line_end < 0 else line_end])
+                validator.update(row, old_count, insert.count("\n") + 1)
+                self.assertEqual(validator.valid, is_valid_json(text), text)
+                fresh = JsonValidator(doc.lines.__getitem__, len(doc.lines))
+                self.assertEqual(validator.error, fresh.error)
+
+if __name__ == '__main__':
+    unittest.main()
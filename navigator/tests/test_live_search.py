@@ -0,0 +1,62 @@
+import unittest
+import time
+from unittest.mock import Mock
+from navigator.tui.live_search import LiveSearch, SearchCancelled
+
+class TestLiveSearch(unittest.TestCase):
+    def setUp(self):
+        # Mock navigator with a fixed set of location names
+        self.names = ["Tilted Towers", "Tilted Town", "Pleasant Park"]
+        self.navigator = Mock()
+        self.navigator.match_location_names.side_effect = \
+            lambda q: [n for n in self.names if q.casefold() in n.casefold()]
+        self.navigator.locations_versions.side_effect = \
+            lambda names, include_reference=True: [("chapter_1/season_1", sorted(names))] if names else []
+        self.live = LiveSearch(self.navigator, delay=0.05)
+
+    def tearDown(self):
+        self.live.close()
+
+    def wait_for_result(self, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            update = self.live.poll()
+            if update is not None:
+                return update
+            time.sleep(0.01)
+        self.fail("live search produced no result")
+
+    def test_debounce_runs_only_latest_query(self):
+        """Test fast typing only searches for the final query"""
+        for query in ["t", "ti", "til", "tilt"]:
+            self.live.submit(query)
+        query, results = self.wait_for_result()
+        self.assertEqual(query, "tilt")
+        self.assertEqual(results, [("chapter_1/season_1", ["Tilted Towers", "Tilted Town"])])
+        self.navigator.match_location_names.assert_called_once_with("tilt")
+        self.assertEqual(self.live.results_for("tilt"), results)
+        self.assertIsNone(self.live.results_for("til"))
+
+    def test_extended_query_is_narrowed(self):
+        """Test a query extending a previous one filters the earlier matches"""
+        self.live.submit("tilted")
+        self.wait_for_result()
+        self.live.submit("tilted tow")
+        self.assertEqual(self.wait_for_result()[1], [("chapter_1/season_1", ["Tilted Towers", "Tilted Town"])])
+        self.live.submit("tilted towe")
+        self.assertEqual(self.wait_for_result()[1], [("chapter_1/season_1", ["Tilted Towers"])])
+        self.navigator.match_location_names.assert_called_once_with("tilted")
+
+    def test_cancelled_run(self):
+        """Test a superseded query stops before grouping versions"""
+        self.live.run("tilted", lambda: False)
+        with self.assertRaises(SearchCancelled):
+            self.live.run("tilted t", lambda: True)
+
+    def test_empty_query(self):
+        """Test an empty query clears the results without searching"""
+        self.assertEqual(self.live.run("  ", lambda: False), [])
+        self.navigator.match_location_names.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import os
+import shutil
+import tempfile
+import json
+from navigator.core.index import LocationIndex, extract_locations, extract_categories
+
+class TestLocationIndex(unittest.TestCase):
+    def setUp(self):
+        # Create a small archive with two updates
+        self.test_dir = tempfile.mkdtemp()
+        self.update1_json = self.write_update("chapter_1", "season_1", "1.0", {"locations": ["Tilted Towers", "Pleasant Park"]})
+        self.update2_json = self.write_update("chapter_1", "season_2", "2.0", {"locations": ["Lazy Links", "Tilted Towers"]})
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write_update(self, chapter, season, version, data):
+        update_dir = os.path.join(self.test_dir, chapter, season, version)
+        os.makedirs(update_dir, exist_ok=True)
+        path = os.path.join(update_dir, version + ".json")
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        return path
+
+    def test_extract_locations(self):
+        """Test both per-version JSON layouts are understood"""
+        self.assertEqual(extract_locations({"locations": ["A", "B"]}), ["A", "B"])
+        self.assertEqual(extract_locations([{"city": "A", "x": 1, "y": 2}]), ["A"])
+        self.assertEqual(extract_locations({"items": []}), [])
+        self.assertEqual(extract_locations([{"city": "", "x": 1, "y": 2}]), [])
+
+    def test_extract_categories(self):
+        """Test fields besides locations are kept as lists of strings"""
+        data = {"locations": ["A"], "items": ["Pistol"], "storm": 3, "notes": "vaulted"}
+        self.assertEqual(extract_categories(data), {"items": ["Pistol"], "storm": ["3"], "notes": ["vaulted"]})
+        self.assertEqual(extract_categories([{"city": "A"}]), {})
+
+    def test_search(self):
+        """Test searching the index groups matches by chapter/season, scanning the names for the first search"""
+        index = LocationIndex(self.test_dir)
+        results = index.search("tilted")
+        self.assertEqual(results, [("chapter_1/season_1", ["1.0"]), ("chapter_1/season_2", ["2.0"])])
+        self.assertIsNone(index._names)
+        self.assertEqual(index.search("tilted"), results)
+        self.assertIsNotNone(index._names)
+        self.assertEqual(index.search("lazy"), [("chapter_1/season_2", ["2.0"])])
+        self.assertEqual(index.search("nonexistent"), [])
+
+    def test_persisted_across_sessions(self):
+        """Test a second index instance reuses the on-disk index without re-parsing"""
+        LocationIndex(self.test_dir).ensure_loaded()
+        self.assertTrue(os.path.isfile(os.path.join(self.test_dir, ".navigator_cache", "location_index.json")))
+
+        index = LocationIndex(self.test_dir)
+        self.assertTrue(index.load())
+        self.assertEqual(index.refresh(), 0)
+        self.assertIn("Pleasant Park", index.postings)
+
+    def test_incremental_refresh(self):
+        """Test only changed, new and deleted files are reprocessed"""
+        LocationIndex(self.test_dir).ensure_loaded()
+
+        with open(self.update1_json, 'w') as f:
+            json.dump({"locations": ["Pleasant Park", "Salty Springs", "Dusty Depot"]}, f)
+        self.write_update("chapter_2", "season_1", "11.0", {"locations": ["Sweaty Sands"]})
+        os.remove(self.update2_json)
+
+        index = LocationIndex(self.test_dir)
+        index.load()
+        self.assertEqual(index.refresh(), 3)
+        self.assertNotIn("Tilted Towers", index.postings)
+        self.assertNotIn("Lazy Links", index.postings)
+        self.assertEqual(index.search("sweaty"), [("chapter_2/season_1", ["11.0"])])
+
+    def test_mark_stale(self):
+        """Test a file reported as rewritten is picked up by the next lookup"""
+        index = LocationIndex(self.test_dir)
+        index.ensure_loaded()
+        with open(self.update2_json, 'w') as f:
+            json.dump({"locations": ["Lazy Lake"]}, f)
+        index.mark_stale(self.update2_json)
+        self.assertEqual(index.search("lazy lake"), [("chapter_1/season_2", ["2.0"])])
+        self.assertEqual(index.search("tilted"), [("chapter_1/season_1", ["1.0"])])
+
+        # A same-size rewrite that leaves the mtime as it was is still re-read
+        st = os.stat(self.update2_json)
+        with open(self.update2_json, 'w') as f:
+            json.dump({"locations": ["Lazy Lime"]}, f)
+        os.utime(self.update2_json, ns=(st.st_atime_ns, st.st_mtime_ns))
+        index.mark_stale(self.update2_json)
+        self.assertEqual(index.search("lazy lime"), [("chapter_1/season_2", ["2.0"])])
+        self.assertEqual(index.search("lazy lake"), [])
+
+    def test_fuzzy_matcher_includes_reference_names(self):
+        """Test fuzzy lookup covers named_locations_through_updates.json and maps its versions"""
+        with open(os.path.join(self.test_dir, "named_locations_through_updates.json"), 'w') as f:
+            json.dump([{"city": "Sanguine Suites", "versions": ["2.0"]}], f)
+        index = LocationIndex(self.test_dir)
+        self.assertEqual(index.fuzzy_matcher().search("sandguine")[0], ("Sanguine Suites", 1))
+        self.assertEqual(index.versions_for(["Sanguine Suites"], include_reference=True),
+                         [("chapter_1/season_2", ["2.0"])])
+        self.assertEqual(index.versions_for(["Sanguine Suites"]), [])
+
+if __name__ == '__main__':
+    unittest.main()
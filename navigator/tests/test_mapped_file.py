@@ -0,0 +1,76 @@
+import unittest
+import os
+import tempfile
+from navigator.core.mapped_file import MappedFile, CHECKPOINT_EVERY
+
+class TestMappedFile(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, data, name="file.json"):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_lines_match_splitlines(self):
+        """Test slicing and indexing agree with str.splitlines for assorted files"""
+        samples = [b"", b"one", b"one\n", b"one\ntwo", b"a\r\nb\r\n", b"\n\nx\n\n", b"caf\xc3\xa9\n\xffbad\n"]
+        for data in samples:
+            expected = data.decode("utf-8", "replace").replace("\r\n", "\n").split("\n")
+            if expected[-1] == "":
+                expected.pop()
+            with MappedFile(self.write(data)) as lines:
+                self.assertEqual(lines[0:len(expected) + 5], expected, data)
+                self.assertEqual(len(lines), len(expected))
+                self.assertEqual([lines[i] for i in range(len(expected))], expected)
+                if expected:
+                    self.assertEqual(lines[-1], expected[-1])
+                with self.assertRaises(IndexError):
+                    lines[len(expected)]
+
+    def test_pages_are_read_lazily(self):
+        """Test showing a page only indexes the lines up to it"""
+        count = CHECKPOINT_EVERY * 50 + 7
+        path = self.write("".join(f"line {i}\n" for i in range(count)).encode())
+        with MappedFile(path) as lines:
+            self.assertEqual(lines[0:3], ["line 0", "line 1", "line 2"])
+            self.assertEqual(lines.found, 3)
+            self.assertFalse(lines.complete)
+            self.assertEqual(lines.count_upto(200), 200)
+            self.assertEqual(lines.found, 200)
+
+            self.assertEqual(len(lines), count)
+            self.assertTrue(lines.complete)
+            # Only every CHECKPOINT_EVERY-th line start is kept
+            self.assertEqual(len(lines.checkpoints), count // CHECKPOINT_EVERY + 1)
+            self.assertEqual(lines[count - 2:], [f"line {count - 2}", f"line {count - 1}"])
+            self.assertEqual(lines[CHECKPOINT_EVERY * 3 - 1:CHECKPOINT_EVERY * 3 + 1],
+                             [f"line {CHECKPOINT_EVERY * 3 - 1}", f"line {CHECKPOINT_EVERY * 3}"])
+
+    def test_refresh_after_rewrite(self):
+        """Test a file rewritten while open is remapped rather than read past its end"""
+        path = self.write(b"a\nb\nc\nd\n")
+        with MappedFile(path) as lines:
+            self.assertEqual(len(lines), 4)
+            self.write(b"x\n")
+            lines.refresh()
+            self.assertEqual(lines[0:10], ["x"])
+            self.write(b"")
+            lines.refresh()
+            self.assertEqual(lines[0:10], [])
+
+    def test_refresh_after_replace(self):
+        """Test a same-size file renamed over the open one is picked up"""
+        path = self.write(b"a\nb\n")
+        with MappedFile(path) as lines:
+            self.assertEqual(lines[0:10], ["a", "b"])
+            os.replace(self.write(b"x\ny\n", "new.json"), path)
+            lines.refresh()
+            self.assertEqual(lines[0:10], ["x", "y"])
+
+if __name__ == '__main__':
+    unittest.main()
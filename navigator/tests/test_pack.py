@@ -0,0 +1,103 @@
+import unittest
+import os
+import shutil
+import tempfile
+import json
+from unittest.mock import patch
+from navigator.core.navigator import FileNavigator
+from navigator.core.pack import open_pack
+
+class TestPackedArchive(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.write_update("chapter_1", "season_1", "1.11", {"locations": ["Tilted Towers", "Loot Lake"], "items": ["Pistol"]})
+        self.write_update("chapter_1", "season_1", "1.6.0", {"locations": ["Loot Lake", "Pleasant Park"]})
+        self.write_update("chapter_2", "season_1", "3.0", [{"city": "Loot Lake", "x": 1, "y": 2}])
+        navigator = FileNavigator(self.test_dir)
+        self.pack_path = navigator.build_pack()
+        navigator.pack.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write_update(self, chapter, season, version, data):
+        update_dir = os.path.join(self.test_dir, chapter, season, version)
+        os.makedirs(update_dir, exist_ok=True)
+        path = os.path.join(update_dir, version + ".json")
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        return path
+
+    def test_round_trip(self):
+        """Test the pack holds the same files, locations and categories as the walk, in release order"""
+        pack = open_pack(self.pack_path)
+        self.addCleanup(pack.close)
+        walked = FileNavigator(self.test_dir)
+        walked.location_index.pack = None
+        walked.location_index.ensure_loaded()
+        files = {rel: {'mtime': mtime, 'size': size, 'locations': locations, **({'categories': categories} if categories else {})}
+                 for rel, mtime, size, locations, categories in pack.files()}
+        self.assertEqual(files, walked.location_index.files)
+        self.assertEqual([rel.split(os.sep)[2] for rel, *_ in pack.files()], ["1.6.0", "1.11", "3.0"])
+        self.assertEqual(len(pack.find("Loot Lake")), 3)
+        self.assertEqual(pack.find("Tilted Towers"), [os.path.join("chapter_1", "season_1", "1.11", "1.11.json")])
+        self.assertEqual(pack.find("Lazy Links"), [])
+        self.assertEqual(pack.listing(os.path.join("chapter_1", "season_1"))[1], ["1.11", "1.6.0"])
+
+    def test_search_without_walk(self):
+        """Test a current pack answers searches and listings without walking or listing the tree"""
+        navigator = FileNavigator(self.test_dir)
+        self.addCleanup(navigator.pack.close)
+        expected = navigator.list_directory(os.path.join(self.test_dir, "chapter_1"))
+        navigator._listings.clear()
+        with patch.object(navigator.scanner, "scan", side_effect=AssertionError("walked")), \
+                patch("os.scandir", side_effect=AssertionError("listed")), \
+                patch("navigator.core.pack.list_chapter_dirs", return_value=["chapter_1", "chapter_2"]):
+            results = navigator.search_locations("loot")
+            self.assertEqual(navigator.list_directory(os.path.join(self.test_dir, "chapter_1")), expected)
+        self.assertEqual(results, [("chapter_1/season_1", ["1.6.0", "1.11"]), ("chapter_2/season_1", ["3.0"])])
+        # Answered from the mapped postings: no file record has been decoded
+        index = navigator.location_index
+        self.assertTrue(index.packed)
+        self.assertEqual(sorted(index.match_names("T")), ["Loot Lake", "Pleasant Park", "Tilted Towers"])
+        self.assertTrue(index.packed)
+        self.assertEqual(len(index.files), 3)
+        self.assertFalse(index.packed)
+        self.assertEqual(navigator.search_locations("loot"), results)
+
+    def test_timeline_without_decoding(self):
+        """Test the catalog, lifetimes and a diff are read from the pack without decoding it, and match the walk"""
+        navigator = FileNavigator(self.test_dir)
+        self.addCleanup(navigator.pack.close)
+        walked = FileNavigator(self.test_dir)
+        self.addCleanup(walked.pack.close)
+        walked.location_index.pack = None
+        self.assertEqual(list(navigator.version_catalog()), list(walked.version_catalog()))
+        self.assertEqual(navigator.location_lifetimes().lifetimes, walked.location_lifetimes().lifetimes)
+        self.assertEqual(navigator.locations_at("1.11"), ["Loot Lake", "Tilted Towers"])
+        # One diff decodes only its two updates; the walked navigator diffs its full snapshots
+        walked.version_snapshots()
+        self.assertEqual(navigator.diff_versions("1.6.0", "1.11"), walked.diff_versions("1.6.0", "1.11"))
+        self.assertTrue(navigator.location_index.packed)
+
+    def test_stale_pack_falls_back_to_walk(self):
+        """Test edited, added and corrupt data is noticed and the tree is walked instead"""
+        path = os.path.join(self.test_dir, "chapter_1", "season_1", "1.6.0", "1.6.0.json")
+        with open(path, 'w') as f:
+            json.dump({"locations": ["Loot Lake", "Pleasant Park", "Anarchy Acres"]}, f)
+        self.write_update("chapter_2", "season_1", "4.0", {"locations": ["Lazy Links"]})
+        navigator = FileNavigator(self.test_dir)
+        self.addCleanup(navigator.pack.close)
+        stale = navigator.pack.stale_paths(self.test_dir)
+        self.assertIn(os.path.relpath(path, self.test_dir), stale)
+        self.assertIn(os.path.join("chapter_2", "season_1"), stale)
+        self.assertEqual(navigator.search_locations("anarchy"), [("chapter_1/season_1", ["1.6.0"])])
+        self.assertEqual(navigator.search_locations("lazy"), [("chapter_2/season_1", ["4.0"])])
+
+        with open(self.pack_path, 'r+b') as f:
+            f.truncate(100)
+        self.assertIsNone(open_pack(self.pack_path))
+        self.assertIsNone(FileNavigator(self.test_dir).pack)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import os
+import shutil
+import tempfile
+import time
+from navigator.core.thumbnails import Image, Thumbnail, ThumbnailStore
+from navigator.tui.preview import MapPreview, UPPER_HALF, half_block_rows
+
+class FakeStore:
+    """Thumbnail store that records what was asked of it"""
+    def __init__(self):
+        self.requests = []
+
+    def get(self, path, box):
+        self.requests.append(path)
+        if path.endswith("broken.jpg"):
+            raise OSError("cannot identify image file")
+        return Thumbnail(2, 3, bytes([255, 0, 0, 0, 255, 0, 0, 0, 255, 255, 255, 255, 0, 0, 0, 16, 16, 16]))
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+class TestMapPreview(unittest.TestCase):
+    def test_half_block_rows(self):
+        """Test two pixel rows make one cell row, with a lone last row drawn on the default background"""
+        rows = half_block_rows(FakeStore().get("map.jpg", (2, 4)))
+        self.assertEqual(rows, [
+            [(UPPER_HALF, "#ff0000 on_#0000ff"), (UPPER_HALF, "#00ff00 on_#ffffff")],
+            [(UPPER_HALF, "#000000"), (UPPER_HALF, "#111111")],
+        ])
+
+    def test_lookup_is_served_in_the_background(self):
+        """Test lookup never blocks, results land in the LRU and errors are remembered"""
+        store = FakeStore()
+        located = []
+        preview = MapPreview(store, lambda folder: located.append(folder) or (None if folder == "empty" else folder + ".jpg"),
+                             capacity=2)
+        self.addCleanup(preview.close)
+        self.assertIsNone(preview.lookup("a", (2, 4)))
+        self.assertTrue(preview.waiting)
+        wait_for(preview.poll)
+        path, rows = preview.lookup("a", (2, 4))
+        self.assertEqual((path, len(rows)), ("a.jpg", 2))
+        self.assertIsNone(preview.lookup("broken", (2, 4)))
+        wait_for(preview.poll)
+        self.assertIn("cannot identify", preview.lookup("broken", (2, 4))[1])
+        self.assertIsNone(preview.lookup("empty", (2, 4)))
+        wait_for(preview.poll)
+        self.assertEqual(preview.lookup("empty", (2, 4)), (None, None))
+        # Capacity 2: a was used least recently and has been evicted
+        self.assertEqual(list(preview.cache), [("broken", (2, 4)), ("empty", (2, 4))])
+        self.assertEqual(store.requests, ["a.jpg", "broken.jpg"])
+        # Folders are located on the worker, once each
+        self.assertEqual(located, ["a", "broken", "empty"])
+
+    def test_prefetch_neighbours(self):
+        """Test folders handed to prefetch are located and prepared once nothing is waiting"""
+        store = FakeStore()
+        preview = MapPreview(store, locate=lambda folder: None if folder == "empty" else folder + ".jpg")
+        self.addCleanup(preview.close)
+        preview.prefetch(["1.0", "empty", "2.0"], (2, 4))
+        wait_for(lambda: len(preview.cache) == 3)
+        self.assertFalse(preview.waiting)
+        self.assertEqual(preview.lookup("2.0", (2, 4))[0], "2.0.jpg")
+        self.assertEqual(store.requests, ["1.0.jpg", "2.0.jpg"])
+
+@unittest.skipIf(Image is None, "Pillow is not installed")
+class TestThumbnailStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.image = os.path.join(self.test_dir, "1.0.jpg")
+        Image.new("RGB", (400, 200), (10, 200, 30)).save(self.image, "JPEG")
+        self.store = ThumbnailStore(os.path.join(self.test_dir, "thumbnails"))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_cached_on_disk_until_the_image_changes(self):
+        """Test thumbnails fit the box, are read back from disk and are remade when the image changes"""
+        thumbnail = self.store.get(self.image, (40, 40))
+        self.assertEqual((thumbnail.width, thumbnail.height), (40, 20))
+        self.assertEqual(len(thumbnail.pixels), 40 * 20 * 3)
+        again = ThumbnailStore(self.store.cache_dir)
+        self.assertEqual(again.get(self.image, (40, 40)), thumbnail)
+        self.assertEqual(again.made, 0)
+        Image.new("RGB", (200, 200), (0, 0, 0)).save(self.image, "JPEG")
+        st = os.stat(self.image)
+        os.utime(self.image, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertEqual(again.get(self.image, (40, 40)).width, 40)
+        self.assertEqual(again.get(self.image, (40, 40)).height, 40)
+        self.assertEqual(again.made, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import os
+import shutil
+import tempfile
+import json
+from navigator.core.navigator import FileNavigator
+from navigator.core.documents import dumps_wrapped
+
+class TestReconcileNamedLocations(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.write(os.path.join("chapter_1", "season_1", "1.6.0", "1.6.0.json"), {"locations": ["Loot Lake", "Anarchy Acres"]})
+        self.write(os.path.join("chapter_1", "season_1", "1.11", "1.11.json"), {"locations": ["Loot Lake", "Tilted Towers"]})
+        self.write(os.path.join("chapter_1", "season_2", "2.0", "2.0.json"), [{"city": "Tilted Towers", "x": 0, "y": 0}])
+        # An update without location data can neither confirm nor refute anything
+        self.write(os.path.join("chapter_1", "season_2", "2.1", "2.1.json"), {})
+        self.write("named_locations_through_updates.json", [
+            {"city": "Loot Lake", "versions": ["1.11", "2.0", "2.1"]},
+            {"city": "Anarchy Acres", "versions": ["1.6.0", "3.40"]},
+        ])
+        self.navigator = FileNavigator(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, rel, data):
+        path = os.path.join(self.test_dir, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    def reference(self):
+        with open(os.path.join(self.test_dir, "named_locations_through_updates.json")) as f:
+            return json.load(f)
+
+    def test_drift_both_directions(self):
+        """Test drift is reported from the per-version JSONs and from the reference file"""
+        drift = self.navigator.reconcile_named_locations(dry_run=True)
+        self.assertEqual(drift.missing, {"Loot Lake": ["1.6.0"], "Tilted Towers": ["1.11", "2.0"]})
+        self.assertEqual(drift.stale, {"Loot Lake": ["2.0"]})
+        self.assertEqual(drift.unknown, {"Anarchy Acres": ["3.40"]})
+        self.assertEqual(drift.unverified, {"Loot Lake": ["2.1"]})
+
+    def test_apply_orders_versions_chronologically(self):
+        """Test applying the drift rewrites the reference file in release order, keeping its layout"""
+        self.navigator.reconcile_named_locations()
+        expected = [
+            {"city": "Loot Lake", "versions": ["1.6.0", "1.11", "2.1"]},
+            {"city": "Anarchy Acres", "versions": ["1.6.0", "3.40"]},
+            {"city": "Tilted Towers", "versions": ["1.11", "2.0"]},
+        ]
+        self.assertEqual(self.reference(), expected)
+        with open(os.path.join(self.test_dir, "named_locations_through_updates.json")) as f:
+            self.assertEqual(f.read(), dumps_wrapped(expected))
+        drift = self.navigator.reconcile_named_locations(dry_run=True)
+        self.assertEqual((drift.missing, drift.stale), ({}, {}))
+
+    def test_later_runs_reparse_only_changed_files(self):
+        """Test a second run re-reads just the update JSON that changed"""
+        self.navigator.reconcile_named_locations()
+        self.write(os.path.join("chapter_1", "season_2", "2.1", "2.1.json"), {"locations": ["Loot Lake", "Dusty Depot"]})
+        self.navigator.invalidate_file(os.path.join(self.test_dir, "chapter_1", "season_2", "2.1", "2.1.json"))
+        index = self.navigator.location_index
+        parsed = []
+        real_load = index.scanner.load
+        index.scanner.load = lambda paths: parsed.extend(paths) or real_load(paths)
+        drift = self.navigator.reconcile_named_locations(dry_run=True)
+        # (the reference file itself is re-read too, as the first run rewrote it)
+        updates = [rel for rel in parsed if rel.startswith("chapter_")]
+        self.assertEqual(updates, [os.path.join("chapter_1", "season_2", "2.1", "2.1.json")])
+        self.assertEqual(drift.missing, {"Dusty Depot": ["2.1"]})
+        self.assertEqual(drift.unverified, {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import os
+import shutil
+import tempfile
+import json
+from navigator.core.scanner import ArchiveScanner
+
+class TestArchiveScanner(unittest.TestCase):
+    def setUp(self):
+        # Create an archive with several chapter/season units and a stray file
+        self.test_dir = tempfile.mkdtemp()
+        for chapter, season, version in [("chapter_2", "season_1", "11.0"), ("chapter_1", "season_2", "2.0"),
+                                         ("chapter_1", "season_1", "1.1"), ("chapter_1", "season_1", "1.0")]:
+            update_dir = os.path.join(self.test_dir, chapter, season, version)
+            os.makedirs(update_dir)
+            with open(os.path.join(update_dir, version + ".json"), 'w') as f:
+                json.dump({"locations": [version]}, f)
+            with open(os.path.join(update_dir, version + ".jpg"), 'w') as f:
+                f.write("not a json")
+        with open(os.path.join(self.test_dir, "named_locations_through_updates.json"), 'w') as f:
+            json.dump([], f)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def expected_paths(self):
+        return [os.path.join("chapter_1", "season_1", "1.0", "1.0.json"),
+                os.path.join("chapter_1", "season_1", "1.1", "1.1.json"),
+                os.path.join("chapter_1", "season_2", "2.0", "2.0.json"),
+                os.path.join("chapter_2", "season_1", "11.0", "11.0.json")]
+
+    def test_list_units(self):
+        """Test work is split per chapter/season directory"""
+        scanner = ArchiveScanner(self.test_dir, workers=4)
+        self.assertEqual(scanner.list_units(), [os.path.join("chapter_1", "season_1"),
+                                                os.path.join("chapter_1", "season_2"),
+                                                os.path.join("chapter_2", "season_1")])
+
+    def test_scan_is_deterministic(self):
+        """Test serial and parallel scans return the same JSON files in the same order"""
+        serial = [rel for rel, _ in ArchiveScanner(self.test_dir, workers=1).scan()]
+        parallel = [rel for rel, _ in ArchiveScanner(self.test_dir, workers=8).scan()]
+        self.assertEqual(serial, self.expected_paths())
+        self.assertEqual(parallel, serial)
+
+    def test_load_preserves_order(self):
+        """Test parsed documents line up with the requested paths"""
+        paths = list(reversed(self.expected_paths()))
+        for scanner in (ArchiveScanner(self.test_dir, workers=4),
+                        ArchiveScanner(self.test_dir, workers=2, use_processes=True)):
+            docs = scanner.load(paths)
+            self.assertEqual([d["locations"][0] for d in docs], ["11.0", "2.0", "1.1", "1.0"])
+
+    def test_load_invalid_file(self):
+        """Test unreadable documents come back as None"""
+        empty = os.path.join("chapter_1", "season_1", "1.0", "empty.json")
+        open(os.path.join(self.test_dir, empty), 'w').close()
+        self.assertEqual(ArchiveScanner(self.test_dir).load([empty]), [None])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import io
+from navigator.tui.screen import ScreenBuffer, STYLE_CACHE_SIZE
+
+class FakeTerm:
+    """Stand-in terminal with short, readable escape sequences"""
+    home = '<home>'
+    clear = '<clear>'
+    normal = '<n>'
+    bold = '<b>'
+    reverse = '<r>'
+    underline = '<u>'
+    height = 24
+    width = 80
+
+    number_of_colors = 256
+
+    def move(self, y, x):
+        return f'<{y},{x}>'
+
+    def color(self, index):
+        return f'<c{index}>'
+
+    def on_color(self, index):
+        return f'<bg{index}>'
+
+    def color_rgb(self, r, g, b):
+        return f'<rgb{r},{g},{b}>'
+
+class TestScreenBuffer(unittest.TestCase):
+    def setUp(self):
+        self.out = io.StringIO()
+        self.screen = ScreenBuffer(FakeTerm(), out=self.out)
+
+    def frame(self, rows):
+        self.screen.begin(3, 10)
+        for y, (text, style) in enumerate(rows):
+            self.screen.write(y, 0, text, style)
+        self.out.seek(0)
+        self.out.truncate()
+        self.screen.flush()
+        return self.out.getvalue()
+
+    def test_first_frame_is_drawn_in_full(self):
+        """Test the first frame clears the screen and draws every non-blank row"""
+        output = self.frame([("title", "bold"), ("row", ""), ("", "")])
+        self.assertEqual(output, "<home><clear><0,0><b>title<n><1,0>row")
+        self.assertEqual(self.screen.frame_bytes, len(output))
+
+    def test_unchanged_frame_writes_nothing(self):
+        """Test redrawing the same frame sends no bytes"""
+        self.frame([("title", "bold"), ("row", "")])
+        self.assertEqual(self.frame([("title", "bold"), ("row", "")]), "")
+        self.assertEqual(self.screen.frame_bytes, 0)
+
+    def test_only_changed_span_is_sent(self):
+        """Test a changed row sends only the span between its first and last changed cell"""
+        self.frame([("title", ""), ("chapter_1", "reverse"), ("chapter_2", "")])
+        output = self.frame([("title", ""), ("chapter_1", ""), ("chapter_2", "reverse")])
+        self.assertEqual(output, "<1,0>chapter_1<2,0><r>chapter_2<n>")
+        self.assertEqual(self.frame([("title", ""), ("chapter_1", ""), ("chapter_3", "reverse")]), "<2,8><r>3<n>")
+
+    def test_keep_reuses_the_shown_frame(self):
+        """Test a kept frame only needs the changed rows redrawn"""
+        self.frame([("title", ""), ("row 1", ""), ("row 2", "")])
+        self.assertTrue(self.screen.begin(3, 10, keep=True))
+        self.screen.clear_row(2)
+        self.screen.write(2, 0, "row 3")
+        self.out.seek(0)
+        self.out.truncate()
+        self.screen.flush()
+        self.assertEqual(self.out.getvalue(), "<2,4>3")
+        self.assertEqual(self.screen.shown[1][0], ("r", ""))
+        self.assertFalse(self.screen.begin(4, 10, keep=True))
+
+    def test_clipping_and_invalidate(self):
+        """Test text is clipped to the frame and invalidate forces a full redraw"""
+        self.frame([("a" * 20, "")])
+        self.assertEqual(len(self.screen.shown[0]), 10)
+        self.screen.invalidate()
+        self.assertTrue(self.frame([("a" * 20, "")]).startswith("<home><clear>"))
+
+    def test_colour_cells(self):
+        """Test per-cell colours are snapped to the 256-colour cube, or sent as-is on truecolor"""
+        self.screen.begin(1, 4)
+        self.screen.write_cells(0, 1, [("x", "#ff0000 on_#000000"), ("y", "#ff0000 on_#000000"), ("z", "")])
+        self.screen.flush()
+        self.assertEqual(self.out.getvalue(), "<home><clear><0,1><c196><bg16>xy<n>z")
+        self.screen.term.number_of_colors = 1 << 24
+        self.assertEqual(self.screen.style("#0a0b0c"), "<rgb10,11,12>")
+
+    def test_style_cache_is_bounded(self):
+        """Test distinct colour combinations are kept in an LRU while their parts are cached once"""
+        colours = ["#%02x0000" % (17 * i) for i in range(16)]
+        styles = [f"{fg} on_{bg}" for fg in colours for bg in colours] * 20
+        for i, style in enumerate(styles[:STYLE_CACHE_SIZE + 10]):
+            self.screen.style(style + " bold" * (i // 256))
+        self.assertEqual(len(self.screen.styles), STYLE_CACHE_SIZE)
+        self.assertEqual(len(self.screen.parts), 16 + 16 + 1)
+        self.assertEqual(self.screen.style("#ff0000 on_#000000 bold"), "<c196><bg16><b>")
+
+if __name__ == '__main__':
+    unittest.main()
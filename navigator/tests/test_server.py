@@ -0,0 +1,130 @@
+import unittest
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from navigator.core.navigator import FileNavigator
+from navigator.web.server import ArchiveServer, etag_matches, parse_range
+
+async def exchange(port, raw, responses=1):
+    """Send raw request bytes on one connection and return [(status, headers, body)]"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    results = []
+    for _ in range(responses):
+        head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        headers = dict(line.split(": ", 1) for line in head[1:] if line)
+        length = int(headers.get("Content-Length", 0))
+        body = b"" if head[0].split(" ")[1] == "304" or raw.startswith(b"HEAD") else await reader.readexactly(length)
+        results.append((int(head[0].split(" ")[1]), headers, body))
+    writer.close()
+    return results
+
+def get(path, **headers):
+    lines = [f"GET {path} HTTP/1.1", "Host: test"] + [f"{k.replace('_', '-')}: {v}" for k, v in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+class TestParseRange(unittest.TestCase):
+    def test_ranges(self):
+        """Test single byte ranges, suffixes, clamping, ignored forms and unsatisfiable ranges"""
+        self.assertEqual(parse_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(parse_range("bytes=90-", 100), (90, 99))
+        self.assertEqual(parse_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(parse_range("bytes=50-500", 100), (50, 99))
+        for header in (None, "items=0-1", "bytes=0-1,5-6", "bytes=x-y"):
+            self.assertIsNone(parse_range(header, 100))
+        for header in ("bytes=100-", "bytes=9-3", "bytes=-0"):
+            with self.assertRaises(ValueError):
+                parse_range(header, 100)
+
+    def test_etag_matches(self):
+        """Test If-None-Match lists, weak tags and * match, and other tags do not"""
+        for header in ('"a"', 'W/"a"', '"b", W/"a"', " * "):
+            self.assertTrue(etag_matches(header, '"a"'))
+        for header in ('"b"', 'W/"b"', '"a-1"', ""):
+            self.assertFalse(etag_matches(header, '"a"'))
+
+class TestArchiveServer(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        for version, locations in (("1.0", ["Tilted Towers", "Pleasant Park"]), ("2.0", ["Tilted Towers"])):
+            update_dir = os.path.join(self.test_dir, "chapter_1", "season_1", version)
+            os.makedirs(update_dir)
+            with open(os.path.join(update_dir, version + ".json"), "w") as f:
+                json.dump({"locations": locations}, f)
+        self.image = bytes(range(256)) * 40
+        with open(os.path.join(self.test_dir, "chapter_1", "season_1", "2.0", "2.0.jpg"), "wb") as f:
+            f.write(self.image)
+        self.server = ArchiveServer(FileNavigator(self.test_dir, workers=1), port=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def run_with_server(self, client):
+        async def run():
+            await self.server.start()
+            try:
+                return await client(self.server.port)
+            finally:
+                await self.server.close()
+        return asyncio.run(run())
+
+    def test_api(self):
+        """Test queries answer JSON on one keep-alive connection, with errors as 400 and 404"""
+        raw = (get("/api/at?version=1.0") + get("/api/timeline?name=Tilted%20Towers") + get("/api/diff?old=1.0")
+               + get("/api/at?version=9.9") + get("/api/bogus") + get("/api/fuzzy?q=x&limit=abc"))
+        responses = self.run_with_server(lambda port: exchange(port, raw, 6))
+        self.assertEqual([status for status, _, _ in responses], [200, 200, 400, 404, 404, 400])
+        self.assertEqual(json.loads(responses[5][2]), {"error": "limit must be a positive integer, not 'abc'"})
+        self.assertEqual(json.loads(responses[0][2]), ["Pleasant Park", "Tilted Towers"])
+        self.assertEqual(json.loads(responses[1][2]), {"name": "Tilted Towers", "spans": [["1.0", "2.0"]]})
+        self.assertEqual(responses[0][1]["Content-Type"], "application/json")
+
+    def test_edits_are_picked_up(self):
+        """Test a JSON edited while serving is answered from once the archive is re-checked"""
+        async def client(port):
+            (_, _, before), = await exchange(port, get("/api/at?version=2.0"))
+            with open(os.path.join(self.test_dir, "chapter_1", "season_1", "2.0", "2.0.json"), "w") as f:
+                json.dump({"locations": ["Tilted Towers", "Lazy Links"]}, f)
+            self.assertEqual(self.server.refresh(), 1)
+            (_, _, after), = await exchange(port, get("/api/at?version=2.0"))
+            return json.loads(before), json.loads(after)
+
+        self.assertEqual(self.run_with_server(client), (["Tilted Towers"], ["Lazy Links", "Tilted Towers"]))
+
+    def test_map_images(self):
+        """Test maps are sent whole, by range and revalidated by ETag, and paths cannot leave the archive"""
+        async def client(port):
+            path = "/maps/chapter_1/season_1/2.0"
+            (status, headers, body), = await exchange(port, get(path))
+            etag = headers["ETag"]
+            results = [(status, body)]
+            for raw in (get(path, If_None_Match=etag), get(path, Range="bytes=10-19"), get(path, Range="bytes=99999-"),
+                        get("/maps/chapter_1/season_1/1.0"), get("/maps/../../etc"), get("/maps/%2e%2e/%2e%2e/etc"),
+                        b"HEAD " + get(path)[4:]):
+                (status, headers, body), = await exchange(port, raw)
+                results.append((status, body))
+            return results, headers
+
+        results, head_headers = self.run_with_server(client)
+        self.assertEqual(results[0], (200, self.image))
+        self.assertEqual(results[1], (304, b""))
+        self.assertEqual(results[2], (206, self.image[10:20]))
+        self.assertEqual([status for status, _ in results[3:7]], [416, 404, 404, 404])
+        self.assertEqual(results[7], (200, b""))
+        self.assertEqual(head_headers["Content-Length"], str(len(self.image)))
+
+    def test_bad_requests_close_the_connection(self):
+        """Test malformed and non-GET requests are answered and the connection closed"""
+        async def client(port):
+            (bad, _, _), = await exchange(port, b"NONSENSE\r\n\r\n")
+            (post, headers, _), = await exchange(port, b"POST /api/at HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}")
+            return bad, post, headers
+
+        bad, post, headers = self.run_with_server(client)
+        self.assertEqual((bad, post), (400, 405))
+        self.assertEqual(headers["Connection"], "close")
+
+if __name__ == '__main__':
+    unittest.main()
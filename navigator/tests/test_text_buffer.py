@@ -0,0 +1,71 @@
+import unittest
+import random
+from navigator.core.text_buffer import PieceTable, TextBuffer
+
+class TestPieceTable(unittest.TestCase):
+    def test_edits_and_lines(self):
+        """Test inserts, deletes and line lookups"""
+        table = PieceTable("{\n  \"locations\": []\n}")
+        table.insert(18, "\"Tilted Towers\"")
+        self.assertEqual(table.line(1), '  "locations": ["Tilted Towers"]')
+        self.assertEqual(table.delete(0, 2), "{\n")
+        self.assertEqual(table.line_count, 2)
+        self.assertEqual(table.line(1), "}")
+        self.assertEqual(table.position(table.offset(1, 0)), (1, 0))
+        self.assertEqual(table.offset(0, 999), table.line_length(0))
+
+    def test_matches_string_model(self):
+        """Test random edits against a plain string"""
+        rng = random.Random(7)
+        expected = "alpha\nbeta\n\ngamma"
+        table = PieceTable(expected, seed=1)
+        for _ in range(1000):
+            if rng.random() < 0.6:
+                offset = rng.randint(0, len(expected))
+                text = rng.choice(["x", "\n", "ab\ncd", "yz"])
+                table.insert(offset, text)
+                expected = expected[:offset] + text + expected[offset:]
+            else:
+                offset = rng.randint(0, len(expected))
+                length = rng.randint(0, 4)
+                self.assertEqual(table.delete(offset, length), expected[offset:offset + length])
+                expected = expected[:offset] + expected[offset + length:]
+            lines = expected.split("\n")
+            self.assertEqual(table.line_count, len(lines))
+            row = rng.randrange(len(lines))
+            self.assertEqual(table.line(row), lines[row])
+            start = rng.randint(0, len(expected))
+            self.assertEqual(table.text(start, start + 10), expected[start:start + 10])
+        self.assertEqual(table.text(), expected)
+
+class TestTextBuffer(unittest.TestCase):
+    def test_typing_is_undone_as_one_step(self):
+        """Test consecutive keystrokes merge into a single undo step"""
+        buffer = TextBuffer("[]")
+        for i, char in enumerate("abc"):
+            buffer.insert(1 + i, char)
+        self.assertEqual(buffer.text(), "[abc]")
+        self.assertEqual(buffer.undo(), 1)
+        self.assertEqual(buffer.text(), "[]")
+        self.assertEqual(buffer.redo(), 4)
+        self.assertEqual(buffer.text(), "[abc]")
+
+    def test_checkpoint_and_redo_cleared(self):
+        """Test checkpoints split undo steps and new edits drop the redo history"""
+        buffer = TextBuffer("ab")
+        buffer.insert(2, "c")
+        buffer.checkpoint()
+        buffer.insert(3, "d")
+        buffer.delete(1, 1)  # backspace over "b"
+        buffer.undo()
+        self.assertEqual(buffer.text(), "abcd")
+        buffer.undo()
+        self.assertEqual(buffer.text(), "abc")
+        buffer.insert(0, "z")
+        self.assertIsNone(buffer.redo())
+        while buffer.undo() is not None:
+            pass
+        self.assertEqual(buffer.text(), "ab")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import os
+import shutil
+import tempfile
+from navigator.core.tiles import Image, MANIFEST_FILE_NAME, build_pyramids, find_map_images, level_size, max_zoom
+
+class TestTileGeometry(unittest.TestCase):
+    def test_zoom_levels(self):
+        """Test zoom 0 fits the image in one tile and each level below the top halves it"""
+        self.assertEqual(max_zoom(256, 256), 0)
+        self.assertEqual(max_zoom(1080, 1080), 3)
+        self.assertEqual(max_zoom(4096, 4096), 4)
+        self.assertEqual(level_size(1080, 540, 3, 3), (1080, 540))
+        self.assertEqual(level_size(1080, 540, 1, 3), (270, 135))
+
+@unittest.skipIf(Image is None, "Pillow is not installed")
+class TestBuildPyramids(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.out_dir = os.path.join(self.test_dir, "tiles")
+        self.wide = self.write_image(os.path.join("chapter_1", "season_1", "1.0"), "1.0.jpg", (600, 300))
+        self.write_image(os.path.join("chapter_1", "season_1", "2.0", "2.0"), "2.0.jpg", (256, 256))
+        self.write_image(os.path.join("chapter_1", "season_1", "2.0"), "thumbnail.jpg", (64, 64))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write_image(self, rel_dir, name, size):
+        os.makedirs(os.path.join(self.test_dir, rel_dir), exist_ok=True)
+        path = os.path.join(self.test_dir, rel_dir, name)
+        Image.new("RGB", size, (200, 40, 40)).save(path, "JPEG")
+        return path
+
+    def test_find_map_images(self):
+        """Test only <version>.jpg inside a folder named after the version is picked up"""
+        self.assertEqual(find_map_images(self.test_dir), [
+            os.path.join("chapter_1", "season_1", "1.0", "1.0.jpg"),
+            os.path.join("chapter_1", "season_1", "2.0", "2.0", "2.0.jpg"),
+        ])
+
+    def test_build_and_skip_unchanged(self):
+        """Test every level is cut into full-size tiles and only changed images are rebuilt"""
+        report = build_pyramids(self.test_dir, self.out_dir, workers=2)
+        self.assertEqual(len(report.built), 2)
+        self.assertEqual(report.failed, {})
+        # 600x300 at zoom 2, 300x150 at 1, 150x75 at 0: 3x2 + 2x1 + 1x1 tiles
+        self.assertEqual(report.tiles, 9 + 1)
+        target = os.path.join(self.out_dir, "chapter_1", "season_1", "1.0")
+        with Image.open(os.path.join(target, "2", "2", "1.jpg")) as tile:
+            self.assertEqual(tile.size, (256, 256))
+        self.assertFalse(os.path.exists(os.path.join(target, "2", "3")))
+        self.assertTrue(os.path.isfile(os.path.join(target, MANIFEST_FILE_NAME)))
+
+        report = build_pyramids(self.test_dir, self.out_dir, workers=2)
+        self.assertEqual((report.built, len(report.skipped)), ([], 2))
+        st = os.stat(self.wide)
+        os.utime(self.wide, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        report = build_pyramids(self.test_dir, self.out_dir, workers=2)
+        self.assertEqual(report.built, [os.path.join("chapter_1", "season_1", "1.0", "1.0.jpg")])
+
+    def test_unreadable_image(self):
+        """Test a corrupt image is reported without leaving a partial pyramid behind"""
+        with open(self.wide, "wb") as f:
+            f.write(b"not a jpeg")
+        report = build_pyramids(self.test_dir, self.out_dir, workers=1)
+        self.assertIn(os.path.join("chapter_1", "season_1", "1.0", "1.0.jpg"), report.failed)
+        self.assertEqual(os.listdir(os.path.join(self.out_dir, "chapter_1", "season_1")), ["2.0"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from navigator.core.trigram import TrigramIndex, trigrams
+
+class TestTrigramIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = TrigramIndex(["Tilted Towers", "Tilted Town", "Pleasant Park", "Lazy Lake", "LAZY LAKE"])
+
+    def test_trigrams(self):
+        """Test trigram extraction"""
+        self.assertEqual(trigrams("park"), {"par", "ark"})
+        self.assertEqual(trigrams("ab"), set())
+
+    def test_search_is_case_insensitive(self):
+        """Test substring queries ignore case"""
+        self.assertEqual(sorted(self.index.search("TILTED")), ["Tilted Towers", "Tilted Town"])
+        self.assertEqual(sorted(self.index.search("lazy lake")), ["LAZY LAKE", "Lazy Lake"])
+        self.assertEqual(self.index.search("towers"), ["Tilted Towers"])
+
+    def test_search_checks_gram_order(self):
+        """Test names sharing every trigram but not the substring are rejected"""
+        index = TrigramIndex(["abcabd"])
+        self.assertEqual(index.search("abcab"), ["abcabd"])
+        self.assertEqual(index.search("abdab"), [])
+
+    def test_short_queries(self):
+        """Test one- and two-character queries"""
+        self.assertEqual(sorted(self.index.search("pa")), ["Pleasant Park"])
+        self.assertEqual(len(self.index.search("l")), 5)
+        self.assertEqual(len(self.index.search("")), 5)
+
+    def test_remove(self):
+        """Test removed names stop matching and leave no empty postings"""
+        self.index.remove("Pleasant Park")
+        self.assertEqual(self.index.search("park"), [])
+        self.assertNotIn("par", self.index.postings)
+        self.index.remove("Lazy Lake")
+        self.assertEqual(self.index.search("lazy"), ["LAZY LAKE"])
+        self.assertEqual(len(self.index), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+import io
 import os
 from unittest.mock import Mock, patch
 from blessed import Terminal
@@ -57,8 +58,9 @@ class TestNavigatorTUI(unittest.TestCase):
     @patch('navigator.tui.navigator.term')
     def test_execute_search_no_results(self, mock_term):
         """Test executing a search that returns no results"""
-        # Setup mock navigator to return no results
+        # Setup mock navigator to return no results, exact or fuzzy
         self.mock_navigator.search_locations.return_value = []
+        self.mock_navigator.fuzzy_search_locations.return_value = []
         
         # Setup mock terminal dimensions
         mock_term.height = 24
@@ -76,6 +78,38 @@ class TestNavigatorTUI(unittest.TestCase):
         self.assertFalse(self.tui.in_search_results_view)
         self.assertEqual(len(self.tui.search_results), 0)
         
+    @patch('navigator.tui.navigator.term')
+    def test_execute_search_fuzzy_fallback(self, mock_term):
+        """Test a search with no exact match shows the closest location names"""
+        self.mock_navigator.search_locations.return_value = []
+        self.mock_navigator.fuzzy_search_locations.return_value = [("Sanguine Suites", 1)]
+        self.mock_navigator.locations_versions.return_value = [("chapter_5/season_1", ["28.00"])]
+        mock_term.height = 24
+        mock_term.width = 80
+
+        self.tui.search_mode = True
+        self.tui.search_query = "sandguine"
+        self.tui.execute_search()
+
+        self.assertTrue(self.tui.in_search_results_view)
+        self.assertTrue(self.tui.search_fuzzy)
+        self.assertEqual(self.tui.search_results, [("chapter_5/season_1", ["28.00"], "Sanguine Suites (~1)")])
+        self.mock_navigator.locations_versions.assert_called_once_with(["Sanguine Suites"])
+
+    @patch('navigator.tui.navigator.term')
+    def test_execute_search_reuses_live_results(self, mock_term):
+        """Test Enter adopts up-to-date as-you-type results instead of searching again"""
+        mock_term.height = 24
+        mock_term.width = 80
+        self.tui.search_mode = True
+        self.tui.search_query = "Tilted"
+        self.tui.live_search.result = ("Tilted", [("chapter_1/season_1", ["1.0"])])
+
+        self.tui.execute_search()
+
+        self.assertEqual(self.tui.search_results, [("chapter_1/season_1", ["1.0"])])
+        self.mock_navigator.search_locations.assert_not_called()
+
     @patch('navigator.tui.navigator.term')
     def test_navigate_search_results(self, mock_term):
         """Test navigating through search results"""
@@ -111,6 +145,106 @@ class TestNavigatorTUI(unittest.TestCase):
             self.tui.search_selected = max(0, self.tui.search_selected - 1)
             self.assertEqual(self.tui.search_selected, 1)
     
+    def test_cursor_move_redraws_only_changed_rows(self):
+        """Test moving the cursor sends far fewer bytes than the first full frame"""
+        from navigator.tui.screen import ScreenBuffer
+        from navigator.tests.test_screen import FakeTerm
+        out = io.StringIO()
+        self.tui.screen = ScreenBuffer(FakeTerm(), out=out)
+        self.mock_navigator.entries = [f"chapter_{i}" for i in range(1, 11)]
+        self.mock_navigator.entry_is_dir.return_value = True
+        self.tui.draw(24, 80)
+        first = self.tui.screen.frame_bytes
+        self.tui.selected = 1
+        self.tui.draw(24, 80)
+        self.assertEqual(self.tui.screen.frames, 2)
+        self.assertLess(self.tui.screen.frame_bytes * 5, first)
+        self.assertEqual(out.getvalue().count("<home><clear>"), 1)
+
+    @patch('navigator.tui.navigator.term')
+    def test_map_preview_pane(self, mock_term):
+        """Test a highlighted update shows a placeholder, then its map once the background thread is done"""
+        import time
+        from navigator.core.thumbnails import Thumbnail
+        from navigator.tui.screen import ScreenBuffer
+        from navigator.tests.test_screen import FakeTerm
+        mock_term.number_of_colors = 256
+        self.tui.screen = ScreenBuffer(FakeTerm(), out=io.StringIO())
+        self.mock_navigator.current_path = "/test/dir/chapter_1/season_1"
+        self.mock_navigator.entries = ["..", "1.0", "1.1"]
+        self.mock_navigator.entry_is_dir.return_value = True
+        self.mock_navigator.map_image.side_effect = lambda folder: folder + ".jpg"
+        self.mock_navigator.image_info.return_value = None
+        self.mock_navigator.thumbnails.get.return_value = Thumbnail(1, 2, bytes([255, 0, 0, 0, 0, 255]))
+        self.tui.selected = 1
+        self.tui.draw(24, 80)
+        self.assertEqual("".join(c for c, _ in self.tui.screen.shown[1][40:54]), "Loading map...")
+        deadline = time.monotonic() + 5
+        while not self.tui.preview.poll():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.005)
+        self.tui.draw(24, 80)
+        self.assertEqual(self.tui.screen.shown[1][40], ("▀", "#ff0000 on_#0000ff"))
+        self.mock_navigator.thumbnails.get.assert_any_call("/test/dir/chapter_1/season_1/1.0.jpg", (40, 42))
+        self.tui.preview.close()
+
+    def test_map_resolution_in_season_listing(self):
+        """Test update folders in a season are listed with their map's size from the image manifest"""
+        from navigator.tui.screen import ScreenBuffer
+        from navigator.tests.test_screen import FakeTerm
+        self.tui.screen = ScreenBuffer(FakeTerm(), out=io.StringIO())
+        self.tui.show_preview = False
+        self.mock_navigator.current_path = "/test/dir/chapter_1/season_1"
+        self.mock_navigator.entries = ["..", "1.0", "1.1", "notes.txt"]
+        self.mock_navigator.entry_is_dir.side_effect = lambda entry: entry != "notes.txt"
+        infos = {
+            "/test/dir/chapter_1/season_1/1.0": {"width": 2048, "height": 2048, "progressive": True, "truncated": False},
+            "/test/dir/chapter_1/season_1/1.1": {"width": 4096, "height": 4096, "progressive": False, "truncated": True},
+        }
+        self.mock_navigator.image_info.side_effect = lambda folder, wait=True: infos.get(folder)
+        self.tui.draw(24, 80)
+        rows = ["".join(c for c, _ in row).rstrip() for row in self.tui.screen.shown[1:5]]
+        self.assertEqual(rows, ["../", "1.0/       2048x2048 progressive", "1.1/       4096x4096 TRUNCATED", "notes.txt"])
+
+    def test_report_view_scroll(self):
+        """Test the report view used by timeline queries scrolls within bounds"""
+        self.tui.show_report("3 locations", ["A", "B", "C"])
+        self.assertTrue(self.tui.viewing_report)
+        self.tui.scroll_report(5, 4)  # height 4 means 2 lines visible
+        self.assertEqual(self.tui.report_offset, 1)
+        self.tui.scroll_report(-5, 4)
+        self.assertEqual(self.tui.report_offset, 0)
+
+    def test_version_diff_report(self):
+        """Test 'd' on a highlighted update diffs it against the previous one"""
+        from navigator.core.diff import VersionDiff, SetDiff
+        from navigator.core.versions import CatalogEntry
+        self.mock_navigator.current_path = "/test/dir/chapter_1/season_2"
+        self.mock_navigator.entries = ["..", "2.0", "2.1"]
+        self.mock_navigator.entry_is_dir.return_value = True
+        self.tui.selected = 2
+        self.mock_navigator.diff_previous.return_value = VersionDiff(
+            CatalogEntry(0, "chapter_1/season_2", "2.0"), CatalogEntry(1, "chapter_1/season_2", "2.1"),
+            SetDiff(["Sunny Steps"], ["Paradise Palms"], ["Tilted Towers"]), {"biomes": SetDiff(["desert"], [], [])})
+        self.tui.show_version_diff()
+        self.mock_navigator.diff_previous.assert_called_once_with("chapter_1/season_2", "2.1")
+        self.assertTrue(self.tui.report_title.startswith("2.0 -> 2.1: +1 -1"))
+        self.assertEqual(self.tui.report_lines[:6], [
+            "chapter_1/season_2/2.0 -> chapter_1/season_2/2.1", "  + Sunny Steps", "  - Paradise Palms",
+            "    (1 unchanged)", "  [biomes]", "  + desert"])
+
+    def test_season_summary_report(self):
+        """Test the season summary uses the highlighted season inside a chapter"""
+        self.mock_navigator.current_path = "/test/dir/chapter_1"
+        self.mock_navigator.entries = ["..", "season_1", "season_2"]
+        self.tui.selected = 2
+        self.mock_navigator.season_summary.return_value = {
+            "all": ["A", "B"], "constant": ["A"], "new": ["B"], "last_seen": [], "unique": []}
+        self.tui.show_season_summary()
+        self.mock_navigator.season_summary.assert_called_once_with("chapter_1/season_2")
+        self.assertTrue(self.tui.viewing_report)
+        self.assertIn("  B", self.tui.report_lines)
+
     @patch('navigator.tui.navigator.term')
     def test_scroll_file(self, mock_term):
         """Test scrolling file content"""
@@ -138,5 +272,29 @@ class TestNavigatorTUI(unittest.TestCase):
         self.tui.scroll_file(-10, 4)
         self.assertEqual(self.tui.file_line_offset, 0)
 
+    @patch('navigator.tui.navigator.term')
+    def test_scroll_mapped_file(self, mock_term):
+        """Test a mapped file is paged without scanning past the page, and End jumps to the last page"""
+        import tempfile
+        from navigator.core.mapped_file import MappedFile
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "big.json")
+            with open(path, "w") as f:
+                f.write("".join(f"line {i}\n" for i in range(1000)))
+            self.mock_navigator.open_file.side_effect = MappedFile
+            self.tui.open_file_view(path)
+            lines = self.tui.file_content_lines
+
+            self.tui.scroll_file(10, 12)
+            self.assertEqual(self.tui.file_line_offset, 10)
+            self.assertEqual(lines.found, 20)
+
+            self.tui.scroll_file_to_end(12)
+            self.assertEqual(self.tui.file_line_offset, 990)
+            self.assertEqual(lines[990:1000][-1], "line 999")
+
+            self.tui.close_file_view()
+            self.assertEqual(self.tui.file_content_lines, [])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,86 @@
+import unittest
+import os
+import random
+from navigator.core.versions import VersionCatalog, IntervalTree, LifetimeIndex, version_key, chapter_season_key
+
+class TestVersionOrdering(unittest.TestCase):
+    def test_version_key(self):
+        """Test update folders sort chronologically rather than as strings"""
+        versions = ["1.11", "1.6.0", "32.11", "32-week-2", "32.00", "13.20-(water-lvl-5)", "13.20", "13.20-(water-lvl-4)", "6.01", "6.10"]
+        self.assertEqual(sorted(versions, key=version_key),
+                         ["1.6.0", "1.11", "6.01", "6.10", "13.20", "13.20-(water-lvl-4)", "13.20-(water-lvl-5)",
+                          "32.00", "32-week-2", "32.11"])
+
+    def test_chapter_season_key(self):
+        """Test season_10 sorts after season_9"""
+        paths = [os.path.join("chapter_1", "season_10"), os.path.join("chapter_1", "season_9"), os.path.join("chapter_2", "season_1")]
+        self.assertEqual(sorted(paths, key=chapter_season_key), [paths[1], paths[0], paths[2]])
+
+class TestVersionCatalog(unittest.TestCase):
+    def setUp(self):
+        self.s1 = os.path.join("chapter_1", "season_1")
+        self.s2 = os.path.join("chapter_1", "season_2")
+        self.catalog = VersionCatalog([(self.s2, "34.40"), (self.s1, "1.11"), (self.s1, "1.6.0"), (self.s1, "34.40")])
+
+    def test_ordinals(self):
+        """Test folders are numbered in chronological order"""
+        self.assertEqual([(e.chapter_season, e.version) for e in self.catalog],
+                         [(self.s1, "1.6.0"), (self.s1, "1.11"), (self.s1, "34.40"), (self.s2, "34.40")])
+        self.assertEqual(self.catalog.ordinal(self.s1, "1.11"), 1)
+
+    def test_in_order(self):
+        """Test folders already in chronological order keep it and are numbered the same"""
+        ordered = [(e.chapter_season, e.version) for e in self.catalog]
+        catalog = VersionCatalog(ordered + ordered[:1], in_order=True)
+        self.assertEqual(list(catalog), list(self.catalog))
+
+    def test_resolve(self):
+        """Test bare and qualified versions, including ambiguous ones"""
+        self.assertEqual(self.catalog.resolve("1.6.0"), [0])
+        self.assertEqual(self.catalog.resolve("34.40"), [2, 3])
+        self.assertEqual(self.catalog.resolve("chapter_1/season_2/34.40"), [3])
+        with self.assertRaises(ValueError):
+            self.catalog.resolve("99.99")
+
+class TestIntervalTree(unittest.TestCase):
+    def test_matches_brute_force(self):
+        """Test overlap queries against a linear scan"""
+        rng = random.Random(0)
+        intervals = []
+        for i in range(300):
+            start = rng.randint(0, 200)
+            intervals.append((start, start + rng.randint(0, 30), i))
+        tree = IntervalTree(intervals)
+        for _ in range(200):
+            lo = rng.randint(-10, 240)
+            hi = lo + rng.randint(0, 20)
+            expected = sorted(v for s, e, v in intervals if s <= hi and e >= lo)
+            self.assertEqual(sorted(tree.overlapping(lo, hi)), expected)
+        self.assertEqual(IntervalTree([]).stabbing(3), [])
+
+class TestLifetimeIndex(unittest.TestCase):
+    def test_runs_bridge_updates_without_data(self):
+        """Test lifetimes are split on real absences but not on empty updates"""
+        catalog = VersionCatalog([("c", v) for v in ["1.0", "1.1", "1.2", "1.3", "1.4"]])
+        # 1.1 has no data at all; B is missing from 1.3
+        lifetimes = LifetimeIndex(catalog, {"A": {0, 2, 3, 4}, "B": {0, 2, 4}})
+        self.assertEqual(lifetimes.lifetimes["A"], [(0, 4)])
+        self.assertEqual(lifetimes.lifetimes["B"], [(0, 2), (4, 4)])
+        self.assertEqual(lifetimes.alive_at(1), ["A", "B"])
+        self.assertEqual(lifetimes.alive_at(3), ["A"])
+        self.assertEqual(lifetimes.alive_between(3, 3), ["A"])
+        self.assertEqual(lifetimes.alive_between(3, 4), ["A", "B"])
+
+    def test_first_query_scans(self):
+        """Test a single query is answered without the tree, the same as with it"""
+        catalog = VersionCatalog([("c", str(v)) for v in range(6)])
+        presence = {"A": {0, 1, 4}, "B": {2, 3}, "C": {5}}
+        for lo, hi in [(0, 0), (1, 2), (3, 5), (5, 5)]:
+            lifetimes = LifetimeIndex(catalog, presence)
+            scanned = lifetimes.alive_between(lo, hi)
+            self.assertIsNone(lifetimes._tree)
+            self.assertEqual(scanned, lifetimes.alive_between(lo, hi))
+            self.assertIsNotNone(lifetimes._tree)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,5 @@
+"""
+Navigator tools package.
+
+Each module is a standalone maintenance script run against the archive.
+"""
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""Pack the archive's location data and directory listings into .navigator_cache/archive.pack."""
+import argparse
+import os
+import sys
+import time
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from navigator.core.navigator import FileNavigator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base_dir', nargs='?', default=project_root)
+    args = parser.parse_args()
+    if not os.path.isdir(args.base_dir):
+        print(f'Error: Base directory {args.base_dir} does not exist or is not a directory.')
+        sys.exit(1)
+
+    start = time.perf_counter()
+    navigator = FileNavigator(args.base_dir)
+    path = navigator.build_pack()
+    pack = navigator.pack
+    print(f'Wrote {path}: {pack.file_count} files, {len(pack.sections["names"])} locations, '
+          f'{os.path.getsize(path) / 1024:.1f} KiB in {(time.perf_counter() - start) * 1000:.0f} ms')
+    pack.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Cut every update's map JPG into a Leaflet z/x/y tile pyramid, skipping unchanged images."""
+import argparse
+import os
+import resource
+import sys
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from navigator.core.index import CACHE_DIR_NAME
+from navigator.core.tiles import TILE_QUALITY, TILE_SIZE, TILES_DIR_NAME, build_pyramids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base_dir', nargs='?', default=project_root)
+    parser.add_argument('--out', help=f'output directory (default: <base_dir>/{CACHE_DIR_NAME}/{TILES_DIR_NAME})')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--tile-size', type=int, default=TILE_SIZE)
+    parser.add_argument('--quality', type=int, default=TILE_QUALITY)
+    parser.add_argument('--force', action='store_true', help='rebuild pyramids that are up to date')
+    args = parser.parse_args()
+    out_dir = args.out or os.path.join(args.base_dir, CACHE_DIR_NAME, TILES_DIR_NAME)
+
+    def progress(rel, manifest, error):
+        if error is not None:
+            print(f'  failed  {rel}: {error}')
+        else:
+            print(f'  built   {rel}: {manifest["width"]}x{manifest["height"]}, '
+                  f'zoom 0-{manifest["max_zoom"]}, {manifest["tiles"]} tiles')
+
+    try:
+        report = build_pyramids(args.base_dir, out_dir, args.workers, args.tile_size, args.quality,
+                                args.force, progress)
+    except RuntimeError as e:
+        print(f'Error: {e}')
+        sys.exit(1)
+    seconds = max(report.seconds, 1e-9)
+    print(f'{len(report.built)} built, {len(report.skipped)} up to date, {len(report.failed)} failed '
+          f'in {report.seconds:.1f} s with {args.workers} workers -> {out_dir}')
+    if report.built:
+        # ru_maxrss is in KiB on Linux and is the largest single worker, not their sum
+        peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        print(f'{len(report.built) / seconds:.2f} images/s, {report.tiles / seconds:.0f} tiles/s, '
+              f'peak worker memory {peak:.0f} MiB')
+    sys.exit(1 if report.failed else 0)
+
+
+if __name__ == '__main__':
+    main()
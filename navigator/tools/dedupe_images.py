@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Find map images with identical content and optionally replace the copies with hard links."""
+import argparse
+import os
+import sys
+import time
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from navigator.core.dedupe import ImageHashes
+from navigator.core.scanner import ArchiveScanner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base_dir', nargs='?', default=project_root)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--link', action='store_true', help='replace duplicates with hard links to one copy')
+    args = parser.parse_args()
+    if not os.path.isdir(args.base_dir):
+        print(f'Error: Base directory {args.base_dir} does not exist or is not a directory.')
+        sys.exit(1)
+
+    hashes = ImageHashes(args.base_dir, scanner=ArchiveScanner(args.base_dir, workers=args.workers))
+    start = time.perf_counter()
+    hashes.load()
+    hashed = hashes.refresh()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f'{len(hashes.files)} map images, {hashed} hashed in {elapsed:.0f} ms')
+
+    groups = hashes.duplicates()
+    for group in groups:
+        note = f'{group.reclaimable / 1024:.0f} KiB reclaimable' if group.reclaimable else 'already linked'
+        print(f'\n{group.digest[:12]}  {group.size / 1024:.0f} KiB x {len(group.paths)}  ({note})')
+        for rel in group.paths:
+            print(f'  {rel}')
+    reclaimable = sum(group.reclaimable for group in groups)
+    print(f'\n{len(groups)} duplicate groups, {sum(len(g.paths) for g in groups)} images, '
+          f'{reclaimable / 1024 / 1024:.1f} MiB reclaimable')
+
+    if args.link and reclaimable:
+        linked, failed, freed = hashes.link_duplicates()
+        for rel, error in sorted(failed.items()):
+            print(f'  failed: {rel}: {error}')
+        print(f'Linked {len(linked)} images, freed {freed / 1024 / 1024:.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
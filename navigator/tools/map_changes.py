@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Compare each update's map with the previous one and report where it changed."""
+import argparse
+import os
+import sys
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from navigator.core.changes import MapChanges, pair_key, timeline_pairs
+from navigator.core.images import update_folder
+
+
+def describe(key, result):
+    older, newer = (update_folder(rel).replace(os.sep, '/') for rel in key.split('|'))
+    regions = ' '.join('%d,%d-%d,%d' % tuple(box) for box in result['regions'][:4])
+    if len(result['regions']) > 4:
+        regions += f' (+{len(result["regions"]) - 4} more)'
+    return (f'{older} -> {newer}: similarity {result["similarity"]:.1%}, '
+            f'hash distance {result["hash_distance"]}, {len(result["regions"])} regions  {regions}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base_dir', nargs='?', default=project_root)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--changed', action='store_true', help='only list pairs whose maps differ')
+    args = parser.parse_args()
+    if not os.path.isdir(args.base_dir):
+        print(f'Error: Base directory {args.base_dir} does not exist or is not a directory.')
+        sys.exit(1)
+
+    changes = MapChanges(args.base_dir)
+    try:
+        report = changes.compare_timeline(workers=args.workers)
+    except RuntimeError as e:
+        print(f'Error: {e}')
+        sys.exit(1)
+    results = {**report.cached, **report.compared}
+    for older, newer in timeline_pairs(args.base_dir):
+        key = pair_key(older, newer)
+        if key in report.failed:
+            print(f'{key}: failed: {report.failed[key]}')
+        elif key in results and (results[key]['changed_blocks'] or not args.changed):
+            print(describe(key, results[key]))
+    print(f'\n{len(report.compared)} pairs compared, {len(report.cached)} cached, '
+          f'{len(report.failed)} failed in {report.seconds:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Compare named_locations_through_updates.json with the per-version JSONs and optionally rewrite it to match."""
+import argparse
+import os
+import sys
+import time
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from navigator.core.navigator import FileNavigator
+from navigator.core.reconcile import drift_report, is_in_sync
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base_dir', nargs='?', default=project_root)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--apply', action='store_true', help='rewrite the reference file to match the updates')
+    args = parser.parse_args()
+    if not os.path.isdir(args.base_dir):
+        print(f'Error: Base directory {args.base_dir} does not exist or is not a directory.')
+        sys.exit(1)
+
+    navigator = FileNavigator(args.base_dir, workers=args.workers)
+    start = time.perf_counter()
+    drift = navigator.reconcile_named_locations(dry_run=not args.apply)
+    elapsed = (time.perf_counter() - start) * 1000
+    for line in drift_report(drift):
+        print(line)
+    if is_in_sync(drift):
+        print(f'Nothing to change ({elapsed:.0f} ms)')
+    elif args.apply:
+        print(f'Rewrote named_locations_through_updates.json: {len(drift.missing)} cities with versions added, '
+              f'{len(drift.stale)} with versions removed ({elapsed:.0f} ms)')
+    else:
+        print('Dry run; pass --apply to rewrite the reference file')
+        # Out of sync: fail, so the check can gate a commit or CI job
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Update the map image manifest and summarize the archive's map resolutions and damaged images."""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+# Add project root to sys.path so navigator package can be imported
+script_path = os.path.abspath(__file__)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from navigator.core.images import ImageManifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base_dir', nargs='?', default=project_root)
+    args = parser.parse_args()
+    if not os.path.isdir(args.base_dir):
+        print(f'Error: Base directory {args.base_dir} does not exist or is not a directory.')
+        sys.exit(1)
+
+    manifest = ImageManifest(args.base_dir)
+    start = time.perf_counter()
+    manifest.load()
+    read = manifest.refresh()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f'{len(manifest.images)} map images, {read} headers read in {elapsed:.0f} ms')
+
+    sizes = Counter()
+    progressive = 0
+    for folder, entry in sorted(manifest.images.items()):
+        if 'error' in entry:
+            print(f'  unreadable: {entry["image"]}: {entry["error"]}')
+            continue
+        sizes[f'{entry["width"]}x{entry["height"]}'] += 1
+        progressive += entry['progressive']
+        if entry['truncated']:
+            print(f'  truncated: {entry["image"]}')
+    for size, count in sizes.most_common():
+        print(f'  {size}: {count}')
+    print(f'  progressive: {progressive}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
 from blessed import Terminal
 import os
-import json
+from navigator.core.json_validator import JsonValidator
+from navigator.core.text_buffer import TextBuffer
+from navigator.tui.screen import ScreenBuffer
 
 class EditorTUI:
     """Text-based editor for JSON files in the navigator"""
@@ -8,22 +10,35 @@ class EditorTUI:
     def __init__(self, file_path, content_lines, term=None):
         """Initialize the editor with file path and content"""
         self.file_path = file_path
-        self.content_lines = content_lines.copy()  # Work on a copy of the content
+        # Piece table over the original text; edits never copy the document
+        self.buffer = TextBuffer('\n'.join(content_lines))
         self.term = term or Terminal()
         
         self.cursor_row = 0
         self.cursor_col = 0
         self.viewport_offset = 0  # For scrolling vertically
         self.edit_mode = False
-        self.status_message = f"Editing {os.path.basename(file_path)} - Press 'i' to enter edit mode, 'q' to quit"
+        self.status_message = f"Editing {os.path.basename(file_path)} - Press 'i' to enter edit mode, 'u'/'r' to undo/redo, 'q' to quit"
         self.current_line = ""  # For line editing
+
+        # Incremental redraw state: what is on screen and what changed since
+        self.screen = ScreenBuffer(self.term)
+        self.dirty = set()        # buffer rows edited since the last draw
+        self.dirty_from = None    # first row of a line shift (newline, join), if any
+        self.full_redraw = True
+        self.drawn_viewport = None
+        self.drawn_cursor = (0, 0, False)
+        self.drawn_status = None
+        self.painted_rows = 0     # rows recomposed by the last draw
         
-        # Attempt to parse JSON to enable structured editing
-        try:
-            self.json_data = json.loads('\n'.join(content_lines))
-            self.json_mode = True
-        except json.JSONDecodeError:
-            self.json_mode = False
+        # JSON files (or anything that parses as JSON) are checked as you type
+        self.validator = JsonValidator(self.buffer.line, self.buffer.line_count, lines=list(content_lines) or [''])
+        self.json_mode = file_path.lower().endswith('.json') or self.validator.valid
+        # Only a document that parsed on open has to stay valid to be saved, so a new or
+        # half-repaired file can still be written as text
+        self.strict_json = self.validator.valid
+        if not self.json_mode:
+            self.validator = None
     
     def run(self):
         """Run the editor interface and return updated content if saved"""
@@ -37,6 +52,12 @@ class EditorTUI:
                     # Navigation mode
                     if key.lower() == 'q':
                         return None  # Cancel without saving
+                    elif key.lower() == 'u':
+                        self.undo()
+                    elif key.lower() == 'r':
+                        self.redo()
+                    elif key.lower() == 'j':
+                        self.jump_to_error()
                     elif key.lower() == 's':
                         return self.save_changes()
                     elif key.lower() == 'i':
@@ -54,7 +75,7 @@ class EditorTUI:
                     # Edit mode
                     if key.name == 'KEY_ESCAPE':
                         self.edit_mode = False
-                        self.status_message = f"Editing {os.path.basename(self.file_path)} - Press 'i' to enter edit mode, 's' to save, 'q' to quit"
+                        self.status_message = f"Editing {os.path.basename(self.file_path)} - Press 'i' to enter edit mode, 'u'/'r' to undo/redo, 's' to save, 'q' to quit"
                     elif key.name == 'KEY_ENTER':
                         self.insert_newline()
                     elif key.name == 'KEY_BACKSPACE':
@@ -75,58 +96,108 @@ class EditorTUI:
                 self.draw()
     
     def draw(self):
-        """Draw the editor interface"""
+        """
+        Draw the editor interface.
+
+        Only rows marked dirty by edits, plus the rows the cursor left and entered, are
+        recomposed; everything is redrawn after a scroll, a resize or mark_all_dirty().
+        """
         height, width = self.term.height, self.term.width
-        print(self.term.home + self.term.clear)
-        
-        # Draw header
-        header = f"Editing: {self.file_path}"
-        print(self.term.move(0, 0) + self.term.bold(header[:width]))
-        
-        # Calculate visible content range
         max_display_lines = height - 3  # Reserve lines for header and status
-        visible_lines = self.content_lines[self.viewport_offset:self.viewport_offset + max_display_lines]
-        
-        # Draw content lines
-        for i, line in enumerate(visible_lines):
-            line_num = self.viewport_offset + i
-            line_prefix = f"{line_num+1:4d} | "
-            
-            # If this is the cursor line and in edit mode, show cursor
-            if line_num == self.cursor_row and self.edit_mode:
-                if self.cursor_col > len(line):
-                    pad_length = self.cursor_col - len(line)
-                    line = line + " " * pad_length
-                
-                # Show cursor by highlighting the character at cursor position
-                before_cursor = line[:self.cursor_col]
-                cursor_char = line[self.cursor_col:self.cursor_col+1] if self.cursor_col < len(line) else " "
-                after_cursor = line[self.cursor_col+1:] if self.cursor_col < len(line) else ""
-                
-                display_line = line_prefix + before_cursor + self.term.reverse(cursor_char) + after_cursor
-            else:
-                display_line = line_prefix + line
-            
-            # Highlight cursor line
-            if line_num == self.cursor_row:
-                print(self.term.move(i + 1, 0) + self.term.underline(display_line[:width]))
-            else:
-                print(self.term.move(i + 1, 0) + display_line[:width])
-        
+        cursor = (self.cursor_row, self.cursor_col, self.edit_mode)
+        full = (self.full_redraw or self.viewport_offset != self.drawn_viewport
+                or not self.screen.begin(height, width, keep=True))
+        if full:
+            self.screen.begin(height, width)
+            # Draw header
+            self.screen.write(0, 0, f"Editing: {self.file_path}", 'bold')
+            rows = range(self.viewport_offset, self.viewport_offset + max_display_lines)
+        else:
+            rows = set(self.dirty)
+            if self.dirty_from is not None:
+                rows.update(range(self.dirty_from, self.viewport_offset + max_display_lines))
+            if self.drawn_cursor != cursor:
+                rows.update((self.drawn_cursor[0], self.cursor_row))
+            rows = sorted(r for r in rows if self.viewport_offset <= r < self.viewport_offset + max_display_lines)
+
+        for line_num in rows:
+            y = line_num - self.viewport_offset + 1
+            if not full:
+                self.screen.clear_row(y)
+            if line_num < self.buffer.line_count:
+                self.draw_line(y, line_num, width)
+        self.painted_rows = len(rows)
+
         # Draw status line
-        status = self.status_message
-        if self.json_mode:
-            status += " [JSON]"
-        
-        print(self.term.move(height - 1, 0) + self.term.reverse(status[:width]))
+        status = self.status_message + self.json_status()
+        if full or status != self.drawn_status:
+            self.screen.clear_row(height - 1)
+            self.screen.write(height - 1, 0, status, 'reverse')
+            self.drawn_status = status
+        self.screen.flush()
+
+        self.dirty = set()
+        self.dirty_from = None
+        self.full_redraw = False
+        self.drawn_viewport = self.viewport_offset
+        self.drawn_cursor = cursor
+
+    def draw_line(self, y, line_num, width):
+        line = self.buffer.line(line_num)
+        line_prefix = f"{line_num+1:4d} | "
+        # Highlight cursor line
+        style = 'underline' if line_num == self.cursor_row else ''
+        self.screen.write(y, 0, line_prefix + line, style)
+        if line_num == self.cursor_row and self.edit_mode:
+            # Show cursor by highlighting the character at cursor position
+            cursor_char = line[self.cursor_col:self.cursor_col+1] or " "
+            self.screen.write(y, len(line_prefix) + self.cursor_col, cursor_char, 'underline reverse')
+
+    def json_status(self):
+        """Live validity indicator for the status bar"""
+        if not self.json_mode:
+            return ""
+        if self.validator.valid:
+            return " [JSON ok]"
+        row, col, message = self.validator.error
+        return f" [JSON error {row + 1}:{col + 1} {message}, j to jump]"
+
+    def after_edit(self):
+        """Re-check the lines touched by the latest buffer change"""
+        if self.validator is None or self.buffer.last_change is None:
+            return
+        offset, removed, inserted = self.buffer.last_change
+        row = self.buffer.position(offset)[0]
+        self.validator.update(row, removed.count('\n') + 1, inserted.count('\n') + 1)
+
+    def jump_to_error(self):
+        """Move the cursor to the first JSON error"""
+        if self.validator is None or self.validator.valid:
+            self.status_message = "No JSON errors"
+            return
+        row, col, _ = self.validator.error
+        self.buffer.checkpoint()
+        self.cursor_row, self.cursor_col = row, min(col, self.buffer.line_length(row))
+        self.scroll_to_cursor()
+
+    def mark_dirty(self, row):
+        """Repaint one buffer row on the next draw"""
+        self.dirty.add(row)
+
+    def mark_dirty_from(self, row):
+        """Repaint every row from this one down, e.g. after lines were inserted or joined"""
+        self.dirty_from = row if self.dirty_from is None else min(self.dirty_from, row)
+
+    def mark_all_dirty(self):
+        self.full_redraw = True
     
     def move_cursor_up(self):
         """Move cursor up one line"""
         if self.cursor_row > 0:
+            self.buffer.checkpoint()
             self.cursor_row -= 1
             # Adjust column if new line is shorter
-            if self.cursor_col > len(self.content_lines[self.cursor_row]):
-                self.cursor_col = len(self.content_lines[self.cursor_row])
+            self.cursor_col = min(self.cursor_col, self.buffer.line_length(self.cursor_row))
             
             # Scroll if needed
             if self.cursor_row < self.viewport_offset:
@@ -134,44 +205,54 @@ class EditorTUI:
     
     def move_cursor_down(self):
         """Move cursor down one line"""
-        if self.cursor_row < len(self.content_lines) - 1:
+        if self.cursor_row < self.buffer.line_count - 1:
+            self.buffer.checkpoint()
             self.cursor_row += 1
             # Adjust column if new line is shorter
-            if self.cursor_col > len(self.content_lines[self.cursor_row]):
-                self.cursor_col = len(self.content_lines[self.cursor_row])
+            self.cursor_col = min(self.cursor_col, self.buffer.line_length(self.cursor_row))
             
             # Scroll if needed
-            if self.cursor_row >= self.viewport_offset + self.term.height - 3:
-                self.viewport_offset = max(0, self.cursor_row - (self.term.height - 4))
+            self.scroll_to_cursor()
     
     def move_cursor_left(self):
         """Move cursor left one character"""
         if self.cursor_col > 0:
+            self.buffer.checkpoint()
             self.cursor_col -= 1
     
     def move_cursor_right(self):
         """Move cursor right one character"""
-        if self.cursor_col < len(self.content_lines[self.cursor_row]):
+        if self.cursor_col < self.buffer.line_length(self.cursor_row):
+            self.buffer.checkpoint()
             self.cursor_col += 1
+
+    def scroll_to_cursor(self):
+        """Keep the cursor row inside the viewport"""
+        if self.cursor_row < self.viewport_offset:
+            self.viewport_offset = self.cursor_row
+        elif self.cursor_row >= self.viewport_offset + self.term.height - 3:
+            self.viewport_offset = max(0, self.cursor_row - (self.term.height - 4))
+
+    def cursor_offset(self):
+        """Character offset of the cursor in the buffer"""
+        return self.buffer.offset(self.cursor_row, self.cursor_col)
+
+    def move_cursor_to(self, offset):
+        self.cursor_row, self.cursor_col = self.buffer.position(offset)
+        self.scroll_to_cursor()
     
     def insert_character(self, key):
         """Insert a character at the current cursor position"""
-        current_line = self.content_lines[self.cursor_row]
-        new_line = current_line[:self.cursor_col] + key + current_line[self.cursor_col:]
-        self.content_lines[self.cursor_row] = new_line
-        self.cursor_col += 1
+        self.buffer.insert(self.cursor_offset(), key)
+        self.after_edit()
+        self.mark_dirty(self.cursor_row)
+        self.cursor_col += len(key)
     
     def insert_newline(self):
         """Insert a new line at the current cursor position"""
-        current_line = self.content_lines[self.cursor_row]
-        left_part = current_line[:self.cursor_col]
-        right_part = current_line[self.cursor_col:]
-        
-        # Replace current line with left part
-        self.content_lines[self.cursor_row] = left_part
-        
-        # Insert new line with right part
-        self.content_lines.insert(self.cursor_row + 1, right_part)
+        self.buffer.insert(self.cursor_offset(), '\n')
+        self.after_edit()
+        self.mark_dirty_from(self.cursor_row)
         
         # Move cursor to beginning of new line
         self.cursor_row += 1
@@ -183,60 +264,64 @@ class EditorTUI:
     
     def handle_backspace(self):
         """Handle backspace key in edit mode"""
-        if self.cursor_col > 0:
-            # Delete character before cursor
-            current_line = self.content_lines[self.cursor_row]
-            new_line = current_line[:self.cursor_col-1] + current_line[self.cursor_col:]
-            self.content_lines[self.cursor_row] = new_line
-            self.cursor_col -= 1
-        elif self.cursor_row > 0:
-            # Join with previous line
-            prev_line = self.content_lines[self.cursor_row - 1]
-            current_line = self.content_lines[self.cursor_row]
-            
-            # Set cursor position to end of previous line
-            self.cursor_col = len(prev_line)
-            
-            # Join lines
-            self.content_lines[self.cursor_row - 1] = prev_line + current_line
-            
-            # Remove current line
-            self.content_lines.pop(self.cursor_row)
-            
-            # Move cursor to previous line
-            self.cursor_row -= 1
+        offset = self.cursor_offset()
+        if offset > 0:
+            # Deletes the character before the cursor, or joins with the previous line
+            row = self.cursor_row
+            self.buffer.delete(offset - 1, 1)
+            self.after_edit()
+            self.move_cursor_to(offset - 1)
+            if self.cursor_row == row:
+                self.mark_dirty(row)
+            else:
+                self.mark_dirty_from(self.cursor_row)
     
     def handle_delete(self):
         """Handle delete key in edit mode"""
-        current_line = self.content_lines[self.cursor_row]
-        
-        if self.cursor_col < len(current_line):
-            # Delete character at cursor
-            new_line = current_line[:self.cursor_col] + current_line[self.cursor_col+1:]
-            self.content_lines[self.cursor_row] = new_line
-        elif self.cursor_row < len(self.content_lines) - 1:
-            # Join with next line
-            next_line = self.content_lines[self.cursor_row + 1]
-            self.content_lines[self.cursor_row] = current_line + next_line
-            
-            # Remove next line
-            self.content_lines.pop(self.cursor_row + 1)
+        # Deletes the character at the cursor, or joins with the next line at end of line
+        removed = self.buffer.delete(self.cursor_offset(), 1)
+        if removed:
+            self.after_edit()
+        if removed == '\n':
+            self.mark_dirty_from(self.cursor_row)
+        else:
+            self.mark_dirty(self.cursor_row)
+
+    def undo(self):
+        """Revert the last edit, moving the cursor to where it happened"""
+        offset = self.buffer.undo()
+        if offset is None:
+            self.status_message = "Nothing to undo"
+        else:
+            self.after_edit()
+            self.move_cursor_to(offset)
+            self.mark_all_dirty()
+
+    def redo(self):
+        """Reapply the last undone edit"""
+        offset = self.buffer.redo()
+        if offset is None:
+            self.status_message = "Nothing to redo"
+        else:
+            self.after_edit()
+            self.move_cursor_to(offset)
+            self.mark_all_dirty()
     
     def save_changes(self):
         """Save changes and return updated content"""
-        # If in JSON mode, try to validate JSON before saving
+        # Serialized straight from the piece table
+        content = self.buffer.text()
+        # If the file parsed on open, refuse to save while the live validator reports an error
         if self.json_mode:
-            try:
-                json_content = '\n'.join(self.content_lines)
-                json.loads(json_content)  # Validate JSON
+            if not self.validator.valid:
+                row, col, message = self.validator.error
+                self.status_message = f"Invalid JSON: {message}: line {row + 1} column {col + 1}"
+                if self.strict_json:
+                    return None
+            else:
                 self.status_message = "JSON validated and saved"
-                return self.content_lines
-            except json.JSONDecodeError as e:
-                self.status_message = f"Invalid JSON: {str(e)}"
-                return None
-        else:
-            # For non-JSON files, just return updated content
-            return self.content_lines
+        # For non-JSON files, just return updated content
+        return content.split('\n')
 
     @staticmethod
     def edit_file(file_path, content_lines=None):
@@ -0,0 +1,137 @@
+import threading
+import time
+
+
+class SearchCancelled(Exception):
+    """Raised inside the worker when a newer query supersedes the one being run."""
+
+
+class LiveSearch:
+    """
+    Runs as-you-type location searches on a background thread.
+
+    submit() is called on every keystroke and returns immediately. The worker waits until
+    typing pauses for `delay` seconds, so fast typing never queues stale scans, and
+    abandons a running query as soon as a newer one is submitted. A query that extends an
+    earlier one is answered by filtering that query's matching names instead of searching
+    the whole index again.
+    """
+
+    def __init__(self, navigator, delay=0.12, history_size=32):
+        self.navigator = navigator
+        self.delay = delay
+        self.history_size = history_size
+        self.history = {}  # casefolded query -> matching location names, most recent last
+        self.cond = threading.Condition()
+        self.generation = 0
+        self.pending = None
+        self.pending_time = 0.0
+        self.result = None  # (query, results) of the latest finished search
+        self.fresh = False
+        self.thread = None
+        self.closed = False
+
+    def submit(self, query):
+        """Schedule query, superseding anything pending or in flight."""
+        with self.cond:
+            self.generation += 1
+            self.pending = query
+            self.pending_time = time.monotonic()
+            self.fresh = False
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._worker, name='live-search', daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def poll(self):
+        """Return (query, results) once per finished search, or None if nothing new."""
+        with self.cond:
+            if not self.fresh:
+                return None
+            self.fresh = False
+            return self.result
+
+    def results_for(self, query):
+        """Return the finished results for exactly this query, or None."""
+        with self.cond:
+            if self.result is not None and self.result[0] == query and self.pending is None:
+                return self.result[1]
+            return None
+
+    def reset(self):
+        """Forget cached matches, e.g. after the archive was edited."""
+        with self.cond:
+            self.generation += 1
+            self.pending = None
+            self.result = None
+            self.fresh = False
+            self.history = {}
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.generation += 1
+            self.cond.notify()
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                while self.pending is None and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return
+                # Debounce: keep waiting while keystrokes keep arriving
+                while True:
+                    remaining = self.pending_time + self.delay - time.monotonic()
+                    if remaining <= 0 or self.closed:
+                        break
+                    self.cond.wait(remaining)
+                if self.pending is None:
+                    continue  # reset() dropped the query while we were waiting
+                query, generation = self.pending, self.generation
+                self.pending = None
+            try:
+                results = self.run(query, lambda: self.generation != generation)
+            except SearchCancelled:
+                continue
+            except Exception:
+                results = []
+            with self.cond:
+                if generation == self.generation:
+                    self.result = (query, results)
+                    self.fresh = True
+
+    def run(self, query, cancelled):
+        """Search for query, raising SearchCancelled if cancelled() turns true."""
+        key = query.strip().casefold()
+        if not key:
+            return []
+        names = self.history.get(key)
+        if names is None:
+            base = self._longest_cached_prefix(key)
+            if base is None:
+                names = self.navigator.match_location_names(query.strip())
+            else:
+                names = []
+                for i, name in enumerate(base):
+                    if i % 256 == 0 and cancelled():
+                        raise SearchCancelled()
+                    if key in name.casefold():
+                        names.append(name)
+        self._remember(key, names)
+        if cancelled():
+            raise SearchCancelled()
+        return self.navigator.locations_versions(names, include_reference=False)
+
+    def _longest_cached_prefix(self, key):
+        for end in range(len(key) - 1, 0, -1):
+            names = self.history.get(key[:end])
+            if names is not None:
+                return names
+        return None
+
+    def _remember(self, key, names):
+        self.history.pop(key, None)
+        self.history[key] = names
+        while len(self.history) > self.history_size:
+            del self.history[next(iter(self.history))]
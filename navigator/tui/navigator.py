@@ -2,7 +2,11 @@ from blessed import Terminal
 import os
 import sys
 import json
+from navigator.core.mapped_file import MappedFile
 from navigator.tui.editor import EditorTUI
+from navigator.tui.live_search import LiveSearch
+from navigator.tui.preview import MapPreview
+from navigator.tui.screen import ScreenBuffer
 
 term = Terminal()
 
@@ -73,12 +77,41 @@ class NavigatorTUI:
         self.search_results = []
         self.search_selected = 0
         self.in_search_results_view = False
+        self.search_fuzzy = False
+        self.live_search = LiveSearch(navigator)
+        self.live_query = None  # query the live results shown in search mode belong to
+
+        # Read-only list views (timeline queries and similar reports)
+        self.viewing_report = False
+        self.report_title = ""
+        self.report_lines = []
+        self.report_offset = 0
+
+        # Map thumbnails beside the directory list, made on a background thread
+        self.show_preview = True
+        self.preview = MapPreview(navigator.thumbnails, locate=navigator.map_image)
+
+        # Views are composed off-screen and only changed cells are sent to the terminal
+        self.screen = ScreenBuffer(term)
+
+    def clear_screen(self):
+        """Clear the terminal for a prompt that draws directly, outside the screen buffer"""
+        print(term.clear)
+        self.screen.invalidate()
 
     def execute_search(self):
         self.search_results = []
         self.search_selected = 0
+        self.search_fuzzy = False
         if self.search_query.strip():
-            results = self.navigator.search_locations(self.search_query)
+            # Reuse the as-you-type results when they are already up to date
+            results = self.live_search.results_for(self.search_query)
+            if results is None:
+                results = self.navigator.search_locations(self.search_query)
+            if not results:
+                # Nothing contains the query verbatim; offer the closest names instead
+                results = self.fuzzy_results(self.search_query)
+                self.search_fuzzy = len(results) > 0
             self.search_results = results
         self.search_mode = False
         self.in_search_results_view = len(self.search_results) > 0
@@ -86,17 +119,33 @@ class NavigatorTUI:
         height, width = term.height, term.width
         self.draw(height, width)
 
+    def fuzzy_results(self, query, limit=5):
+        """Build (chapter_season, updates, label) rows for the location names closest to query"""
+        rows = []
+        for name, distance in self.navigator.fuzzy_search_locations(query, limit):
+            for chapter_season, updates in self.navigator.locations_versions([name]):
+                rows.append((chapter_season, updates, f"{name} (~{distance})"))
+        return rows
+
     def run(self):
         with term.fullscreen(), term.cbreak(), term.hidden_cursor():
             height, width = term.height, term.width
             self.draw(height, width)
             while True:
                 if self.search_mode:
-                    key = term.inkey()
+                    key = term.inkey(timeout=0.05)
+                    if key == '':
+                        # No keystroke: pick up results as soon as the background search finishes
+                        update = self.live_search.poll()
+                        if update is not None:
+                            self.live_query, self.search_results = update
+                            self.draw(height, width)
+                        continue
                     if key.name == 'KEY_ESCAPE':
                         self.search_mode = False
                         self.search_query = ""
                         self.search_results = []
+                        self.live_query = None
                         self.draw(height, width)
                         continue
                     elif key.name == 'KEY_ENTER' or key == '\n':
@@ -105,24 +154,73 @@ class NavigatorTUI:
                         continue
                     elif key.name == 'KEY_BACKSPACE':
                         self.search_query = self.search_query[:-1]
+                        self.live_search.submit(self.search_query)
                         self.draw(height, width)
                         continue
                     else:
-                        if key.is_sequence or key == '':
+                        if key.is_sequence:
                             continue
                         self.search_query += key
+                        self.live_search.submit(self.search_query)
                         self.draw(height, width)
                         continue
 
-                key = term.inkey()
+                manifest = self.navigator.image_manifest
+                key = term.inkey(timeout=0.05 if self.preview.waiting or manifest.waiting else None)
+                if key == '':
+                    # No keystroke: show the map preview and resolutions as soon as they are ready
+                    if self.preview.poll() | manifest.poll():
+                        self.draw(height, width)
+                    continue
 
                 if key.lower() == 'q':
+                    self.close_file_view()
+                    self.preview.close()
+                    self.live_search.close()
                     break
 
                 if key.lower() == 'f':
                     self.search_mode = True
                     self.search_query = ""
-                    self.draw_search_prompt(height, width)
+                    self.search_results = []
+                    self.live_query = None
+                    # Files may have been edited since the last search
+                    self.live_search.reset()
+                    self.draw(height, width)
+                    continue
+
+                if self.viewing_report:
+                    if key.name == 'KEY_UP':
+                        self.scroll_report(-1, height)
+                    elif key.name == 'KEY_DOWN':
+                        self.scroll_report(1, height)
+                    elif key.name == 'KEY_PPAGE':
+                        self.scroll_report(-(height - 2), height)
+                    elif key.name == 'KEY_NPAGE':
+                        self.scroll_report(height - 2, height)
+                    elif key.name in ('KEY_BACKSPACE', 'KEY_ESCAPE'):
+                        self.viewing_report = False
+                    self.draw(height, width)
+                    continue
+
+                if key.lower() == 't' and not self.viewing_file:
+                    self.show_timeline_query()
+                    self.draw(height, width)
+                    continue
+
+                if key.lower() == 'd' and not self.viewing_file and not self.in_search_results_view:
+                    self.show_version_diff()
+                    self.draw(height, width)
+                    continue
+
+                if key.lower() == 's' and not self.viewing_file and not self.in_search_results_view:
+                    self.show_season_summary()
+                    self.draw(height, width)
+                    continue
+
+                if key.lower() == 'p' and not self.viewing_file and not self.in_search_results_view:
+                    self.show_preview = not self.show_preview
+                    self.draw(height, width)
                     continue
 
                 if self.viewing_file:
@@ -134,12 +232,17 @@ class NavigatorTUI:
                         self.scroll_file(-(height - 2), height)
                     elif key.name == 'KEY_NPAGE':
                         self.scroll_file(height - 2, height)
+                    elif key.name == 'KEY_HOME':
+                        self.file_line_offset = 0
+                    elif key.name == 'KEY_END':
+                        self.scroll_file_to_end(height)
                     elif key.lower() == 'e':
                         self.show_edit_menu()
                         self.draw(height, width)
                         continue
                     elif key.name in ('KEY_BACKSPACE', 'KEY_ESCAPE'):
                         self.viewing_file = False
+                        self.close_file_view()
                         self.draw(height, width)
                         continue
 
@@ -175,10 +278,9 @@ class NavigatorTUI:
                 elif key.name == 'KEY_ENTER' or key == '\n':
                     res = self.navigator.enter(self.selected)
                     if res:
-                        # Viewing a JSON file, read contents
-                        self.file_content_lines = self.navigator.read_file(res)
+                        # Viewing a JSON file, map it and read only the lines on screen
+                        self.open_file_view(res)
                         self.file_line_offset = 0
-                        self.file_path = res
                         self.viewing_file = True
                     else:
                         # Directory changed, reset selection
@@ -189,9 +291,12 @@ class NavigatorTUI:
                 self.draw(height, width)
 
     def draw(self, height, width):
-        print(term.home + term.clear)
+        """Compose the current view off-screen and send only what changed since the last frame"""
+        self.screen.begin(height, width)
         if self.search_mode:
             self.draw_search_prompt(height, width)
+        elif self.viewing_report:
+            self.draw_report_view(height, width)
         elif self.in_search_results_view and self.search_results:
             self.draw_search_results(height, width)
         elif self.viewing_file:
@@ -199,85 +304,346 @@ class NavigatorTUI:
         else:
             self.draw_directory_view(height, width)
         if self.viewing_file:
-            print(term.move(height - 1, 0) + term.reverse(' q:quit  e:edit  Backspace:return ') + term.normal)
+            self.screen.write(height - 1, 0, ' q:quit  e:edit  Home/End:jump  Backspace:return ', 'reverse')
         else:
-            print(term.move(height - 1, 0) + term.reverse(' q:quit  Enter:open  Backspace:up  f:search ') + term.normal)
+            self.screen.write(height - 1, 0, ' q:quit  Enter:open  Bksp:up  f:search  t:timeline  s:season  d:diff  p:preview ', 'reverse')
+        self.screen.flush()
 
     def draw_search_prompt(self, height, width):
         prompt = "Search locations: " + self.search_query
-        print(term.move(height // 2, max(0, (width - len(prompt)) // 2)) + term.reverse(prompt) + term.normal)
+        if not self.search_results:
+            self.screen.write(height // 2, max(0, (width - len(prompt)) // 2), prompt, 'reverse')
+            return
+        # Live results for what has been typed so far, refreshed by the background search
+        self.screen.write(0, 0, prompt, 'reverse')
+        self.screen.write(1, 0, f"{len(self.search_results)} chapter/seasons match '{self.live_query}' - Enter to browse")
+        for i, row in enumerate(self.search_results[:max(0, height - 4)]):
+            self.screen.write(i + 2, 0, self.format_search_row(row, width))
 
     def draw_search_results(self, height, width):
-        title = f"Search results for '{self.search_query}' (Press Backspace to cancel)"
-        print(term.move(0, 0) + term.bold(title[:width]))
+        if self.search_fuzzy:
+            title = f"No exact match for '{self.search_query}', closest locations (Press Backspace to cancel)"
+        else:
+            title = f"Search results for '{self.search_query}' (Press Backspace to cancel)"
+        self.screen.write(0, 0, title, 'bold')
         if not self.search_results:
-            print(term.move(2, 0) + "No results found.")
+            self.screen.write(2, 0, "No results found.")
             return
             
         max_display = height - 3
         start = max(0, self.search_selected - max_display + 1) if self.search_selected >= max_display else 0
         
-        for i, (chapter_season, updates) in enumerate(self.search_results[start:start + max_display]):
+        for i, row in enumerate(self.search_results[start:start + max_display]):
             focused = (start + i == self.search_selected)
-            
-            # Format as "chapter_x/season_y    [update1, update2, ...]"
-            updates_str = f"[{', '.join(updates)}]"
-            
-            # Calculate available width for main text and updates
-            display_width = width - 4  # Leave some margin
-            
-            # If combined length is too long, truncate updates list
-            if len(chapter_season) + len(updates_str) + 4 > display_width:
-                max_updates_width = display_width - len(chapter_season) - 8
-                if max_updates_width > 10:  # Only if we have reasonable space
-                    updates_str = updates_str[:max_updates_width] + "...]"
-            
-            # Format with updates right-aligned
-            padding = display_width - len(chapter_season) - len(updates_str)
-            line = chapter_season + " " * max(1, padding) + updates_str
-            
-            if len(line) > width:
-                line = line[:width - 3] + "..."
-                
-            if focused:
-                print(term.move(i + 1, 0) + term.reverse(line))
-            else:
-                print(term.move(i + 1, 0) + line)
+            line = self.format_search_row(row, width)
+            self.screen.write(i + 1, 0, line, 'reverse' if focused else '')
+
+    def format_search_row(self, row, width):
+        chapter_season, updates = row[0], row[1]
+        # Fuzzy rows carry the matched location name in front of the directory
+        if len(row) > 2:
+            chapter_season = f"{row[2]}  {chapter_season}"
+
+        # Format as "chapter_x/season_y    [update1, update2, ...]"
+        updates_str = f"[{', '.join(updates)}]"
+
+        # Calculate available width for main text and updates
+        display_width = width - 4  # Leave some margin
+
+        # If combined length is too long, truncate updates list
+        if len(chapter_season) + len(updates_str) + 4 > display_width:
+            max_updates_width = display_width - len(chapter_season) - 8
+            if max_updates_width > 10:  # Only if we have reasonable space
+                updates_str = updates_str[:max_updates_width] + "...]"
+
+        # Format with updates right-aligned
+        padding = display_width - len(chapter_season) - len(updates_str)
+        line = chapter_season + " " * max(1, padding) + updates_str
+
+        if len(line) > width:
+            line = line[:width - 3] + "..."
+        return line
 
     def draw_directory_view(self, height, width):
         title = f'Directory: {self.navigator.current_path}'
-        print(term.move(0, 0) + term.bold(title[:width]))
+        self.screen.write(0, 0, title, 'bold')
+        layout = self.preview_layout(height, width)
+        folder = self.preview_folder() if layout is not None else None
+        list_width = layout[0] - 1 if folder is not None else width
         max_display = height - 2
         start = max(0, self.selected - max_display + 1) if self.selected >= max_display else 0
-        for i, entry in enumerate(self.navigator.entries[start:start+max_display]):
+        visible = self.navigator.entries[start:start+max_display]
+        names = [entry + ('/' if self.navigator.entry_is_dir(entry) else '') for entry in visible]
+        column = max(map(len, names), default=0) + 2
+        for i, (entry, line) in enumerate(zip(visible, names)):
             focused = (start + i == self.selected)
-            entry_path = os.path.join(self.navigator.current_path, entry if entry != '..' else os.pardir)
-            line = entry + ('/' if os.path.isdir(entry_path) else '')
-            if focused:
-                print(term.move(i+1, 0) + term.reverse(line[:width]))
-            else:
-                print(term.move(i+1, 0) + line[:width])
+            note = self.map_note(entry)
+            if note:
+                line = line.ljust(column) + note
+            self.screen.write(i + 1, 0, line[:list_width], 'reverse' if focused else '')
+        if folder is not None:
+            self.draw_preview(folder, *layout)
+
+    def map_note(self, entry):
+        """
+        Describe the map of an update folder listed in a season from the image manifest, never
+        the image. Nothing is shown until the manifest has been loaded in the background.
+        """
+        rel = os.path.relpath(self.navigator.current_path, self.navigator.base_dir)
+        if rel == os.curdir or len(rel.split(os.sep)) != 2 or entry == '..' or not self.navigator.entry_is_dir(entry):
+            return ''
+        info = self.navigator.image_info(os.path.join(self.navigator.current_path, entry), wait=False)
+        if not info:
+            return ''
+        if 'error' in info:
+            return 'unreadable map'
+        note = f"{info['width']}x{info['height']}"
+        if info['progressive']:
+            note += ' progressive'
+        if info['truncated']:
+            note += ' TRUNCATED'
+        return note
+
+    def preview_layout(self, height, width):
+        """Return (column, pixel box) of the map preview pane, or None when it is off or would not fit"""
+        if not self.show_preview or width < 60 or height < 8:
+            return None
+        # Each cell shows two pixels stacked, so a square map is twice as wide in cells as it is tall
+        columns = min(width // 2, 2 * (height - 3))
+        return width - columns, (columns, 2 * (height - 3))
+
+    def preview_folder(self):
+        """Return the update folder being browsed or highlighted, whose map is previewed, or None"""
+        selected = self.selected_version()
+        if selected is None:
+            return None
+        return os.path.join(self.navigator.base_dir, *selected)
+
+    def draw_preview(self, folder, x, box):
+        """Draw the map of folder at column x, or a note while it is made; never waits for it"""
+        if term.number_of_colors < 256:
+            self.screen.write(1, x, 'Map preview needs a colour terminal', 'bold')
+            return
+        # The image is located on the preview thread, so drawing makes no filesystem calls
+        found = self.preview.lookup(folder, box)
+        path, rows = found if found is not None else (None, None)
+        if found is None:
+            self.screen.write(1, x, 'Loading map...', 'bold')
+        elif path is None:
+            self.screen.write(1, x, 'No map image', 'bold')
+        elif isinstance(rows, str):
+            self.screen.write(1, x, rows[:box[0]], 'bold')
+        else:
+            for i, cells in enumerate(rows):
+                self.screen.write_cells(i + 1, x, cells)
+            self.screen.write(len(rows) + 1, x, os.path.basename(path)[:box[0]])
+        # Get the maps either side of the cursor ready too
+        if os.path.dirname(folder) == os.path.normpath(self.navigator.current_path):
+            entries = self.navigator.entries
+            nearby = [self.selected + 1, self.selected - 1, self.selected + 2, self.selected - 2]
+            self.preview.prefetch([os.path.join(self.navigator.current_path, entries[i])
+                                   for i in nearby if 0 <= i < len(entries) and entries[i] != '..'], box)
 
     def draw_file_view(self, height, width):
         title = f'Viewing file: {self.file_path}'
-        print(term.move(0, 0) + term.bold(title[:width]))
+        self.screen.write(0, 0, title, 'bold')
         max_display = height - 2
-        lines_to_show = self.file_content_lines[self.file_line_offset:self.file_line_offset + max_display]
+        lines = self.file_content_lines
+        if isinstance(lines, MappedFile):
+            lines.refresh()
+        lines_to_show = lines[self.file_line_offset:self.file_line_offset + max_display]
         for i, line in enumerate(lines_to_show):
             if len(line) > width:
                 line = line[:width-3] + '...'
-            print(term.move(i + 1, 0) + line)
-        status = f'Lines {self.file_line_offset + 1} - {min(self.file_line_offset + max_display, len(self.file_content_lines))} of {len(self.file_content_lines)}'
-        print(term.move(height - 1, 0) + term.reverse(status.ljust(width)) + term.normal)
+            self.screen.write(i + 1, 0, line)
+        status = f'Lines {self.file_line_offset + 1} - {self.file_line_offset + len(lines_to_show)}'
+        if isinstance(lines, MappedFile) and not lines.complete:
+            # The end of the file has not been scanned yet; don't read it just for the status
+            status += f' of {lines.found}+'
+        else:
+            status += f' of {len(lines)}'
+        self.screen.write(height - 1, 0, status.ljust(width), 'reverse')
+
+    def draw_report_view(self, height, width):
+        self.screen.write(0, 0, self.report_title, 'bold')
+        max_display = height - 2
+        for i, line in enumerate(self.report_lines[self.report_offset:self.report_offset + max_display]):
+            if len(line) > width:
+                line = line[:width-3] + '...'
+            self.screen.write(i + 1, 0, line)
+
+    def show_report(self, title, lines):
+        """Switch to the read-only list view"""
+        self.report_title = title
+        self.report_lines = lines
+        self.report_offset = 0
+        self.viewing_report = True
+
+    def scroll_report(self, direction, height):
+        max_offset = max(0, len(self.report_lines) - (height - 2))
+        self.report_offset = min(max_offset, max(0, self.report_offset + direction))
+
+    def show_timeline_query(self):
+        """Ask for a version or a version range and list the locations on the map at that time"""
+        self.clear_screen()
+        print(term.move(2, 2) + term.bold("Locations on the map"))
+        print(term.normal_cursor)
+        prompt = "Enter a version (26.10) or a range (23.00..27.00), ESC to cancel:"
+        query = get_user_input(prompt, y_pos=4).strip()
+        print(term.hidden_cursor)
+        if not query:
+            return
+
+        try:
+            if '..' in query:
+                start, end = (part.strip() for part in query.split('..', 1))
+                rows = self.navigator.locations_between(start, end)
+                title = f"{len(rows)} locations on the map between {start} and {end}"
+                lines = []
+                for name, spans in rows:
+                    spans_str = ', '.join(first if first == last else f"{first} - {last}" for first, last in spans)
+                    lines.append(f"{name}  [{spans_str}]")
+            else:
+                lines = self.navigator.locations_at(query)
+                title = f"{len(lines)} locations on the map at {query}"
+        except ValueError as e:
+            title, lines = str(e), []
+        self.show_report(title + " (Press Backspace to return)", lines)
+
+    def selected_season(self):
+        """Return the chapter/season being browsed (or highlighted in a chapter), or None"""
+        rel = os.path.relpath(self.navigator.current_path, self.navigator.base_dir)
+        parts = [] if rel == os.curdir else rel.split(os.sep)
+        if len(parts) == 1 and 0 <= self.selected < len(self.navigator.entries):
+            entry = self.navigator.entries[self.selected]
+            if entry != '..':
+                parts.append(entry)
+        if len(parts) < 2:
+            return None
+        return os.path.join(parts[0], parts[1])
+
+    def selected_version(self):
+        """Return (chapter_season, version) of the update folder being browsed or highlighted, or None"""
+        rel = os.path.relpath(self.navigator.current_path, self.navigator.base_dir)
+        parts = [] if rel == os.curdir else rel.split(os.sep)
+        if len(parts) == 2 and 0 <= self.selected < len(self.navigator.entries):
+            entry = self.navigator.entries[self.selected]
+            if entry != '..' and self.navigator.entry_is_dir(entry):
+                parts.append(entry)
+        if len(parts) < 3:
+            return None
+        return os.path.join(parts[0], parts[1]), parts[2]
+
+    def show_version_diff(self):
+        """
+        Diff the update being browsed against the previous one; elsewhere ask for two
+        versions, or 'all' for every consecutive diff in the archive
+        """
+        try:
+            selected = self.selected_version()
+            if selected:
+                diff = self.navigator.diff_previous(*selected)
+                if diff is None:
+                    self.show_report(f"{selected[1]} is the first update with data (Press Backspace to return)", [])
+                    return
+                diffs = [diff]
+            else:
+                self.clear_screen()
+                print(term.move(2, 2) + term.bold("Compare updates"))
+                print(term.normal_cursor)
+                prompt = "Enter two versions (25.00..26.10) or 'all' for the whole timeline, ESC to cancel:"
+                query = get_user_input(prompt, y_pos=4).strip()
+                print(term.hidden_cursor)
+                if not query:
+                    return
+                if query.lower() == 'all':
+                    diffs = self.navigator.timeline_diffs()
+                elif '..' in query:
+                    old, new = (part.strip() for part in query.split('..', 1))
+                    diffs = [self.navigator.diff_versions(old, new)]
+                else:
+                    raise ValueError(f"Expected two versions separated by '..', got '{query}'")
+            lines = []
+            count = 0
+            for diff in diffs:
+                lines.extend(self.format_diff(diff))
+                count += 1
+        except ValueError as e:
+            self.show_report(str(e) + " (Press Backspace to return)", [])
+            return
+        title = self.diff_title(diff) if count == 1 else f"{count} consecutive update diffs"
+        self.show_report(title + " (Press Backspace to return)", lines)
+
+    @staticmethod
+    def diff_title(diff):
+        return f"{diff.old.version} -> {diff.new.version}: +{len(diff.locations.added)} -{len(diff.locations.removed)}"
+
+    def format_diff(self, diff):
+        """Render a VersionDiff as report lines"""
+        old = diff.old.chapter_season.replace(os.sep, '/') + '/' + diff.old.version
+        new = diff.new.chapter_season.replace(os.sep, '/') + '/' + diff.new.version
+        lines = [f"{old} -> {new}"]
+        sections = [('locations', diff.locations)] + sorted(diff.categories.items())
+        for name, changes in sections:
+            if name != 'locations':
+                lines.append(f"  [{name}]")
+            lines.extend(f"  + {value}" for value in changes.added)
+            lines.extend(f"  - {value}" for value in changes.removed)
+            if name == 'locations':
+                lines.append(f"    ({len(changes.retained)} unchanged)")
+        lines.append("")
+        return lines
+
+    def show_season_summary(self):
+        """List what was constant, new and unique to the season being browsed"""
+        chapter_season = self.selected_season()
+        summary = self.navigator.season_summary(chapter_season) if chapter_season else None
+        if summary is None:
+            self.show_report("Open or highlight a season directory first (Press Backspace to return)", [])
+            return
+        sections = [
+            ('constant', "On the map for the whole season"),
+            ('new', "First appeared this season"),
+            ('last_seen', "Not seen after this season"),
+            ('unique', "Only seen this season"),
+        ]
+        lines = []
+        for category, heading in sections:
+            names = summary[category]
+            lines.append(f"{heading} ({len(names)})")
+            lines.extend(f"  {name}" for name in names)
+            lines.append("")
+        title = f"{chapter_season}: {len(summary['all'])} locations"
+        self.show_report(title + " (Press Backspace to return)", lines)
+
+    def open_file_view(self, path):
+        """Show path in the file view, mapped rather than read"""
+        self.close_file_view()
+        self.file_content_lines = self.navigator.open_file(path)
+        self.file_path = path
+
+    def close_file_view(self):
+        if isinstance(self.file_content_lines, MappedFile):
+            self.file_content_lines.close()
+        self.file_content_lines = []
+
+    def file_line_count(self, limit=None):
+        """Lines in the viewed file; with a limit, a mapped file is scanned no further than that"""
+        lines = self.file_content_lines
+        if isinstance(lines, MappedFile):
+            lines.refresh()
+            return lines.count_upto(limit)
+        return len(lines) if limit is None else min(len(lines), limit)
 
     def scroll_file(self, direction, height):
         max_display = height - 2
-        new_offset = self.file_line_offset + direction
-        if new_offset < 0:
-            new_offset = 0
-        elif new_offset > max(0, len(self.file_content_lines) - max_display):
-            new_offset = max(0, len(self.file_content_lines) - max_display)
-        self.file_line_offset = new_offset
+        new_offset = max(0, self.file_line_offset + direction)
+        # Only the lines up to the bottom of the new page need to exist
+        count = self.file_line_count(new_offset + max_display)
+        self.file_line_offset = min(new_offset, max(0, count - max_display))
+
+    def scroll_file_to_end(self, height):
+        self.file_line_offset = max(0, self.file_line_count() - (height - 2))
         
     def show_edit_menu(self):
         """Show a menu of editing options for the current file"""
@@ -291,22 +657,27 @@ class NavigatorTUI:
             "Remove a location", 
             "Add/edit a category",
             "Remove a category",
+            "Rename a location in every update",
+            "Remove a location from every update",
             "Cancel"
         ]
         selected = 0
+        # The edits rewrite the file in place, which must not happen while it is mapped
+        self.close_file_view()
         
         while True:
             # Draw menu
-            print(term.clear)
-            print(term.move(2, 2) + term.bold(f"Edit options for {os.path.basename(self.file_path)}:"))
+            self.screen.begin(height, width)
+            self.screen.write(2, 2, f"Edit options for {os.path.basename(self.file_path)}:", 'bold')
             
             for i, option in enumerate(menu_options):
                 if i == selected:
-                    print(term.move(4 + i, 4) + term.reverse(f"▶ {option}"))
+                    self.screen.write(4 + i, 4, f"▶ {option}", 'reverse')
                 else:
-                    print(term.move(4 + i, 4) + f"  {option}")
+                    self.screen.write(4 + i, 4, f"  {option}")
             
-            print(term.move(4 + len(menu_options) + 2, 2) + "Use arrow keys to select, Enter to confirm")
+            self.screen.write(4 + len(menu_options) + 2, 2, "Use arrow keys to select, Enter to confirm")
+            self.screen.flush()
             
             # Get input
             key = term.inkey()
@@ -331,10 +702,19 @@ class NavigatorTUI:
                 elif selected == 4:  # Remove category
                     self.remove_category()
                     break
+                elif selected == 5:  # Archive-wide rename
+                    self.edit_location_everywhere(remove=False)
+                    break
+                elif selected == 6:  # Archive-wide removal
+                    self.edit_location_everywhere(remove=True)
+                    break
                 else:  # Cancel
                     break
             elif key.name == 'KEY_ESCAPE' or key.lower() == 'q':
                 break
+
+        # Show the file as saved; writes are atomic, so after a failed one it is as it was
+        self.open_file_view(self.file_path)
             
     def add_location(self):
         """Add a new location to the current JSON file"""
@@ -343,29 +723,29 @@ class NavigatorTUI:
         
         # Get current file content as JSON
         try:
-            with open(self.file_path, 'r') as f:
-                json_data = json.loads(f.read())
-                
-            if "locations" not in json_data or not isinstance(json_data["locations"], list):
-                json_data["locations"] = []
+            # The cached document: only modified right before it is saved
+            json_data = self.navigator.documents.load(self.file_path)
+            if not isinstance(json_data, dict):
+                raise ValueError("not a JSON object")
         except Exception:
             # Create new data structure if file doesn't exist or is invalid
             json_data = {"locations": []}
+        existing = json_data["locations"] if isinstance(json_data.get("locations"), list) else []
         
         # Save current terminal state
         height, width = term.height, term.width
         
         # Clear the screen for input
-        print(term.clear)
+        self.clear_screen()
         print(term.move(2, 2) + term.bold("Add a new location to " + os.path.basename(self.file_path)))
         print(term.move(4, 2) + "Current locations:")
         
         # Display existing locations for reference
-        for i, loc in enumerate(json_data.get("locations", [])):
+        for i, loc in enumerate(existing):
             if i < 15:  # Show only first 15 to avoid cluttering
                 print(term.move(5+i, 4) + f"• {loc}")
             elif i == 15:
-                print(term.move(5+i, 4) + f"... and {len(json_data['locations'])-15} more")
+                print(term.move(5+i, 4) + f"... and {len(existing)-15} more")
                 
         # Get user input with custom input method
         prompt = "Enter location name (or press ESC to cancel):"
@@ -375,17 +755,12 @@ class NavigatorTUI:
         
         if location_name:
             # Add the new location if not already present
-            if location_name not in json_data["locations"]:
-                json_data["locations"].append(location_name)
-                json_data["locations"].sort()  # Sort alphabetically
+            if location_name not in existing:
+                json_data["locations"] = sorted(existing + [location_name])  # Sort alphabetically
                 
                 # Save updated JSON
                 try:
-                    with open(self.file_path, 'w') as f:
-                        f.write(json.dumps(json_data, indent=2))
-                    
-                    # Update the displayed content
-                    self.file_content_lines = json.dumps(json_data, indent=2).splitlines()
+                    self.navigator.documents.save(self.file_path, json_data)
                     
                     # Show success message
                     print(term.move(20, 2) + term.green(f"Added '{location_name}' to locations!"))
@@ -395,7 +770,6 @@ class NavigatorTUI:
                     print(term.move(20, 2) + term.red(f"Error: {str(e)}"))
                     print(term.move(22, 2) + "Press any key to continue...")
                     term.inkey()
-                    self.file_content_lines = [f"Error saving file: {str(e)}"]
         
     def add_category(self):
         """Add a new category/field to the current JSON file"""
@@ -404,13 +778,12 @@ class NavigatorTUI:
         
         # Get current file content as JSON
         try:
-            with open(self.file_path, 'r') as f:
-                json_data = json.loads(f.read())
+            json_data = self.navigator.documents.load(self.file_path)
         except Exception:
             json_data = {}
         
         # Clear the screen for input
-        print(term.clear)
+        self.clear_screen()
         print(term.move(2, 2) + term.bold("Add a new category to " + os.path.basename(self.file_path)))
         
         # Show existing categories
@@ -497,11 +870,7 @@ class NavigatorTUI:
                 
             # Save updated JSON
             try:
-                with open(self.file_path, 'w') as f:
-                    f.write(json.dumps(json_data, indent=2))
-                
-                # Update the displayed content
-                self.file_content_lines = json.dumps(json_data, indent=2).splitlines()
+                self.navigator.documents.save(self.file_path, json_data)
                 
                 # Show success message
                 print(term.move(row+4, 2) + term.green(f"Added/updated '{category_name}' successfully!"))
@@ -511,7 +880,6 @@ class NavigatorTUI:
                 print(term.move(row+4, 2) + term.red(f"Error: {str(e)}"))
                 print(term.move(row+6, 2) + "Press any key to continue...")
                 term.inkey()
-                self.file_content_lines = [f"Error saving file: {str(e)}"]
         
         # Restore terminal state
         print(term.hidden_cursor)
@@ -523,13 +891,12 @@ class NavigatorTUI:
         
         # Get current file content as JSON
         try:
-            with open(self.file_path, 'r') as f:
-                json_data = json.loads(f.read())
+            json_data = self.navigator.documents.load(self.file_path)
         except Exception:
             json_data = {"locations": []}
             
         if "locations" not in json_data or not isinstance(json_data["locations"], list) or not json_data["locations"]:
-            print(term.clear)
+            self.clear_screen()
             print(term.move(2, 2) + term.bold("No locations to edit"))
             print(term.move(4, 2) + "This file doesn't have any locations to edit.")
             print(term.move(6, 2) + "Press any key to continue...")
@@ -541,7 +908,7 @@ class NavigatorTUI:
         selected = 0
         
         while True:
-            print(term.clear)
+            self.clear_screen()
             print(term.move(2, 2) + term.bold("Select a location to edit:"))
             
             # Calculate visible range
@@ -567,7 +934,7 @@ class NavigatorTUI:
                 selected += 1
             elif key.name == 'KEY_ENTER' or key == '\n':
                 old_name = locations[selected]
-                print(term.clear)
+                self.clear_screen()
                 print(term.move(2, 2) + term.bold(f"Editing location: {old_name}"))
                 print(term.move(4, 2) + "Enter new name (or press ESC to cancel):")
                 
@@ -582,11 +949,7 @@ class NavigatorTUI:
                     
                     # Save back to file
                     try:
-                        with open(self.file_path, 'w') as f:
-                            f.write(json.dumps(json_data, indent=2))
-                        
-                        # Update displayed content
-                        self.file_content_lines = json.dumps(json_data, indent=2).splitlines()
+                        self.navigator.documents.save(self.file_path, json_data)
                         
                         print(term.move(8, 2) + term.green(f"Updated '{old_name}' to '{new_name}'!"))
                     except Exception as e:
@@ -605,13 +968,12 @@ class NavigatorTUI:
         
         # Get current file content as JSON
         try:
-            with open(self.file_path, 'r') as f:
-                json_data = json.loads(f.read())
+            json_data = self.navigator.documents.load(self.file_path)
         except Exception:
             json_data = {"locations": []}
             
         if "locations" not in json_data or not isinstance(json_data["locations"], list) or not json_data["locations"]:
-            print(term.clear)
+            self.clear_screen()
             print(term.move(2, 2) + term.bold("No locations to remove"))
             print(term.move(4, 2) + "This file doesn't have any locations to remove.")
             print(term.move(6, 2) + "Press any key to continue...")
@@ -623,7 +985,7 @@ class NavigatorTUI:
         selected = 0
         
         while True:
-            print(term.clear)
+            self.clear_screen()
             print(term.move(2, 2) + term.bold("Select a location to remove:"))
             
             # Calculate visible range
@@ -651,7 +1013,7 @@ class NavigatorTUI:
                 location = locations[selected]
                 
                 # Confirm deletion
-                print(term.clear)
+                self.clear_screen()
                 print(term.move(2, 2) + term.bold(f"Confirm removal of: {location}"))
                 print(term.move(4, 2) + "Are you sure? (y/n)")
                 
@@ -662,11 +1024,7 @@ class NavigatorTUI:
                     
                     # Save back to file
                     try:
-                        with open(self.file_path, 'w') as f:
-                            f.write(json.dumps(json_data, indent=2))
-                        
-                        # Update displayed content
-                        self.file_content_lines = json.dumps(json_data, indent=2).splitlines()
+                        self.navigator.documents.save(self.file_path, json_data)
                         
                         print(term.move(6, 2) + term.green(f"Removed '{location}' successfully!"))
                     except Exception as e:
@@ -685,8 +1043,7 @@ class NavigatorTUI:
         
         # Get current file content as JSON
         try:
-            with open(self.file_path, 'r') as f:
-                json_data = json.loads(f.read())
+            json_data = self.navigator.documents.load(self.file_path)
         except Exception:
             json_data = {}
             
@@ -694,7 +1051,7 @@ class NavigatorTUI:
         categories = [key for key in json_data.keys() if key != "locations"]
         
         if not categories:
-            print(term.clear)
+            self.clear_screen()
             print(term.move(2, 2) + term.bold("No categories to remove"))
             print(term.move(4, 2) + "This file doesn't have any categories to remove.")
             print(term.move(6, 2) + "Press any key to continue...")
@@ -705,7 +1062,7 @@ class NavigatorTUI:
         selected = 0
         
         while True:
-            print(term.clear)
+            self.clear_screen()
             print(term.move(2, 2) + term.bold("Select a category to remove:"))
             
             # Calculate visible range
@@ -737,7 +1094,7 @@ class NavigatorTUI:
                 category = categories[selected]
                 
                 # Confirm deletion
-                print(term.clear)
+                self.clear_screen()
                 print(term.move(2, 2) + term.bold(f"Confirm removal of category: {category}"))
                 print(term.move(4, 2) + "Are you sure? (y/n)")
                 
@@ -748,11 +1105,7 @@ class NavigatorTUI:
                     
                     # Save back to file
                     try:
-                        with open(self.file_path, 'w') as f:
-                            f.write(json.dumps(json_data, indent=2))
-                        
-                        # Update displayed content
-                        self.file_content_lines = json.dumps(json_data, indent=2).splitlines()
+                        self.navigator.documents.save(self.file_path, json_data)
                         
                         print(term.move(6, 2) + term.green(f"Removed category '{category}' successfully!"))
                     except Exception as e:
@@ -762,4 +1115,56 @@ class NavigatorTUI:
                     term.inkey()
                 break
             elif key.name == 'KEY_ESCAPE':
-                break
\ No newline at end of file
+                break
+
+    def edit_location_everywhere(self, remove=False):
+        """Rename or remove a location across the whole archive, after showing what would change"""
+        self.clear_screen()
+        action = "Remove" if remove else "Rename"
+        print(term.move(2, 2) + term.bold(f"{action} a location in every update"))
+        print(term.normal_cursor)
+        name = get_user_input("Location name (or press ESC to cancel):", y_pos=4).strip()
+        new_name = None
+        if name and not remove:
+            new_name = get_user_input(f"New name for '{name}':", name, y_pos=7).strip()
+        print(term.hidden_cursor)
+        if not name or (not remove and (not new_name or new_name == name)):
+            return
+
+        # Dry run first: the index says which files would change without touching them
+        if remove:
+            plan = self.navigator.remove_location_everywhere(name, dry_run=True)
+        else:
+            plan = self.navigator.rename_location_everywhere(name, new_name, dry_run=True)
+        self.clear_screen()
+        if not plan.files and plan.reference_versions is None:
+            print(term.move(2, 2) + term.bold(f"'{name}' was not found in any update"))
+            print(term.move(4, 2) + "Press any key to continue...")
+            term.inkey()
+            return
+        summary = f"'{name}' -> '{new_name}'" if not remove else f"remove '{name}'"
+        print(term.move(2, 2) + term.bold(f"{action}: {summary}"))
+        print(term.move(4, 2) + f"{len(plan.files)} update files would change:")
+        shown = max(1, term.height - 14)
+        for i, rel in enumerate(plan.files[:shown]):
+            print(term.move(5 + i, 4) + f"• {rel}")
+        row = 5 + min(len(plan.files), shown)
+        if len(plan.files) > shown:
+            print(term.move(row, 4) + f"... and {len(plan.files) - shown} more")
+            row += 1
+        if plan.reference_versions is not None:
+            print(term.move(row + 1, 2) + f"named_locations_through_updates.json: entry with {len(plan.reference_versions)} versions")
+        print(term.move(row + 3, 2) + "Apply to all files? (y/n)")
+        if term.inkey().lower() != 'y':
+            return
+
+        try:
+            if remove:
+                result = self.navigator.remove_location_everywhere(name)
+            else:
+                result = self.navigator.rename_location_everywhere(name, new_name)
+            print(term.move(row + 5, 2) + term.green(f"Updated {len(result.files)} update files"))
+        except Exception as e:
+            print(term.move(row + 5, 2) + term.red(f"Error: {str(e)} - no files were changed"))
+        print(term.move(row + 7, 2) + "Press any key to continue...")
+        term.inkey()
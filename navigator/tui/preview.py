@@ -0,0 +1,139 @@
+import threading
+from collections import OrderedDict
+
+UPPER_HALF = '▀'
+
+
+def _quantize(value):
+    # 16 levels per channel keeps the number of distinct styles (and escape sequences
+    # the screen buffer caches) bounded, which a thumbnail does not visibly suffer from
+    return (value >> 4) * 17
+
+
+def half_block_rows(thumbnail):
+    """
+    Turn a Thumbnail into rows of (char, style) cells, two pixels per cell: the upper
+    half block is drawn in the top pixel's colour on the bottom pixel's background.
+    """
+    width, pixels = thumbnail.width, thumbnail.pixels
+    rows = []
+    for y in range(0, thumbnail.height, 2):
+        top = y * width * 3
+        bottom = top + width * 3 if y + 1 < thumbnail.height else None
+        row = []
+        for x in range(width):
+            i = top + x * 3
+            fg = '#%02x%02x%02x' % tuple(_quantize(c) for c in pixels[i:i + 3])
+            if bottom is None:
+                row.append((UPPER_HALF, fg))
+                continue
+            j = bottom + x * 3
+            bg = 'on_#%02x%02x%02x' % tuple(_quantize(c) for c in pixels[j:j + 3])
+            row.append((UPPER_HALF, fg + ' ' + bg))
+        rows.append(row)
+    return rows
+
+
+class MapPreview:
+    """
+    Map thumbnails for the preview pane, made on a background thread.
+
+    lookup() never blocks: it returns a folder's rendered map when it is in the in-memory
+    LRU and otherwise schedules it and returns None; the TUI polls and redraws once it is
+    ready. locate(folder) finds the folder's image on the worker, so drawing never
+    touches the filesystem. Only the most recent request is kept, so holding an arrow key
+    never builds a queue, and once it is served the neighbouring folders passed to
+    prefetch() are prepared too. Thumbnails themselves come from a ThumbnailStore, which
+    keeps them on disk between sessions.
+    """
+
+    def __init__(self, store, locate, capacity=64):
+        self.store = store
+        self.locate = locate
+        self.capacity = capacity
+        self.cache = OrderedDict()  # (folder, box) -> (image path or None, rows or an error message); most recent last
+        self.cond = threading.Condition()
+        self.pending = None   # (folder, box) wanted on screen
+        self.prefetching = []  # (folder, box) to prepare after it
+        self.fresh = False
+        self.thread = None
+        self.closed = False
+
+    def lookup(self, folder, box):
+        """
+        Return (image path, rows or an error message) for folder's map at box, (None, None)
+        if it has no map, or None while it is made.
+        """
+        key = (folder, box)
+        with self.cond:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                if self.pending == key:
+                    self.pending = None
+                return self.cache[key]
+            self.pending = key
+            self._start()
+            self.cond.notify()
+            return None
+
+    def prefetch(self, folders, box):
+        """Prepare the maps of folders once nothing on screen is waiting, replacing earlier hints."""
+        with self.cond:
+            self.prefetching = [(folder, box) for folder in folders]
+            if self.prefetching:
+                self._start()
+                self.cond.notify()
+
+    def poll(self):
+        """Return whether a thumbnail asked for by lookup() finished since the last poll."""
+        with self.cond:
+            fresh, self.fresh = self.fresh, False
+            return fresh
+
+    @property
+    def waiting(self):
+        with self.cond:
+            return self.pending is not None
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+    def _start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._worker, name='map-preview', daemon=True)
+            self.thread.start()
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                while self.pending is None and not self.prefetching and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return
+                key = self.pending if self.pending is not None else self.prefetching.pop(0)
+                if key in self.cache:
+                    if self.pending == key:
+                        self.pending = None
+                        self.fresh = True
+                    continue
+            try:
+                path = self.locate(key[0])
+            except Exception:
+                path = None
+            if path is None:
+                value = None, None
+            else:
+                try:
+                    value = path, half_block_rows(self.store.get(path, key[1]))
+                except Exception as e:
+                    value = path, f'No preview: {e}'
+            with self.cond:
+                self.cache[key] = value
+                self.cache.move_to_end(key)
+                while len(self.cache) > self.capacity:
+                    self.cache.popitem(last=False)
+                if self.pending == key:
+                    self.pending = None
+                    self.fresh = True
@@ -0,0 +1,163 @@
+import sys
+from collections import OrderedDict
+
+BLANK = (' ', '')
+STYLE_CACHE_SIZE = 4096  # resolved style strings kept; map previews alone can use thousands
+
+
+class ScreenBuffer:
+    """
+    Double-buffered terminal output.
+
+    A frame is composed in memory with write(), then flush() compares it with the frame
+    already on screen and sends only the changed span of each changed row, in one
+    write. Styles are given by blessed attribute name ('bold', 'reverse', 'green', ...),
+    or as '#rrggbb' / 'on_#rrggbb' colours, and resolved against the terminal when the
+    frame is emitted. Colours are snapped to the 256-colour palette on terminals without
+    truecolor.
+    """
+
+    def __init__(self, term, out=None):
+        self.term = term
+        self.out = out or sys.stdout
+        self.rows = []        # frame being composed: rows of (char, style) cells
+        self.owned = None     # with begin(keep=True): rows already copied from the shown frame
+        self.shown = None     # frame currently on screen, None when unknown
+        self.size = None
+        self.styles = OrderedDict()  # style name -> escape sequence, least recently used first
+        self.parts = {}       # one attribute or colour of a style -> escape sequence
+        self.frames = 0
+        self.frame_bytes = 0  # bytes written by the last flush
+        self.total_bytes = 0
+
+    def begin(self, height, width, keep=False):
+        """
+        Start composing a frame of the given size.
+
+        The frame starts blank, or with keep=True as a copy of the frame on screen so a
+        caller that knows which rows changed only has to clear_row() and redraw those.
+        Returns whether the frame was kept (False after a resize or invalidate()).
+        """
+        if (height, width) != self.size:
+            self.size = (height, width)
+            self.shown = None
+        if keep and self.shown is not None:
+            self.rows = list(self.shown)
+            self.owned = set()
+            return True
+        self.rows = [[BLANK] * width for _ in range(height)]
+        self.owned = None
+        return False
+
+    def clear_row(self, y):
+        if 0 <= y < len(self.rows):
+            self.rows[y] = [BLANK] * len(self.rows[y])
+            if self.owned is not None:
+                self.owned.add(y)
+
+    def write(self, y, x, text, style=''):
+        """Place text at (y, x), clipped to the frame."""
+        if not 0 <= y < len(self.rows) or x < 0:
+            return
+        if self.owned is not None and y not in self.owned:
+            # Copy on write: the row is still shared with the frame on screen
+            self.rows[y] = list(self.rows[y])
+            self.owned.add(y)
+        row = self.rows[y]
+        text = text[:max(0, len(row) - x)]
+        row[x:x + len(text)] = [(char, style) for char in text]
+
+    def write_cells(self, y, x, cells):
+        """Place a run of (char, style) cells at (y, x), clipped to the frame."""
+        if not 0 <= y < len(self.rows) or x < 0:
+            return
+        if self.owned is not None and y not in self.owned:
+            self.rows[y] = list(self.rows[y])
+            self.owned.add(y)
+        row = self.rows[y]
+        cells = cells[:max(0, len(row) - x)]
+        row[x:x + len(cells)] = cells
+
+    def invalidate(self):
+        """Forget what is on screen, e.g. after something else drew on it."""
+        self.shown = None
+
+    def style(self, name):
+        """
+        Escape sequence for a style name. Combinations of colours are unbounded, so they are
+        kept in an LRU; the attributes and colours they are made of are cached for good.
+        """
+        sequence = self.styles.get(name)
+        if sequence is not None:
+            self.styles.move_to_end(name)
+            return sequence
+        sequence = self.styles[name] = ''.join(map(self._part, name.split()))
+        if len(self.styles) > STYLE_CACHE_SIZE:
+            self.styles.popitem(last=False)
+        return sequence
+
+    def _part(self, part):
+        sequence = self.parts.get(part)
+        if sequence is None:
+            sequence = self.parts[part] = self._resolve(part)
+        return sequence
+
+    def _resolve(self, part):
+        if part.startswith('#'):
+            return self._color(part[1:], background=False)
+        if part.startswith('on_#'):
+            return self._color(part[4:], background=True)
+        return str(getattr(self.term, part))
+
+    def _color(self, hex_rgb, background):
+        rgb = bytes.fromhex(hex_rgb)
+        if self.term.number_of_colors >= 1 << 24:
+            return str(self.term.on_color_rgb(*rgb) if background else self.term.color_rgb(*rgb))
+        # blessed's nearest-colour search takes over a millisecond per colour; snapping to
+        # the 6x6x6 cube of a 256-colour terminal is close enough and instant
+        r, g, b = (round(c * 5 / 255) for c in rgb)
+        index = 16 + 36 * r + 6 * g + b
+        return str(self.term.on_color(index) if background else self.term.color(index))
+
+    def render(self):
+        """Return the escape sequences turning the shown frame into the composed one."""
+        parts = []
+        if self.shown is None:
+            parts.append(str(self.term.home) + str(self.term.clear))
+            previous_rows = [[BLANK] * len(row) for row in self.rows]
+        else:
+            previous_rows = self.shown
+        normal = str(self.term.normal)
+        for y, (row, previous) in enumerate(zip(self.rows, previous_rows)):
+            if row is previous or row == previous:
+                continue
+            first = 0
+            while row[first] == previous[first]:
+                first += 1
+            last = len(row) - 1
+            while row[last] == previous[last]:
+                last -= 1
+            parts.append(str(self.term.move(y, first)))
+            current = ''
+            for char, style in row[first:last + 1]:
+                if style != current:
+                    # Every run starts from normal attributes, so only a style switch needs a reset
+                    parts.append((normal if current else '') + self.style(style) if style else normal)
+                    current = style
+                parts.append(char)
+            if current:
+                parts.append(normal)
+        return ''.join(parts)
+
+    def flush(self):
+        """Emit the composed frame and return the number of bytes written."""
+        output = self.render()
+        self.shown = self.rows
+        self.rows = []
+        self.frames += 1
+        self.frame_bytes = len(output.encode('utf-8'))
+        self.total_bytes += self.frame_bytes
+        if output:
+            self.out.write(output)
+            self.out.flush()
+        return self.frame_bytes
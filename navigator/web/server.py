@@ -0,0 +1,334 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from urllib.parse import parse_qs, unquote, urlsplit
+from navigator.cli import UsageError, run_query
+from navigator.core.index import CACHE_DIR_NAME
+
+TILES_DIR_NAME = 'tiles'  # as in core/tiles.py, which would import Pillow and the process pool
+MAX_HEADER_BYTES = 16 * 1024
+KEEPALIVE_TIMEOUT = 15.0  # seconds an idle connection is kept open
+RESPONSE_CACHE_SIZE = 512  # API responses kept per index generation
+BACKLOG = 1024
+REFRESH_INTERVAL = 10.0  # seconds between checks of the archive for changed JSONs
+
+REASONS = {
+    200: 'OK', 206: 'Partial Content', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 416: 'Range Not Satisfiable', 431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error',
+}
+
+# /api/<kind> -> query string parameters, passed in order to the CLI query of that name
+API = {
+    'locations': ('q',),
+    'names': ('q',),
+    'fuzzy': ('q', 'limit'),
+    'at': ('version',),
+    'between': ('start', 'end'),
+    'timeline': ('name',),
+    'versions': (),
+    'season': ('season',),
+    'diff': ('old', 'new'),
+    'image': ('folder',),
+}
+
+
+def parse_range(header, size):
+    """
+    Return the (first, last) byte positions of a single "bytes=" Range header, or None to
+    send the whole file (no header, several ranges, or a unit other than bytes).
+    Raises ValueError if the range cannot be satisfied.
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    first, _, last = header[6:].strip().partition('-')
+    suffix = not first  # the last N bytes
+    try:
+        if suffix:
+            count = int(last)
+        else:
+            first = int(first)
+            last = int(last) if last else size - 1
+    except ValueError:
+        return None  # malformed ranges are ignored, as RFC 9110 allows
+    if suffix:
+        if count <= 0:
+            raise ValueError('empty suffix range')
+        return max(0, size - count), size - 1
+    if first >= size or last < first:
+        raise ValueError('range outside the file')
+    return first, min(last, size - 1)
+
+
+def etag_matches(header, etag):
+    """Whether an If-None-Match header lists etag (weak comparison) or is *."""
+    if header.strip() == '*':
+        return True
+    for tag in header.split(','):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith('W/') else tag) == etag:
+            return True
+    return False
+
+
+def resolve_under(root, rel):
+    """root/rel as a real path, or None if it escapes root."""
+    path = os.path.realpath(os.path.join(root, rel))
+    if path != root and not path.startswith(root + os.sep):
+        return None
+    return path
+
+
+class ArchiveServer:
+    """
+    HTTP API over one archive, served by a single asyncio event loop.
+
+    The location index and the structures derived from it are built at start(), and
+    requests are answered from memory. Every refresh_interval seconds the archive is
+    stat'ed on the event loop (about 8 ms for the full archive) and changed JSONs are
+    re-read, so edits show up without a restart; responses for the same query are cached
+    until that changes the index. Map images and tiles are sent straight from the page
+    cache with sendfile, with ETags and byte ranges, so a slow client never holds a copy
+    of a map in the process. Keep-alive connections are closed after KEEPALIVE_TIMEOUT
+    idle seconds.
+
+    GET/HEAD /api/<kind>?...            JSON, see API
+    GET/HEAD /maps/chapter_x/season_y/<version>   the update's map JPG
+    GET/HEAD /tiles/chapter_x/season_y/<version>/<z>/<x>/<y>.jpg   a tile from build_tiles.py
+    """
+
+    def __init__(self, navigator, host='127.0.0.1', port=8000, refresh_interval=REFRESH_INTERVAL):
+        self.navigator = navigator
+        self.refresh_interval = refresh_interval
+        self.host = host
+        self.port = port
+        self.base_dir = os.path.realpath(navigator.base_dir)
+        self.tiles_dir = os.path.join(self.base_dir, CACHE_DIR_NAME, TILES_DIR_NAME)
+        self.responses = OrderedDict()  # (kind, args) -> (status, body)
+        self.responses_generation = None
+        self.server = None
+        self.watcher = None
+        self.requests = 0
+        self._date = (0, '')
+
+    def warm(self):
+        """Load the index and build the catalog, lifetimes and snapshots the queries use."""
+        self.navigator.location_index.ensure_loaded()
+        self.navigator.location_lifetimes()
+        self.navigator.location_matrix()
+        self.navigator.version_snapshots()
+
+    async def start(self):
+        self.warm()
+        self.server = await asyncio.start_server(self.handle, self.host, self.port,
+                                                 limit=MAX_HEADER_BYTES, backlog=BACKLOG)
+        self.port = self.server.sockets[0].getsockname()[1]
+        if self.refresh_interval:
+            self.watcher = asyncio.get_running_loop().create_task(self.watch())
+        return self.server
+
+    async def close(self):
+        if self.watcher is not None:
+            self.watcher.cancel()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def refresh(self):
+        """Re-read JSONs changed on disk and rebuild what the queries use; returns how many changed."""
+        index = self.navigator.location_index
+        with index.lock:
+            changed = index.refresh()
+        if changed:
+            self.warm()
+        return changed
+
+    async def watch(self):
+        # On the loop rather than a thread, so no request ever sees the index mid-refresh
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except OSError:
+                pass
+
+    def date(self):
+        now = int(time.time())
+        if self._date[0] != now:
+            self._date = (now, formatdate(now, usegmt=True))
+        return self._date[1]
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_TIMEOUT)
+                except asyncio.LimitOverrunError:
+                    await self.send(writer, 431, b'', close=True)
+                    return
+                try:
+                    method, target, version, headers = self.parse_head(head)
+                except ValueError:
+                    await self.send(writer, 400, b'', close=True)
+                    return
+                self.requests += 1
+                keep_alive = self.keep_alive(version, headers)
+                if method not in ('GET', 'HEAD'):
+                    # The body, if any, is not read, so the connection cannot be reused
+                    await self.send(writer, 405, b'', {'Allow': 'GET, HEAD'}, close=True)
+                    return
+                try:
+                    await self.dispatch(writer, target, headers, method == 'HEAD', keep_alive)
+                except ConnectionError:
+                    raise
+                except Exception as e:
+                    # Whatever was already written for this request is unknown, so close after the error
+                    body = json.dumps({'error': f'{type(e).__name__}: {e}'}).encode()
+                    await self.send(writer, 500, body, {'Content-Type': 'application/json'}, close=True)
+                    return
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    def parse_head(head):
+        lines = head.decode('latin-1').split('\r\n')
+        method, target, version = lines[0].split(' ')
+        if not version.startswith('HTTP/1.'):
+            raise ValueError(version)
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+        return method, target, version, headers
+
+    @staticmethod
+    def keep_alive(version, headers):
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    async def dispatch(self, writer, target, headers, head, keep_alive):
+        url = urlsplit(target)
+        path = unquote(url.path)
+        if path.startswith('/api/'):
+            status, body = self.api(path[5:], parse_qs(url.query))
+            await self.send(writer, status, body, {'Content-Type': 'application/json'}, head, not keep_alive)
+        elif path.startswith('/maps/'):
+            folder = resolve_under(self.base_dir, path[6:].strip('/'))
+            image = None if folder is None else self.navigator.map_image(folder)
+            await self.send_file(writer, image, headers, head, keep_alive)
+        elif path.startswith('/tiles/'):
+            tile = resolve_under(os.path.realpath(self.tiles_dir), path[7:].strip('/'))
+            await self.send_file(writer, tile if tile and tile.endswith('.jpg') else None, headers, head, keep_alive)
+        else:
+            await self.send(writer, 404, b'', head=head, close=not keep_alive)
+
+    def api(self, kind, params):
+        """Return (status, JSON body) for /api/<kind> with the parsed query string."""
+        if kind not in API:
+            return 404, json.dumps({'error': f'Unknown query {kind!r}', 'queries': sorted(API)}).encode()
+        args = [params[name][0] for name in API[kind] if name in params]
+        generation = self.navigator.location_index.generation
+        if generation != self.responses_generation:
+            self.responses.clear()
+            self.responses_generation = generation
+        key = (kind, tuple(args))
+        cached = self.responses.get(key)
+        if cached is not None:
+            self.responses.move_to_end(key)
+            return cached
+        try:
+            response = 200, json.dumps(run_query(self.navigator, [kind] + args)).encode()
+        except UsageError as e:
+            # A missing parameter or a bad value
+            message = str(e)
+            if message.startswith('Usage: '):
+                message = 'Parameters: ' + ', '.join(API[kind])
+            response = 400, json.dumps({'error': message}).encode()
+        except ValueError as e:
+            # An unknown version, location or season
+            response = 404, json.dumps({'error': str(e)}).encode()
+        self.responses[key] = response
+        while len(self.responses) > RESPONSE_CACHE_SIZE:
+            self.responses.popitem(last=False)
+        return response
+
+    async def send(self, writer, status, body, headers=None, head=False, close=False, length=None):
+        lines = [f'HTTP/1.1 {status} {REASONS[status]}', f'Date: {self.date()}',
+                 f'Content-Length: {len(body) if length is None else length}',
+                 'Access-Control-Allow-Origin: *']
+        if close:
+            lines.append('Connection: close')
+        for name, value in (headers or {}).items():
+            lines.append(f'{name}: {value}')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if body and not head:
+            writer.write(body)
+        await writer.drain()
+
+    async def send_file(self, writer, path, request_headers, head, keep_alive):
+        """Send a file with ETag revalidation and single byte ranges, using sendfile for the body."""
+        if path is None:
+            await self.send(writer, 404, b'', head=head, close=not keep_alive)
+            return
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            await self.send(writer, 404, b'', head=head, close=not keep_alive)
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            etag = '"%x-%x"' % (st.st_mtime_ns, st.st_size)
+            headers = {'ETag': etag, 'Accept-Ranges': 'bytes', 'Cache-Control': 'no-cache'}
+            if etag_matches(request_headers.get('if-none-match', ''), etag):
+                # A 304 may only state the length a 200 would have had
+                await self.send(writer, 304, b'', headers, head=True, close=not keep_alive, length=st.st_size)
+                return
+            status, first, count = 200, 0, st.st_size
+            if_range = request_headers.get('if-range')
+            if if_range is None or if_range == etag:
+                try:
+                    byte_range = parse_range(request_headers.get('range'), st.st_size)
+                except ValueError:
+                    headers['Content-Range'] = f'bytes */{st.st_size}'
+                    await self.send(writer, 416, b'', headers, head, close=not keep_alive)
+                    return
+                if byte_range is not None:
+                    first, last = byte_range
+                    status, count = 206, last - first + 1
+                    headers['Content-Range'] = f'bytes {first}-{last}/{st.st_size}'
+            headers['Content-Type'] = 'image/jpeg'
+            await self.send(writer, status, b'', headers, head=True, close=not keep_alive, length=count)
+            if not head and count:
+                # os.sendfile from the page cache to the socket where the transport allows,
+                # a buffered copy otherwise (e.g. TLS)
+                await asyncio.get_running_loop().sendfile(writer.transport, f, first, count)
+
+
+def serve(navigator, host='127.0.0.1', port=8000):
+    """Run an ArchiveServer until interrupted. Returns an exit status."""
+    async def run():
+        server = ArchiveServer(navigator, host, port)
+        await server.start()
+        print(f'Serving {navigator.base_dir} on http://{server.host}:{server.port}/', flush=True)
+        async with server.server:
+            await server.server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0